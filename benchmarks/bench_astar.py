@@ -0,0 +1,102 @@
+"""
+Benchmark the legacy Spot-based a_star against the heap-based astar_search
+and Jump Point Search
+
+Run from the repository root:
+
+    python -m benchmarks.bench_astar            # 50x50, 200x200, 1000x1000
+    python -m benchmarks.bench_astar 50 200     # custom sizes
+"""
+
+import gc
+import random
+import sys
+import time
+
+from config.constants import VIS_SEARCH
+from core.astar import a_star
+from core.grid import make_grid
+from core.grid_state import GridState
+from core.jps import jps_search
+from core.search import astar_search
+
+DEFAULT_SIZES = [50, 200, 1000]
+BARRIER_DENSITY = 0.25
+SEED = 42
+
+
+def build_state(size, seed=SEED):
+    """Random barrier map with the corners kept free"""
+    rng = random.Random(seed)
+    state = GridState(size)
+    for i in range(size * size):
+        if rng.random() < BARRIER_DENSITY:
+            state.flags[i] = 1
+    state.flags[0] = 0
+    state.flags[size * size - 1] = 0
+    return state
+
+
+def bench_legacy(state):
+    """Time the original a_star with its default animated bookkeeping (no-op draw)"""
+    size = state.rows
+    setup_start = time.perf_counter()
+    grid = make_grid(size, size, state)
+    for row in grid:
+        for spot in row:
+            spot.update_neighbors(grid)
+    setup = time.perf_counter() - setup_start
+
+    draws = [0]
+
+    def draw():
+        draws[0] += 1
+
+    start, end = grid[0][0], grid[size - 1][size - 1]
+    search_start = time.perf_counter()
+    found = a_star(draw, grid, start, end, visualize=VIS_SEARCH)
+    elapsed = time.perf_counter() - search_start
+
+    # One draw per expansion plus one per reconstructed path step
+    path_steps = 0
+    spot = end
+    while found and spot.previous is not None and spot is not start:
+        path_steps += 1
+        spot = spot.previous
+    return found, draws[0] - path_steps, elapsed, setup
+
+
+def bench_heap(state):
+    """Time the heap-based search on the bare state"""
+    stats = {}
+    search_start = time.perf_counter()
+    path = astar_search(state, (0, 0), (state.rows - 1, state.cols - 1), stats=stats)
+    elapsed = time.perf_counter() - search_start
+    return path is not None, stats['expanded'], elapsed, 0.0
+
+
+def bench_jps(state):
+    """Time Jump Point Search on the bare state"""
+    stats = {}
+    search_start = time.perf_counter()
+    path = jps_search(state, (0, 0), (state.rows - 1, state.cols - 1), stats=stats)
+    elapsed = time.perf_counter() - search_start
+    return path is not None, stats['expanded'], elapsed, 0.0
+
+
+def main(sizes):
+    print(f"{'grid':>11} {'impl':>7} {'found':>6} {'expanded':>9} {'search s':>9} "
+          f"{'setup s':>8} {'exp/sec':>10}")
+    for size in sizes:
+        for name, bench in (("legacy", bench_legacy), ("heap", bench_heap), ("jps", bench_jps)):
+            # Spot grids form reference cycles; free them so the next run
+            # is not paying for the collector walking a million dead objects
+            gc.collect()
+            found, expanded, elapsed, setup = bench(build_state(size))
+            rate = expanded / elapsed if elapsed else float("inf")
+            print(f"{size:>5}x{size:<5} {name:>7} {str(found):>6} {expanded:>9} "
+                  f"{elapsed:>9.3f} {setup:>8.2f} {rate:>10.0f}")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
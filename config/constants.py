@@ -17,12 +17,37 @@ TRAIL_LENGTH = 15
 TRAIL_ALPHA = 150
 FADING_SPEED = 5
 
+# Camera constants
+ZOOM_LEVELS = (1 / 8, 1 / 4, 1 / 2, 1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64)  # Window pixels per cell
+PAN_STEP = 64           # Window pixels moved per arrow key press
+GRID_LINE_MIN_CELL = 4  # Smallest on-screen cell size that still gets grid lines
+
+# Image map import constants
+IMAGE_DARK_THRESHOLD = 100    # Pixels darker than this (0-255 luminance) are walls
+IMAGE_BARRIER_SHARE = 0.5     # Share of wall pixels that makes a cell a barrier
+IMAGE_COLOR_TOLERANCE = 60    # Largest RGB distance at which a pixel matches a zone color
+IMAGE_COST_ZONES = {          # Zone color -> movement cost multiplier
+    (255, 255, 0): 2.0,       # Yellow: busy
+    (255, 165, 0): 3.0,       # Orange: rough ground
+    (255, 0, 0): 5.0,         # Red: very slow
+}
+IMAGE_MAX_CELLS = 1000        # Default longest grid side for imported images
+IMAGE_TILE_PIXELS = 1 << 22   # Image pixels converted at a time
+
 # Speed and timing constants
 DEFAULT_SPEED = 1
 SPEED_MULTIPLIERS = [0.1, 0.3, 0.5, 1.0]
 
 # Traffic light constants
 TRAFFIC_LIGHT_CYCLE = 5
+LIGHT_GREEN_SHARE = 0.7   # Fraction of the cycle spent green
+LIGHT_YELLOW_SHARE = 0.1  # Fraction spent yellow; the rest is red
+
+# Dynamic obstacle constants
+OBSTACLE_MOVE_INTERVAL = (1.0, 3.0)  # Seconds between moves at speed 1, drawn uniformly
+OBSTACLE_TURN_CHANCE = 0.3           # Chance a random walker turns before a move
+OBSTACLE_MOVE_ATTEMPTS = 8           # Directions a random walker tries before staying put
+OBSTACLE_FORECAST_TICKS = 150        # Clock ticks of obstacle motion forecast for planning
 
 # Robot constants
 DEFAULT_BATTERY = 100
@@ -32,4 +57,34 @@ BATTERY_DRAIN_RATE = 1
 
 # Movement timing constants
 MOVE_DELAY = 0.4
-PAUSE_DURATION = 2.0
\ No newline at end of file
+PAUSE_DURATION = 2.0
+
+# Simulation clock: one fixed tick per rendered frame in interactive mode
+FPS = 30
+SIM_TICK = 1 / FPS
+
+# Planner visualization policies
+VIS_SEARCH = "search"  # Animate the search frontier while planning
+VIS_PATH = "path"      # Draw only the final path
+VIS_NONE = "none"      # Headless planning, no drawing at all
+DRAW_EVERY = 1         # Expansions between frames in VIS_SEARCH mode
+
+# Planning backends
+PLANNER_ASTAR = "astar"  # Plan from scratch with A* on every call
+PLANNER_DSTAR = "dstar"  # Incremental D* Lite, repairs the previous search
+PLANNER_SPACETIME = "spacetime"  # Timed A* that waits for or avoids predicted red lights
+PLANNER_HPA = "hpa"  # Hierarchical A* over clusters, for very large grids
+PLANNERS = [PLANNER_ASTAR, PLANNER_DSTAR, PLANNER_SPACETIME, PLANNER_HPA]
+
+# Why a plan was made, recorded in per-plan statistics
+PLAN_INITIAL = "initial"    # First plan of a robot
+PLAN_NEW_GOAL = "new_goal"  # Moving on to the next target
+PLAN_BLOCKED = "blocked"    # The next cell of the path became blocked
+PLAN_SCHEDULE = "schedule"  # A space-time plan no longer matches the grid
+PLAN_RETRY = "retry"        # An earlier plan found no path
+PLAN_SWITCH = "switch"      # The robot changed planning backend
+
+# Planner tuning
+PATH_CACHE_SIZE = 256  # Start/goal pairs whose A* paths are kept for reuse
+ALT_LANDMARKS = 8      # Landmarks precomputed for the ALT heuristic
+HPA_CLUSTER_SIZE = 16  # Cluster side length (cells) for hierarchical planning
@@ -2,15 +2,52 @@
 Global settings and configuration
 """
 
-from .constants import DEFAULT_SPEED
+from .constants import DEFAULT_SPEED, DRAW_EVERY, VIS_SEARCH, VIS_PATH, PLANNER_ASTAR
 
 # Window dimensions
 WIDTH = 800
 ROWS = 50
+COLS = ROWS
+CELL_SIZE = 16  # World pixels per grid cell; the camera scales them to the window
 SIDEBAR_WIDTH = 300
 WINDOW_WIDTH = WIDTH + SIDEBAR_WIDTH
 
 # Global variables
 sim_speed = DEFAULT_SPEED
 traffic_light_tool = False
-current_map_name = None
\ No newline at end of file
+current_map_name = None
+
+# Save maps as binary .rgmap files that load by memory-mapping (False: JSON);
+# either format loads
+binary_maps = True
+
+# Keep hand-placed random obstacles in a vectorized ObstacleSwarm that moves
+# them all in one batched step per tick (False: one object per obstacle)
+vectorized_obstacles = True
+
+# Space-time robots plan around a forecast of the dynamic obstacles' motion
+# instead of only replanning once one blocks the path
+predict_obstacles = True
+
+# Planner visualization: initial plans animate the search, replans
+# only show the resulting path so they stay fast under load
+plan_visualization = VIS_SEARCH
+replan_visualization = VIS_PATH
+draw_every = DRAW_EVERY
+
+# Record search effort and wall time of every plan (see core.plan_stats);
+# registering a plan hook turns it on as well
+profile_planning = False
+
+# Planning backend used by new robots (see PLANNER_* in constants)
+default_planner = PLANNER_ASTAR
+
+# Visit targets in an optimized tour instead of placement order; with
+# tour_respect_priority lower priority numbers are still visited first and
+# only targets of equal priority are reordered
+optimize_tour = True
+tour_respect_priority = True
+
+# Precompute ALT landmarks once per map layout and plan with the landmark
+# heuristic (tighter than straight-line distance on maze-like maps)
+use_landmarks = False
@@ -1,5 +1,6 @@
 import math
 from queue import PriorityQueue
+from config.constants import VIS_SEARCH, VIS_PATH, VIS_NONE, DRAW_EVERY
 
 def heuristic(a, b):
     """Calculate heuristic distance between two spots"""
@@ -7,36 +8,67 @@ def heuristic(a, b):
     x2, y2 = b.get_pos()
     return math.hypot(x1 - x2, y1 - y2)
 
-def reconstruct_path(came_from, current, draw):
+def reconstruct_path(came_from, current, draw, visualize=VIS_SEARCH):
     """Reconstruct the path from start to end"""
     while current in came_from:
         current = came_from[current]
+        if visualize == VIS_NONE:
+            continue
         if not current.is_start():  # Don't color the start node
             current.make_path()
+        if visualize == VIS_SEARCH:
+            draw()
+    if visualize == VIS_PATH:
         draw()
 
-def a_star(draw_func, grid, start, end, known_map=None):
-    """A* pathfinding algorithm implementation"""
+def a_star(draw_func, grid, start, end, known_map=None, visualize=VIS_SEARCH, draw_every=DRAW_EVERY,
+           heuristic_func=None, stats=None):
+    """A* pathfinding algorithm implementation
+
+    visualize selects how much of the search is drawn: VIS_SEARCH animates
+    the frontier every `draw_every` expansions, VIS_PATH only draws the
+    final path and VIS_NONE runs headless. Passing no draw_func also
+    runs headless. heuristic_func(spot, end) replaces the Euclidean
+    distance (scaled down on grids with cells cheaper than the default),
+    e.g. with a landmark heuristic. If a `stats` dict is given,
+    the number of expanded nodes, queue pushes and the largest open set
+    size are stored in it.
+    """
+    if heuristic_func is None:
+        heuristic_func = heuristic
+        floor = start.state.cost_floor()
+        if floor < 1:
+            heuristic_func = lambda a, b: heuristic(a, b) * floor
+    if draw_func is None:
+        visualize = VIS_NONE
+    animate = visualize == VIS_SEARCH
+    draw_every = max(1, draw_every)
+
     count = 0
+    expanded = 0
     open_set = PriorityQueue()
     open_set.put((0, count, start))
     came_from = {}
-    
-    # Initialize g_score and f_score for all nodes
-    g_score = {spot: float("inf") for row in grid for spot in row}
-    f_score = {spot: float("inf") for row in grid for spot in row}
-    
-    g_score[start] = 0
-    f_score[start] = heuristic(start, end)
-    
+
+    # Scores of the spots reached so far; the rest are infinite
+    g_score = {start: 0}
+    f_score = {start: heuristic_func(start, end)}
+
     open_set_hash = {start}
+    track = stats is not None
+    peak = 1
 
     while not open_set.empty():
         current = open_set.get()[2]
+        # Stale entry: the spot was queued again with a lower score and already expanded
+        if current not in open_set_hash:
+            continue
         open_set_hash.remove(current)
 
         if current == end:
-            reconstruct_path(came_from, end, draw_func)
+            if track:
+                stats.update(expanded=expanded, pushes=count + 1, max_open=peak)
+            reconstruct_path(came_from, end, draw_func, visualize)
             end.make_end()
             return True
 
@@ -46,31 +78,39 @@ def a_star(draw_func, grid, start, end, known_map=None):
                 neighbor_pos = (neighbor.row, neighbor.col)
                 if neighbor_pos in known_map and not known_map[neighbor_pos]['is_barrier']:
                     continue
-            
+
             # Calculate movement cost (diagonal moves cost more)
             dx = abs(current.row - neighbor.row)
             dy = abs(current.col - neighbor.col)
             step_cost = 1.41 if dx + dy == 2 else 1
-            
+
             # Get neighbor cost (default to 1 if not available)
             neighbor_cost = getattr(neighbor, 'cost', 1)
             temp_g = g_score[current] + step_cost * neighbor_cost
 
-            if temp_g < g_score[neighbor]:
+            if temp_g < g_score.get(neighbor, float("inf")):
                 came_from[neighbor] = current
                 g_score[neighbor] = temp_g
-                f_score[neighbor] = temp_g + heuristic(neighbor, end)
+                f_score[neighbor] = temp_g + heuristic_func(neighbor, end)
                 neighbor.previous = current
 
+                # Queue it again even if already open, so the lower score takes effect
+                count += 1
+                open_set.put((f_score[neighbor], count, neighbor))
                 if neighbor not in open_set_hash:
-                    count += 1
-                    open_set.put((f_score[neighbor], count, neighbor))
                     open_set_hash.add(neighbor)
-                    if not neighbor.is_end():
+                    if track and len(open_set_hash) > peak:
+                        peak = len(open_set_hash)
+                    if animate and not neighbor.is_end():
                         neighbor.make_open()
 
-        draw_func()
-        if current != start:
-            current.make_closed()
+        expanded += 1
+        if animate:
+            if expanded % draw_every == 0:
+                draw_func()
+            if current != start:
+                current.make_closed()
 
-    return False
\ No newline at end of file
+    if track:
+        stats.update(expanded=expanded, pushes=count + 1, max_open=peak)
+    return False
@@ -0,0 +1,61 @@
+"""
+Deterministic fixed-timestep simulation clock
+
+Entities read the time from a shared SimClock instead of time.time(). The
+clock only moves when the owner advances it: the interactive loop advances
+one tick per rendered frame, so ticks track real time, while headless runs
+advance as fast as the CPU allows (jumping whole ticks to the next scheduled
+event, see core.scheduler) and stay reproducible for a given seed.
+"""
+
+import math
+from config.constants import SIM_TICK
+
+# Tolerance when converting a time span into whole ticks
+TICK_EPSILON = 1e-9
+
+
+class SimClock:
+    def __init__(self, tick=SIM_TICK, start=0.0):
+        self.tick = tick
+        self.start = start
+        self.ticks = 0
+        self.time = start
+
+    def now(self):
+        """Current simulated time in seconds"""
+        return self.time
+
+    def advance(self, ticks=1):
+        """Move the clock forward by whole ticks"""
+        self.ticks += ticks
+        # Derived from the tick count so long runs do not accumulate float drift
+        self.time = self.start + self.ticks * self.tick
+        return self.time
+
+    def advance_to(self, time):
+        """Move forward by whole ticks to the first tick at or after `time` (at least one)"""
+        ticks = math.ceil((time - self.time) / self.tick - TICK_EPSILON)
+        return self.advance(max(1, ticks))
+
+    def reset(self, start=0.0):
+        """Rewind the clock to `start`"""
+        self.start = start
+        self.ticks = 0
+        self.time = start
+
+
+# Clock shared by every entity that is not given one explicitly
+_shared_clock = SimClock()
+
+
+def get_clock():
+    """Return the shared simulation clock"""
+    return _shared_clock
+
+
+def set_clock(clock):
+    """Replace the shared simulation clock (e.g. per headless scenario)"""
+    global _shared_clock
+    _shared_clock = clock
+    return clock
@@ -0,0 +1,195 @@
+"""
+D* Lite incremental planner over a GridState
+
+The search runs backwards from the goal and keeps its g/rhs values between
+calls. When cells change only the vertices around them are re-queued, so a
+replan costs roughly the size of the affected region instead of the grid.
+"""
+
+import heapq
+from .grid_state import DIRECTIONS, DIAGONAL_COST, BLOCKING, TRAFFIC, LIGHT_RED
+
+INF = float("inf")
+# Tolerance for key comparisons; diagonal costs make keys drift by rounding
+KEY_EPSILON = 1e-9
+
+
+def _key_less(a, b):
+    """Compare two (k1, k2) keys, treating rounding-level differences as ties"""
+    if a[0] < b[0] - KEY_EPSILON:
+        return True
+    return abs(a[0] - b[0]) <= KEY_EPSILON and a[1] < b[1] - KEY_EPSILON
+
+
+class DStarLite:
+    def __init__(self, state, start, goal):
+        """Create a planner for `start` -> `goal`, both (row, col) cells"""
+        self.state = state
+        self.goal = state.index(*goal)
+        self.start = state.index(*start)
+        self.last_start = self.start
+        self.km = 0.0
+        self.floor = state.cost_floor()  # Heuristic scale; see GridState.cost_floor
+        self.g = {}
+        self.rhs = {self.goal: 0.0}
+        self.open = []          # heap of (k1, k2, index)
+        self.open_keys = {}     # index -> current key, for lazy deletion
+        self.version = state.version
+        self.expanded = 0
+        self.pushes = 0         # Heap pushes so far
+        self.max_open = 0       # Largest heap size so far, stale entries included
+        self._push(self.goal, self._key(self.goal))
+
+    # ----- Graph helpers -----
+    def _heuristic(self, a, b):
+        """Octile distance between two flat indices, scaled by the cheapest cell cost"""
+        cols = self.state.cols
+        dr = abs(a // cols - b // cols)
+        dc = abs(a % cols - b % cols)
+        if dr < dc:
+            dr, dc = dc, dr
+        return (dr + (DIAGONAL_COST - 1) * dc) * self.floor
+
+    def _neighbors(self, index):
+        """Yield (neighbor index, base step cost) for in-bounds neighbors"""
+        state = self.state
+        rows, cols = state.rows, state.cols
+        row, col = divmod(index, cols)
+        for dr, dc in DIRECTIONS:
+            r, c = row + dr, col + dc
+            if 0 <= r < rows and 0 <= c < cols:
+                yield r * cols + c, (DIAGONAL_COST if dr and dc else 1)
+
+    def _enter_cost(self, index, step):
+        """Cost of stepping into a cell, infinite if it is blocked"""
+        state = self.state
+        f = state.flags[index]
+        if f & BLOCKING or (f & TRAFFIC and state.light[index] == LIGHT_RED):
+            return INF
+        return step * state.cost[index]
+
+    # ----- Priority queue -----
+    def _key(self, index):
+        g_rhs = min(self.g.get(index, INF), self.rhs.get(index, INF))
+        return (g_rhs + self._heuristic(self.start, index) + self.km, g_rhs)
+
+    def _push(self, index, key):
+        self.open_keys[index] = key
+        heapq.heappush(self.open, (key[0], key[1], index))
+        self.pushes += 1
+        if len(self.open) > self.max_open:
+            self.max_open = len(self.open)
+
+    def _top(self):
+        """Return the smallest live (key, index) in the queue, dropping stale entries"""
+        open_heap = self.open
+        while open_heap:
+            k1, k2, index = open_heap[0]
+            if self.open_keys.get(index) == (k1, k2):
+                return (k1, k2), index
+            heapq.heappop(open_heap)
+        return (INF, INF), None
+
+    # ----- Core algorithm -----
+    def _update_vertex(self, index):
+        if index != self.goal:
+            best = INF
+            g = self.g
+            for neighbor, step in self._neighbors(index):
+                cost = self._enter_cost(neighbor, step)
+                if cost != INF:
+                    candidate = cost + g.get(neighbor, INF)
+                    if candidate < best:
+                        best = candidate
+            self.rhs[index] = best
+        self.open_keys.pop(index, None)
+        if self.g.get(index, INF) != self.rhs.get(index, INF):
+            self._push(index, self._key(index))
+
+    def _compute_shortest_path(self):
+        g, rhs = self.g, self.rhs
+        while True:
+            top_key, u = self._top()
+            if u is None:
+                break
+            start_key = self._key(self.start)
+            if not _key_less(top_key, start_key) and rhs.get(self.start, INF) == g.get(self.start, INF):
+                break
+            new_key = self._key(u)
+            if _key_less(top_key, new_key):
+                self._push(u, new_key)
+                continue
+            self.open_keys.pop(u, None)
+            heapq.heappop(self.open)
+            self.expanded += 1
+            if g.get(u, INF) > rhs.get(u, INF):
+                g[u] = rhs[u]
+                for neighbor, _ in self._neighbors(u):
+                    self._update_vertex(neighbor)
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+                for neighbor, _ in self._neighbors(u):
+                    self._update_vertex(neighbor)
+
+    # ----- Public API -----
+    def move_start(self, start):
+        """Tell the planner the robot is now at `start` (row, col)"""
+        index = self.state.index(*start)
+        if index != self.start:
+            self.km += self._heuristic(self.last_start, index)
+            self.last_start = index
+            self.start = index
+
+    def notify_changes(self, cells):
+        """Repair the search around changed cells (flat indices)"""
+        for index in cells:
+            # Entering a changed cell affects every vertex that can step into it
+            for neighbor, _ in self._neighbors(index):
+                self._update_vertex(neighbor)
+            self._update_vertex(index)
+
+    def sync(self):
+        """Pull pending changes from the grid state; returns False if a rebuild is needed"""
+        changes = self.state.changes_since(self.version)
+        self.version = self.state.version
+        if changes is None:
+            return False
+        if self.state.cost_floor() < self.floor:
+            return False  # Cheaper cells make the heuristic overestimate
+        if changes:
+            self.notify_changes(changes)
+        return True
+
+    def plan(self, stats=None):
+        """Return the current best path as a list of (row, col) from start to goal, or None
+
+        If a `stats` dict is given, the expansions and heap pushes of this
+        call and the largest heap size so far are stored in it.
+        """
+        expanded, pushes = self.expanded, self.pushes
+        self._compute_shortest_path()
+        if stats is not None:
+            stats.update(expanded=self.expanded - expanded, pushes=self.pushes - pushes,
+                         max_open=self.max_open)
+        if self.g.get(self.start, INF) == INF:
+            return None
+
+        position = self.state.position
+        path = [position(self.start)]
+        current = self.start
+        g = self.g
+        limit = self.state.rows * self.state.cols
+        while current != self.goal:
+            best, best_cost = None, INF
+            for neighbor, step in self._neighbors(current):
+                cost = self._enter_cost(neighbor, step)
+                if cost != INF:
+                    candidate = cost + g.get(neighbor, INF)
+                    if candidate < best_cost:
+                        best, best_cost = neighbor, candidate
+            if best is None or len(path) > limit:
+                return None
+            current = best
+            path.append(position(current))
+        return path
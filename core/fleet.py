@@ -0,0 +1,231 @@
+"""
+Multi-robot fleet with a shared space-time reservation table
+
+Robots are planned one after another in priority order (prioritized /
+cooperative A*): each robot plans with the space-time planner around the
+cells already reserved by the robots before it, then reserves
+its own timed path. Time is counted in whole steps of MOVE_DELAY /
+DEFAULT_SPEED, so every robot moves on the same step boundaries.
+
+The fleet keeps per-robot positions and next-move times in NumPy arrays;
+each tick only the robots whose next step is due are touched.
+"""
+
+import numpy as np
+from config.constants import *
+from .clock import get_clock
+from .robot import Robot, SCHEDULE_EPSILON
+
+INF = float("inf")
+# Steps between sweeps that drop reservations from the past
+PRUNE_INTERVAL = 64
+
+
+class ReservationTable:
+    """Which robot occupies each cell at each step"""
+
+    def __init__(self, step_time, horizon):
+        self.step_time = step_time
+        self.horizon = horizon      # Longest plan (in steps) a robot may search for
+        self.cells = {}             # flat index -> {step: owner}
+        self.parked = {}            # flat index -> (first step, owner) for robots staying put
+        self.owned = {}             # owner -> list of reserved keys, for release
+        self.pruned_step = 0
+
+    def step_at(self, time):
+        """Index of the last step boundary at or before `time`"""
+        return int(time / self.step_time + SCHEDULE_EPSILON)
+
+    def reserve(self, owner, cells, first_step):
+        """Reserve a timed path (flat indices, one per step) and park its last cell"""
+        keys = self.owned.setdefault(owner, [])
+        for k, index in enumerate(cells):
+            step = first_step + k
+            self.cells.setdefault(index, {})[step] = owner
+            keys.append(('cell', index, step))
+        self.park(owner, cells[-1], first_step + len(cells) - 1)
+
+    def park(self, owner, index, first_step):
+        """Hold a cell for a robot from `first_step` on"""
+        self.parked[index] = (first_step, owner)
+        self.owned.setdefault(owner, []).append(('park', index))
+
+    def release(self, owner):
+        """Drop every reservation held by a robot"""
+        for key in self.owned.pop(owner, []):
+            if key[0] == 'cell':
+                steps = self.cells.get(key[1])
+                if steps is not None and steps.get(key[2]) is owner:
+                    del steps[key[2]]
+            elif self.parked.get(key[1], (0, None))[1] is owner:
+                del self.parked[key[1]]
+
+    def is_free(self, owner, from_index, to_index, step):
+        """Check if a robot may move from one cell to another, arriving at `step`"""
+        # Besides the cell itself being taken, a robot may not follow another
+        # robot into a cell it is just leaving, or be followed into one. This
+        # rules out swaps and rotations and lets robots step in any order.
+        steps = self.cells.get(to_index)
+        if steps:
+            for s in (step - 1, step, step + 1):
+                holder = steps.get(s)
+                if holder is not None and holder is not owner:
+                    return False
+        parked = self.parked.get(to_index)
+        if parked is not None and parked[1] is not owner and parked[0] <= step:
+            return False
+        return True
+
+    def can_stop(self, owner, index, step):
+        """Check if a robot may stay in a cell from `step` on"""
+        parked = self.parked.get(index)
+        if parked is not None and parked[1] is not owner:
+            return False
+        steps = self.cells.get(index, {})
+        return all(holder is owner or s < step for s, holder in steps.items())
+
+    def callbacks(self, owner, first_step):
+        """(blocked, can_stop) callbacks for spacetime_search, with steps relative to `first_step`"""
+        def blocked(from_index, to_index, step):
+            return not self.is_free(owner, from_index, to_index, first_step + step)
+
+        def can_stop(index, step):
+            return self.can_stop(owner, index, first_step + step)
+
+        return blocked, can_stop
+
+    def prune(self, step):
+        """Forget reservations for steps before `step`"""
+        if step - self.pruned_step < PRUNE_INTERVAL:
+            return
+        self.pruned_step = step
+        for owner, keys in self.owned.items():
+            kept = []
+            for key in keys:
+                if key[0] == 'cell' and key[2] < step:
+                    steps = self.cells.get(key[1])
+                    if steps is not None and steps.get(key[2]) is owner:
+                        del steps[key[2]]
+                else:
+                    kept.append(key)
+            keys[:] = kept
+
+    def clear(self):
+        """Drop every reservation"""
+        self.cells.clear()
+        self.parked.clear()
+        self.owned.clear()
+        self.pruned_step = 0
+
+
+class FleetManager:
+    """Steps many robots per tick without collisions"""
+
+    def __init__(self, grid, clock=None, visualize=VIS_NONE, obstacles=None):
+        self.grid = grid
+        self.clock = clock or get_clock()
+        self.visualize = visualize
+        self.obstacles = obstacles  # DynamicObstacleManager the robots plan around
+        self.step_time = MOVE_DELAY / DEFAULT_SPEED
+        state = grid.state
+        self.reservations = ReservationTable(self.step_time, 3 * max(state.rows, state.cols))
+        self.robots = []
+        self.pending = []  # Per robot: targets still to visit, in order
+
+        # Per-robot state arrays (index = position in self.robots)
+        self.positions = np.zeros((0, 2), dtype=np.int32)
+        self.next_times = np.zeros(0)
+        self.active = np.zeros(0, dtype=bool)
+
+    def add_robot(self, start, targets):
+        """Add a robot at a start spot that will visit `targets` (spots) in order"""
+        targets = list(targets)
+        robot = Robot(start, targets.pop(0), self.grid, None,
+                      visualize=self.visualize, replan_visualize=self.visualize,
+                      planner=PLANNER_SPACETIME, clock=self.clock,
+                      reservations=self.reservations, obstacles=self.obstacles)
+        start.make_start()
+        # Hold the start cell until the robot has a plan of its own
+        self.reservations.park(robot, start.index, 0)
+        self.robots.append(robot)
+        self.pending.append(targets)
+        self.positions = np.vstack([self.positions, [start.get_pos()]]).astype(np.int32)
+        self.next_times = np.append(self.next_times, self.clock.now())
+        self.active = np.append(self.active, True)
+        return robot
+
+    def plan_all(self):
+        """Plan every robot in priority order (the order they were added)"""
+        planned = 0
+        for k, robot in enumerate(self.robots):
+            if self.active[k] and not robot.reached_goal():
+                planned += robot.plan_path()
+                self._sync(k)
+        return planned
+
+    def update(self):
+        """Advance every robot whose next step is due; returns how many were stepped"""
+        now = self.clock.now()
+        count = len(self.robots)
+        if not count:
+            return 0
+        self.reservations.prune(self.reservations.step_at(now) - 1)
+
+        due = np.flatnonzero(self.active & (self.next_times <= now + SCHEDULE_EPSILON))
+        for k in due.tolist():
+            self._advance(k)
+        return len(due)
+
+    def next_move_time(self):
+        """Time the earliest active robot is next due, or inf when all are done"""
+        return self.next_times[self.active].min(initial=INF)
+
+    def on_due(self, now):
+        """Scheduler action: advance the due robots, then return when the next one is due"""
+        self.update()
+        return self.next_move_time()
+
+    def _advance(self, k):
+        """Give robot k its next goal, a new plan or its next step"""
+        robot = self.robots[k]
+        if robot.reached_goal():
+            if not self.pending[k]:
+                self.active[k] = False
+                self.next_times[k] = INF
+                return
+            robot.set_new_goal(self.pending[k].pop(0))
+            robot.plan_path(reason=PLAN_NEW_GOAL)
+        elif robot.index >= len(robot.path):
+            # No usable plan (e.g. boxed in by reservations); try again
+            robot.plan_path(reason=PLAN_RETRY)
+        else:
+            robot.step()
+        self._sync(k)
+
+    def _sync(self, k):
+        """Copy one robot's position and next due time into the arrays"""
+        robot = self.robots[k]
+        self.positions[k] = robot.current.get_pos()
+        if robot.index < len(robot.path):
+            self.next_times[k] = robot.depart_time + robot.index * self.step_time
+        else:
+            step = self.reservations.step_at(self.clock.now())
+            self.next_times[k] = (step + 1) * self.step_time
+
+    def robot_at(self, row, col):
+        """Robot currently on a cell, or None"""
+        hits = np.flatnonzero((self.positions[:, 0] == row) & (self.positions[:, 1] == col))
+        return self.robots[int(hits[0])] if len(hits) else None
+
+    def done(self):
+        """Check if every robot has finished its targets"""
+        return not self.active.any()
+
+    def clear(self):
+        """Remove every robot"""
+        self.robots.clear()
+        self.pending.clear()
+        self.reservations.clear()
+        self.positions = np.zeros((0, 2), dtype=np.int32)
+        self.next_times = np.zeros(0)
+        self.active = np.zeros(0, dtype=bool)
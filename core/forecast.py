@@ -0,0 +1,74 @@
+"""
+Short-horizon occupancy forecast of the dynamic obstacles
+
+A forecast holds, per cell, the time spans in which an obstacle is expected
+on it during the next `horizon` seconds. Path followers are fully
+predictable: they walk a known cell sequence with move intervals drawn
+ahead of time, so their spans are exact up to the clock tick. Random
+walkers are only known until their next move; after it they may be on
+their cell or any neighbour for their shortest possible interval.
+
+blocked_callback() turns the forecast into the `blocked` callback of
+spacetime_search, so timed plans wait for or route around an obstacle
+before meeting it instead of replanning once it is in the way.
+"""
+
+
+class ObstacleForecast:
+    """Expected obstacle time spans per cell over a horizon"""
+
+    def __init__(self, start_time, horizon):
+        self.start_time = start_time
+        self.end_time = start_time + horizon
+        self.spans = {}    # flat index -> [(from_time, to_time)]
+        self.sources = []  # Extra occupied(index, from_time, to_time) queries, e.g. a swarm's
+        self.source_cells = set()  # Cells the extra queries may answer True for
+
+    def add(self, index, from_time, to_time):
+        """Expect an obstacle on a cell over [from_time, to_time), clipped to the horizon"""
+        from_time = max(from_time, self.start_time)
+        to_time = min(to_time, self.end_time)
+        if from_time < to_time:
+            self.spans.setdefault(index, []).append((from_time, to_time))
+
+    def add_source(self, occupied, cells):
+        """Consult occupied(index, from_time, to_time) too, for obstacles answered lazily
+
+        `cells` are the flat indices it may report as occupied.
+        """
+        self.sources.append(occupied)
+        self.source_cells.update(cells)
+
+    def cells(self):
+        """Set of flat indices an obstacle may be expected on within the horizon"""
+        return self.source_cells.union(self.spans)
+
+    def occupied(self, index, from_time, to_time):
+        """Check if an obstacle is expected on a cell at any time in [from_time, to_time)"""
+        if from_time >= self.end_time:
+            return False
+        to_time = min(to_time, self.end_time)
+        for start, end in self.spans.get(index, ()):
+            if start < to_time and from_time < end:
+                return True
+        return any(source(index, from_time, to_time) for source in self.sources)
+
+    def steps(self, start_time, step_time):
+        """Last plan step (step k at start_time + k * step_time) the forecast can refuse"""
+        return max(0, int((self.end_time - start_time) / step_time) + 1)
+
+    def blocked_callback(self, start_time, step_time, slack=0.0, blocked=None):
+        """`blocked(from_index, to_index, step)` for spacetime_search
+
+        Arriving at step k means holding the cell from start_time + k *
+        step_time until the next step; the arrival is refused if an obstacle
+        is expected there in that time, widened by `slack` on both sides.
+        Another callback (a reservation table's) is checked first if given.
+        """
+        def forecast_blocked(from_index, to_index, step):
+            if blocked is not None and blocked(from_index, to_index, step):
+                return True
+            arrive = start_time + step * step_time
+            return self.occupied(to_index, arrive - slack, arrive + step_time + slack)
+
+        return forecast_blocked
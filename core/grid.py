@@ -6,27 +6,103 @@ import pygame
 from config.constants import *
 from config.settings import *
 from .spot import Spot
+from .grid_state import GridState, KIND_MASK, BARRIER, TRAFFIC
 
-def make_grid(rows, width):
-    """Create a grid of Spot objects"""
-    grid = []
-    gap = width // rows
+class Grid(list):
+    """Rows of Spot views over a shared GridState"""
+
+    def __init__(self, state, cell_size=CELL_SIZE):
+        super().__init__()
+        self.state = state
+        self.cell_size = cell_size
+        self.map_name = None  # Name of the saved map this grid was loaded from
+
+    def created_spots(self):
+        """Spots that have been created so far, without creating the rest"""
+        for row in self:
+            for spot in row.spots:
+                if spot is not None:
+                    yield spot
+
+    def refresh(self, indices):
+        """Re-derive the colors of already created spots after a bulk write to the state layers"""
+        cols = self.state.cols
+        for index in indices:
+            row, col = divmod(index, cols)
+            spot = self[row].spots[col]
+            if spot is not None:
+                spot.sync_color()
+
+class SpotRow:
+    """One row of a Grid; each Spot view is created the first time it is used
+
+    Everything a planner needs lives in the GridState, so on large maps
+    most cells never need a Spot at all.
+    """
+
+    __slots__ = ("grid", "row", "spots")
+
+    def __init__(self, grid, row, cols):
+        self.grid = grid
+        self.row = row
+        self.spots = [None] * cols
+
+    def __len__(self):
+        return len(self.spots)
+
+    def __getitem__(self, col):
+        if isinstance(col, slice):
+            return [self[c] for c in range(*col.indices(len(self.spots)))]
+        spot = self.spots[col]
+        if spot is None:
+            spot = self._make(col % len(self.spots))
+        return spot
+
+    def __iter__(self):
+        for col in range(len(self.spots)):
+            yield self[col]
+
+    def _make(self, col):
+        grid = self.grid
+        state = grid.state
+        spot = Spot(self.row, col, grid.cell_size, state.rows, state, state.cols)
+        spot.grid = grid
+        self.spots[col] = spot
+        # Spots over a filled-in cell take their color from the state layers
+        if state.flags[spot.index] & (KIND_MASK | TRAFFIC):
+            spot.sync_color()
+        return spot
+
+def make_grid(rows, cols=None, state=None, cell_size=CELL_SIZE):
+    """Create a rows x cols grid of Spot views backed by a GridState
+
+    Spots are laid out in world pixels, `cell_size` per cell, independent
+    of the window; the renderer's camera maps them to the screen. They are
+    created on first access, so building a grid over a large (e.g. loaded)
+    state costs next to nothing.
+    """
+    cols = rows if cols is None else cols
+    existing = state is not None
+    if not existing:
+        state = GridState(rows, cols)
+    grid = Grid(state, cell_size)
     for i in range(rows):
-        grid.append([])
-        for j in range(rows):
-            grid[i].append(Spot(i, j, gap, rows))
+        grid.append(SpotRow(grid, i, cols))
+    if existing:
+        # Create the spots the renderer draws over the background right away
+        for r, c in state.cells_with((KIND_MASK & ~BARRIER) | TRAFFIC):
+            grid[r][c]
     return grid
 
-def get_clicked_pos(pos, rows, width):
-    """Get the grid position from mouse click coordinates"""
-    gap = width // rows
+def get_clicked_pos(pos, gap=CELL_SIZE):
+    """Get the grid position under a point in world pixels"""
     y, x = pos
-    return y // gap, x // gap
+    return int(y // gap), int(x // gap)
 
-def draw_grid(win, rows, width):
+def draw_grid(win, rows, cols, gap):
     """Draw the grid lines"""
-    gap = width // rows
-    for i in range(rows):
+    width, height = rows * gap, cols * gap
+    for i in range(cols + 1):
         pygame.draw.line(win, GRAY, (0, i * gap), (width, i * gap))
-        for j in range(rows):
-            pygame.draw.line(win, GRAY, (j * gap, 0), (j * gap, width))
\ No newline at end of file
+    for j in range(rows + 1):
+        pygame.draw.line(win, GRAY, (j * gap, 0), (j * gap, height))
@@ -0,0 +1,349 @@
+"""
+Compact array-backed grid state shared by the planners and obstacles
+"""
+
+import hashlib
+from array import array
+from collections import deque
+import numpy as np
+
+# Cell flag bits
+BARRIER = 1
+DYNAMIC = 2
+TRAFFIC = 4
+START = 8
+END = 16
+
+# Flags that make a cell impassable on their own
+BLOCKING = BARRIER | DYNAMIC
+# Flags describing what occupies a cell (mutually exclusive, like the old colors)
+KIND_MASK = BARRIER | DYNAMIC | START | END
+# Flags whose changes matter to planners (start/end markers do not)
+PLANNING_MASK = BARRIER | DYNAMIC | TRAFFIC
+
+# Light layer values
+LIGHT_GREEN = 0
+LIGHT_YELLOW = 1
+LIGHT_RED = 2
+LIGHT_STATES = ("green", "yellow", "red")
+LIGHT_CODES = {name: code for code, name in enumerate(LIGHT_STATES)}
+
+# Movement offsets (8-connected) and their base step costs
+DIRECTIONS = [(0, 1), (1, 0), (-1, 0), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1)]
+DIAGONAL_COST = 1.41
+
+# Recent changes kept for incremental consumers: at most this many
+# records, and at most CHANGE_LOG_CELLS cells over all of them
+CHANGE_LOG_SIZE = 4096
+CHANGE_LOG_CELLS = 1 << 16
+
+
+class ChangeLog:
+    """Bounded log of (version, cells) records, cells being a flat index or an array of them"""
+
+    def __init__(self, size=CHANGE_LOG_SIZE, max_cells=CHANGE_LOG_CELLS):
+        self.records = deque()
+        self.size = size
+        self.max_cells = max_cells
+        self.cells = 0   # Cells over all records
+        self.floor = 0   # Oldest version the log still covers
+
+    def add(self, version, cells, count=1):
+        """Record `count` changed cells (one index, or an array of `count`) at a version"""
+        records = self.records
+        records.append((version, cells))
+        self.cells += count
+        while len(records) > self.size or (self.cells > self.max_cells and len(records) > 1):
+            old_version, old = records.popleft()
+            self.floor = old_version
+            self.cells -= old.size if isinstance(old, np.ndarray) else 1
+
+    def reset(self, version):
+        """Forget every record; only consumers at `version` or later stay covered"""
+        self.records.clear()
+        self.cells = 0
+        self.floor = version
+
+    def since(self, version):
+        """Set of cells recorded after `version`, or None if the log no longer covers it"""
+        if version < self.floor:
+            return None
+        cells = set()
+        for changed_version, changed in reversed(self.records):
+            if changed_version <= version:
+                break
+            if isinstance(changed, np.ndarray):
+                cells.update(changed.tolist())
+            else:
+                cells.add(changed)
+        return cells
+
+
+class GridState:
+    """Per-cell layers stored as flat byte/float arrays indexed by row * cols + col.
+
+    The flat arrays are what the planners index in their inner loops; the
+    *_view attributes are NumPy views over the same memory for whole-grid
+    vectorized queries.
+
+    Every change that affects planning bumps `version` and is recorded in a
+    bounded change log, so incremental consumers can ask which cells changed
+    since the version they last saw. Changes to the static layout (barriers
+    and costs) also go to a second log, so consumers of the layout alone
+    skip the churn of moving obstacles and lights.
+    """
+
+    def __init__(self, rows, cols=None, flags=None, light=None, cost=None):
+        self.rows = rows
+        self.cols = rows if cols is None else cols
+        size = self.rows * self.cols
+        # Layers may be passed in (e.g. views of a memory-mapped map file);
+        # they are used as they are, without copying
+        self.flags = bytearray(size) if flags is None else flags
+        self.light = bytearray(size) if light is None else light
+        self.cost = array('f', [1.0]) * size if cost is None else cost
+        self._make_views()
+
+        # Number of cells whose cost differs from the default of 1
+        self.custom_costs = 0
+        if cost is not None:
+            self.recount_costs()
+
+        # Cells whose appearance changed since the renderer last drew them
+        self.dirty_cells = set()
+
+        # Traffic light phase offsets by flat index; lights_version changes
+        # whenever a light is added, removed or re-phased
+        self.light_start = {}
+        self.lights_version = 0
+
+        # Change tracking
+        self.version = 0
+        self.layout_version = 0  # Version of the latest barrier or cost change
+        self._changes = ChangeLog()
+        self._layout_changes = ChangeLog()
+        self._signature = None  # (layout_version, static_signature())
+        self._cost_floor = None  # (layout_version, cost_floor())
+
+    def _make_views(self):
+        """(Re)create the NumPy views over the flat layers"""
+        shape = (self.rows, self.cols)
+        self.flags_view = np.frombuffer(self.flags, dtype=np.uint8).reshape(shape)
+        self.light_view = np.frombuffer(self.light, dtype=np.uint8).reshape(shape)
+        self.cost_view = np.frombuffer(self.cost, dtype=np.float32).reshape(shape)
+
+    def index(self, row, col):
+        """Flat index of a cell"""
+        return row * self.cols + col
+
+    def position(self, index):
+        """Cell (row, col) of a flat index"""
+        return divmod(index, self.cols)
+
+    def in_bounds(self, row, col):
+        """Check if a cell lies inside the grid"""
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    # ----- Change tracking -----
+    def touch(self, index, layout=False):
+        """Record that the cell at a flat index changed (`layout`: its barrier or cost)"""
+        self.version += 1
+        self._changes.add(self.version, index)
+        if layout:
+            self.layout_version = self.version
+            self._layout_changes.add(self.version, index)
+
+    def touch_all(self):
+        """Record a change to the whole grid (incremental consumers must rebuild)"""
+        self.version += 1
+        self.layout_version = self.version
+        self._changes.reset(self.version)
+        self._layout_changes.reset(self.version)
+
+    def changes_since(self, version):
+        """Set of flat indices changed after `version`, or None if the log no longer covers it"""
+        if version >= self.version:
+            return set()
+        return self._changes.since(version)
+
+    def layout_changes_since(self, version):
+        """Like changes_since, for barrier and cost changes only"""
+        if version >= self.layout_version:
+            return set()
+        return self._layout_changes.since(version)
+
+    # ----- Flags -----
+    def has(self, row, col, flag):
+        """Check if any of the given flag bits are set on a cell"""
+        return bool(self.flags[row * self.cols + col] & flag)
+
+    def _write_flags(self, i, value):
+        """Store a cell's flags, logging the change if planners care about it"""
+        old = self.flags[i]
+        self.flags[i] = value
+        if (old ^ value) & PLANNING_MASK:
+            self.touch(i, bool((old ^ value) & BARRIER))
+            if (old ^ value) & TRAFFIC:
+                if not value & TRAFFIC:
+                    self.light_start.pop(i, None)
+                self.lights_version += 1
+
+    def set_flag(self, row, col, flag):
+        """Set flag bits on a cell"""
+        i = row * self.cols + col
+        self._write_flags(i, self.flags[i] | flag)
+
+    def clear_flag(self, row, col, flag):
+        """Clear flag bits on a cell"""
+        i = row * self.cols + col
+        self._write_flags(i, self.flags[i] & ~flag & 0xFF)
+
+    def set_kind(self, row, col, kind):
+        """Replace what occupies a cell (barrier/dynamic/start/end), keeping other bits"""
+        i = row * self.cols + col
+        self._write_flags(i, (self.flags[i] & ~KIND_MASK & 0xFF) | kind)
+
+    def _write_flags_at(self, indices, values):
+        """Bulk _write_flags over an array of flat indices; returns the indices that changed
+
+        No spot sees the write, so the changed cells are also marked dirty here.
+        """
+        flat = self.flags_view.reshape(-1)
+        old = flat[indices]
+        flat[indices] = values
+        diff = old ^ values
+        changed = indices[diff != 0]
+        self.dirty_cells.update(changed.tolist())
+        logged = indices[diff & PLANNING_MASK != 0]
+        if len(logged):
+            # One record for the whole batch, however many cells it moved
+            self.version += 1
+            self._changes.add(self.version, logged.copy(), len(logged))
+            layout = logged[diff[diff & PLANNING_MASK != 0] & BARRIER != 0]
+            if len(layout):
+                self.layout_version = self.version
+                self._layout_changes.add(self.version, layout.copy(), len(layout))
+        lights = diff & TRAFFIC != 0
+        if lights.any():
+            for i in indices[lights & (values & TRAFFIC == 0)].tolist():
+                self.light_start.pop(i, None)
+            self.lights_version += 1
+        return changed
+
+    def set_flags_at(self, indices, flag):
+        """Set flag bits on the cells of an array of flat indices; returns those that changed"""
+        indices = np.asarray(indices, dtype=np.intp)
+        return self._write_flags_at(indices, self.flags_view.reshape(-1)[indices] | flag)
+
+    def clear_flags_at(self, indices, flag):
+        """Clear flag bits on the cells of an array of flat indices; returns those that changed"""
+        indices = np.asarray(indices, dtype=np.intp)
+        return self._write_flags_at(indices, self.flags_view.reshape(-1)[indices] & (~flag & 0xFF))
+
+    # ----- Costs and lights -----
+    def get_cost(self, row, col):
+        """Movement cost multiplier of a cell"""
+        return self.cost[row * self.cols + col]
+
+    def set_cost(self, row, col, cost):
+        """Set the movement cost multiplier of a cell"""
+        i = row * self.cols + col
+        old = self.cost[i]
+        if old != cost:
+            self.cost[i] = cost
+            self.custom_costs += (cost != 1) - (old != 1)
+            self.touch(i, True)
+
+    def has_uniform_cost(self):
+        """Check if every cell has the default movement cost"""
+        return self.custom_costs == 0
+
+    def cost_floor(self):
+        """Smallest movement cost multiplier on the grid, capped at 1
+
+        Distance bounds counted in steps (octile, Chebyshev) are scaled by it
+        so they stay lower bounds when some cells are cheaper than the default.
+        """
+        if self._cost_floor is None or self._cost_floor[0] != self.layout_version:
+            floor = min(1.0, float(self.cost_view.min())) if self.cost else 1.0
+            self._cost_floor = (self.layout_version, max(0.0, floor))
+        return self._cost_floor[1]
+
+    def recount_costs(self):
+        """Recompute custom_costs after the cost layer was written in bulk"""
+        self.custom_costs = int(np.count_nonzero(self.cost_view != 1))
+
+    def get_light(self, row, col):
+        """Traffic light state name of a cell"""
+        return LIGHT_STATES[self.light[row * self.cols + col]]
+
+    def set_light(self, row, col, state):
+        """Set the traffic light state of a cell by name"""
+        i = row * self.cols + col
+        code = LIGHT_CODES[state]
+        if self.light[i] != code:
+            self.light[i] = code
+            self.touch(i)
+
+    def get_light_start(self, row, col):
+        """Simulation time at which a cell's light cycle started"""
+        return self.light_start.get(row * self.cols + col, 0.0)
+
+    def set_light_start(self, row, col, start):
+        """Set the phase offset of a cell's light cycle"""
+        self.light_start[row * self.cols + col] = start
+        self.lights_version += 1
+
+    # ----- Passability -----
+    def is_passable_index(self, i):
+        """Check if the cell at a flat index can be entered right now"""
+        f = self.flags[i]
+        if f & BLOCKING:
+            return False
+        return not (f & TRAFFIC and self.light[i] == LIGHT_RED)
+
+    def is_passable(self, row, col):
+        """Check if a cell can be entered right now"""
+        return self.is_passable_index(row * self.cols + col)
+
+    def passable_neighbors(self, row, col):
+        """(row, col) of the 8-connected neighbors that can be entered right now"""
+        rows, cols = self.rows, self.cols
+        result = []
+        for dr, dc in DIRECTIONS:
+            r, c = row + dr, col + dc
+            if 0 <= r < rows and 0 <= c < cols and self.is_passable_index(r * cols + c):
+                result.append((r, c))
+        return result
+
+    def passable_mask(self):
+        """Boolean (rows, cols) array of cells that can be entered right now"""
+        red = ((self.flags_view & TRAFFIC) != 0) & (self.light_view == LIGHT_RED)
+        return ((self.flags_view & BLOCKING) == 0) & ~red
+
+    def cells_with(self, flag):
+        """List of (row, col) cells with any of the given flag bits set"""
+        return [tuple(pos) for pos in np.argwhere(self.flags_view & flag).tolist()]
+
+    def static_signature(self):
+        """Digest of the static layout (barriers and cell costs) for caching derived data"""
+        if self._signature is None or self._signature[0] != self.layout_version:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(np.ascontiguousarray(self.flags_view & BARRIER).tobytes())
+            digest.update(self.cost_view.tobytes())
+            self._signature = (self.layout_version, digest.hexdigest())
+        return self._signature[1]
+
+    def count(self, flag):
+        """Number of cells with any of the given flag bits set"""
+        return int(np.count_nonzero(self.flags_view & flag))
+
+    def clear(self):
+        """Reset every layer to an empty grid"""
+        self.flags_view[:] = 0
+        self.light_view[:] = 0
+        self.cost_view[:] = 1.0
+        self.custom_costs = 0
+        self.light_start.clear()
+        self.lights_version += 1
+        self.touch_all()
@@ -0,0 +1,414 @@
+"""
+Hierarchical pathfinding (HPA*) over a GridState
+
+The grid is split into square clusters. Wherever two neighbouring clusters
+share a run of open border cells, one or two entrances (pairs of facing
+cells) become nodes of an abstract graph. Nodes inside a cluster are
+joined by the costs of the shortest paths between them within the cluster.
+A query searches this small graph and then refines only the clusters the
+abstract path passes through.
+
+The abstract graph follows the static layout (barriers and cell costs).
+Dynamic obstacles and lights are honoured when refining, and a plain A*
+over the whole grid covers the rare case where they block a refinement.
+When the layout changes, only the clusters around the changed cells are
+rebuilt. Intra-cluster costs are computed the first time a search reaches
+a cluster and kept until the cluster changes.
+"""
+
+import heapq
+import weakref
+from array import array
+import numpy as np
+from config.constants import HPA_CLUSTER_SIZE
+from .grid_state import DIRECTIONS, DIAGONAL_COST, BARRIER
+from .search import astar_search, octile
+
+INF = float("inf")
+# Border runs at least this long get an entrance at each end instead of one in the middle
+WIDE_ENTRANCE = 6
+# Clusters whose intra costs are computed together in one vectorized pass
+INTRA_BATCH = 256
+
+_planners = weakref.WeakKeyDictionary()  # GridState -> HPAPlanner
+
+
+def _merge_stats(total, part):
+    """Add one search's stats dict to a running total (peak open size kept)"""
+    total['expanded'] = total.get('expanded', 0) + part.get('expanded', 0)
+    total['pushes'] = total.get('pushes', 0) + part.get('pushes', 0)
+    total['max_open'] = max(total.get('max_open', 0), part.get('max_open', 0))
+
+
+class HPAPlanner:
+    def __init__(self, state, cluster_size=HPA_CLUSTER_SIZE):
+        self.state = state
+        self.size = cluster_size
+        self.cluster_rows = -(-state.rows // cluster_size)
+        self.cluster_cols = -(-state.cols // cluster_size)
+        self.expanded = 0
+        self.rebuild()
+
+    # ----- Layout snapshot -----
+    def rebuild(self):
+        """Rebuild the whole abstract graph from the current layout"""
+        state = self.state
+        self.blocked = bytearray(np.ascontiguousarray(state.flags_view & BARRIER).tobytes())
+        self.cost = array('f', state.cost)
+        self.version = state.version
+        self.border_pairs = {}  # border key -> [(cell, cell)] entrance pairs
+        self.node_refs = {}     # node -> number of entrance pairs using it
+        self.cluster_nodes = {}  # cluster -> set of nodes
+        self.inter = {}         # node -> {node across a border: cost}
+        self.intra = {}         # cluster -> {node: {node: cost}}, filled lazily
+        for cr in range(self.cluster_rows):
+            for cc in range(self.cluster_cols):
+                self.cluster_nodes[(cr, cc)] = set()
+        for cr in range(self.cluster_rows):
+            for cc in range(self.cluster_cols):
+                if cc:
+                    self._build_border(('v', cr, cc))
+                if cr:
+                    self._build_border(('h', cr, cc))
+
+    def sync(self):
+        """Apply layout changes logged since the last sync to the affected clusters only"""
+        state = self.state
+        if self.version >= state.layout_version:
+            self.version = state.version
+            return  # Only dynamic obstacles or lights changed
+        changes = state.layout_changes_since(self.version)
+        if changes is None:
+            self.rebuild()
+            return
+        self.version = state.version
+
+        cols, size = state.cols, self.size
+        flags, cost = state.flags, state.cost
+        touched = set()
+        for index in changes:
+            is_blocked = 1 if flags[index] & BARRIER else 0
+            if is_blocked == self.blocked[index] and cost[index] == self.cost[index]:
+                continue  # Dynamic obstacle or light change
+            self.blocked[index] = is_blocked
+            self.cost[index] = cost[index]
+            row, col = divmod(index, cols)
+            touched.add((row // size, col // size))
+
+        for cr, cc in touched:
+            for key in (('v', cr, cc), ('v', cr, cc + 1), ('h', cr, cc), ('h', cr + 1, cc)):
+                if key in self.border_pairs or self._border_exists(key):
+                    self._build_border(key)
+            for neighbor in ((cr, cc), (cr - 1, cc), (cr + 1, cc), (cr, cc - 1), (cr, cc + 1)):
+                self.intra.pop(neighbor, None)
+
+    # ----- Clusters and entrances -----
+    def cluster_of(self, index):
+        row, col = divmod(index, self.state.cols)
+        return row // self.size, col // self.size
+
+    def _bounds(self, cluster):
+        """(first row, end row, first col, end col) of a cluster"""
+        cr, cc = cluster
+        size = self.size
+        return (cr * size, min((cr + 1) * size, self.state.rows),
+                cc * size, min((cc + 1) * size, self.state.cols))
+
+    def _border_exists(self, key):
+        kind, cr, cc = key
+        if kind == 'v':
+            return 0 < cc < self.cluster_cols and 0 <= cr < self.cluster_rows
+        return 0 < cr < self.cluster_rows and 0 <= cc < self.cluster_cols
+
+    def _build_border(self, key):
+        """(Re)create the entrances on the border left of ('v') or above ('h') a cluster"""
+        for a, b in self.border_pairs.pop(key, ()):
+            self.inter[a].pop(b, None)
+            self.inter[b].pop(a, None)
+            self._release(a)
+            self._release(b)
+
+        kind, cr, cc = key
+        cols, size = self.state.cols, self.size
+        r0, r1, c0, c1 = self._bounds((cr, cc))
+        if kind == 'v':
+            # Cells left of the border face cells in column c0
+            line = [(r * cols + c0 - 1, r * cols + c0) for r in range(r0, r1)]
+        else:
+            line = [((r0 - 1) * cols + c, r0 * cols + c) for c in range(c0, c1)]
+
+        pairs = []
+        run = []
+        for a, b in line + [(None, None)]:
+            if a is not None and not self.blocked[a] and not self.blocked[b]:
+                run.append((a, b))
+                continue
+            if run:
+                if len(run) >= WIDE_ENTRANCE:
+                    pairs.extend((run[0], run[-1]))
+                else:
+                    pairs.append(run[len(run) // 2])
+                run = []
+
+        for a, b in pairs:
+            self._retain(a)
+            self._retain(b)
+            self.inter[a][b] = float(self.cost[b])
+            self.inter[b][a] = float(self.cost[a])
+        self.border_pairs[key] = pairs
+
+    def _retain(self, node):
+        if node not in self.node_refs:
+            self.node_refs[node] = 0
+            self.inter[node] = {}
+            cluster = self.cluster_of(node)
+            self.cluster_nodes[cluster].add(node)
+            self.intra.pop(cluster, None)
+        self.node_refs[node] += 1
+
+    def _release(self, node):
+        self.node_refs[node] -= 1
+        if not self.node_refs[node]:
+            del self.node_refs[node]
+            del self.inter[node]
+            cluster = self.cluster_of(node)
+            self.cluster_nodes[cluster].discard(node)
+            self.intra.pop(cluster, None)
+
+    # ----- Intra-cluster costs -----
+    def _distances(self, source, bounds, targets, reverse=False):
+        """Static path costs within `bounds` from `source` to each target (to source if `reverse`)"""
+        cols = self.state.cols
+        row_lo, row_hi, col_lo, col_hi = bounds
+        blocked, cost = self.blocked, self.cost
+        remaining = set(targets)
+        found = {}
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        pop, push = heapq.heappop, heapq.heappush
+        while heap and remaining:
+            d, current = pop(heap)
+            if d > dist[current]:
+                continue
+            if current in remaining:
+                remaining.discard(current)
+                found[current] = d
+            row, col = divmod(current, cols)
+            for dr, dc in DIRECTIONS:
+                r = row + dr
+                c = col + dc
+                if r < row_lo or r >= row_hi or c < col_lo or c >= col_hi:
+                    continue
+                neighbor = r * cols + c
+                if blocked[neighbor]:
+                    continue
+                entered = current if reverse else neighbor
+                nd = d + (DIAGONAL_COST if dr and dc else 1) * cost[entered]
+                if nd < dist.get(neighbor, INF):
+                    dist[neighbor] = nd
+                    push(heap, (nd, neighbor))
+        return found
+
+    def _intra(self, cluster):
+        """Costs between the entrance nodes of a cluster, computed on first use"""
+        edges = self.intra.get(cluster)
+        if edges is None:
+            self._compute_intra([cluster])
+            edges = self.intra[cluster]
+        return edges
+
+    def _compute_intra(self, clusters):
+        """Fill in intra costs for several clusters at once
+
+        Runs a vectorized Bellman-Ford from every entrance node of every
+        cluster in the batch simultaneously: each round relaxes all eight
+        move directions with array shifts until no distance improves.
+        """
+        state = self.state
+        rows, cols, size = state.rows, state.cols, self.size
+        blocked = np.frombuffer(self.blocked, dtype=np.uint8).reshape(rows, cols)
+        cost = np.frombuffer(self.cost, dtype=np.float32).reshape(rows, cols)
+        pad = size + 2
+        inner = (slice(None), slice(None), slice(1, -1), slice(1, -1))
+        # Batch clusters with similar node counts so little padding is wasted
+        clusters = sorted(clusters, key=lambda cluster: len(self.cluster_nodes[cluster]))
+
+        for first in range(0, len(clusters), INTRA_BATCH):
+            batch = clusters[first:first + INTRA_BATCH]
+            node_lists = [sorted(self.cluster_nodes[cluster]) for cluster in batch]
+            k = max(len(nodes) for nodes in node_lists)
+            if k < 2:
+                for cluster, nodes in zip(batch, node_lists):
+                    self.intra[cluster] = {node: {} for node in nodes}
+                continue
+
+            # Cluster windows padded with a blocked border
+            open_cells = np.zeros((len(batch), 1, pad, pad), dtype=bool)
+            enter = np.zeros((len(batch), 1, pad, pad), dtype=np.float32)
+            dist = np.full((len(batch), k, pad, pad), np.inf, dtype=np.float32)
+            for b, (cluster, nodes) in enumerate(zip(batch, node_lists)):
+                r0, r1, c0, c1 = self._bounds(cluster)
+                open_cells[b, 0, 1:1 + r1 - r0, 1:1 + c1 - c0] = blocked[r0:r1, c0:c1] == 0
+                enter[b, 0, 1:1 + r1 - r0, 1:1 + c1 - c0] = cost[r0:r1, c0:c1]
+                for j, node in enumerate(nodes):
+                    r, c = divmod(node, cols)
+                    dist[b, j, r - r0 + 1, c - c0 + 1] = 0.0
+
+            mask = open_cells[inner]
+            moves = [(dr, dc, (DIAGONAL_COST if dr and dc else 1) * enter[inner])
+                     for dr, dc in DIRECTIONS]
+            best = np.empty_like(dist[inner])
+            candidate = np.empty_like(best)
+            while True:
+                best[...] = dist[inner]
+                for dr, dc, step_cost in moves:
+                    # Neighbor (row - dr, col - dc) stepping into each cell
+                    source = dist[:, :, 1 - dr:pad - 1 - dr, 1 - dc:pad - 1 - dc]
+                    np.add(source, step_cost, out=candidate)
+                    np.minimum(best, candidate, out=best)
+                np.copyto(best, np.inf, where=~mask)
+                if np.array_equal(best, dist[inner]):
+                    break
+                dist[inner] = best
+
+            for b, (cluster, nodes) in enumerate(zip(batch, node_lists)):
+                r0, _, c0, _ = self._bounds(cluster)
+                local_r = [node // cols - r0 + 1 for node in nodes]
+                local_c = [node % cols - c0 + 1 for node in nodes]
+                between = dist[b][:, local_r, local_c].tolist()
+                self.intra[cluster] = {
+                    node: {other: between[j][m] for m, other in enumerate(nodes)
+                           if m != j and between[j][m] != INF}
+                    for j, node in enumerate(nodes)
+                }
+
+    def build_all(self):
+        """Compute every cluster's intra costs up front instead of on first use"""
+        self._compute_intra([cluster for cluster in self.cluster_nodes if cluster not in self.intra])
+
+    # ----- Queries -----
+    def plan(self, start, goal, stats=None):
+        """Path between two (row, col) cells as a list of (row, col), or None
+
+        If a `stats` dict is given, the expansions and heap pushes of the
+        abstract search and every refinement are summed into it, along with
+        the largest heap size of any of them.
+        """
+        self.sync()
+        state = self.state
+        start_i, goal_i = state.index(*start), state.index(*goal)
+        if stats is not None:
+            stats.update(expanded=0, pushes=0, max_open=0)
+        if self.blocked[goal_i]:
+            return None
+        abstract = self._abstract_path(start_i, goal_i, stats)
+        if abstract is None:
+            return None
+        cells = self._refine(abstract, stats)
+        if cells is None:
+            # A dynamic obstacle or light blocks the chosen clusters
+            part = None if stats is None else {}
+            cells = astar_search(state, start, goal, stats=part)
+            if part is not None:
+                _merge_stats(stats, part)
+        return cells
+
+    def _abstract_path(self, start_i, goal_i, stats=None):
+        """Search the abstract graph with start and goal temporarily inserted"""
+        cols = self.state.cols
+        start_cluster = self.cluster_of(start_i)
+        goal_cluster = self.cluster_of(goal_i)
+        start_bounds = self._bounds(start_cluster)
+        goal_bounds = self._bounds(goal_cluster)
+
+        start_edges = self._distances(start_i, start_bounds, self.cluster_nodes[start_cluster])
+        goal_edges = self._distances(goal_i, goal_bounds, self.cluster_nodes[goal_cluster], reverse=True)
+        if start_cluster == goal_cluster:
+            direct = self._distances(start_i, start_bounds, (goal_i,))
+            start_edges.update(direct)
+
+        g_score = {start_i: 0.0}
+        came_from = {}
+        floor = self.state.cost_floor()
+        heap = [(octile(start_i, goal_i, cols) * floor, 0, start_i, 0.0)]
+        push, pop = heapq.heappush, heapq.heappop
+        count = 0
+        expanded = 0
+        found = False
+        track = stats is not None
+        peak = 1
+        while heap:
+            _, _, current, current_g = pop(heap)
+            if current_g > g_score[current]:
+                continue
+            if current == goal_i:
+                found = True
+                break
+            expanded += 1
+            moves = []
+            if current == start_i:
+                moves.append(start_edges)
+            if current in self.inter:
+                moves.append(self.inter[current])
+                moves.append(self._intra(self.cluster_of(current)).get(current, {}))
+            for edges in moves:
+                for neighbor, cost in edges.items():
+                    tentative = current_g + cost
+                    if tentative < g_score.get(neighbor, INF):
+                        g_score[neighbor] = tentative
+                        came_from[neighbor] = current
+                        count += 1
+                        push(heap, (tentative + octile(neighbor, goal_i, cols) * floor, count,
+                                    neighbor, tentative))
+                        if track and len(heap) > peak:
+                            peak = len(heap)
+            if current in goal_edges:
+                tentative = current_g + goal_edges[current]
+                if tentative < g_score.get(goal_i, INF):
+                    g_score[goal_i] = tentative
+                    came_from[goal_i] = current
+                    count += 1
+                    push(heap, (tentative, count, goal_i, tentative))
+                    if track and len(heap) > peak:
+                        peak = len(heap)
+
+        self.expanded = expanded
+        if track:
+            _merge_stats(stats, {'expanded': expanded, 'pushes': count + 1, 'max_open': peak})
+        if not found:
+            return None
+        path = [goal_i]
+        while path[-1] != start_i:
+            path.append(came_from[path[-1]])
+        path.reverse()
+        return path
+
+    def _refine(self, abstract, stats=None):
+        """Expand consecutive abstract nodes into cells, searching only their cluster"""
+        state = self.state
+        position = state.position
+        cells = [position(abstract[0])]
+        for a, b in zip(abstract, abstract[1:]):
+            if b in self.inter.get(a, ()):
+                # Entrance pair: a single step across the border
+                if not state.is_passable_index(b):
+                    return None
+                cells.append(position(b))
+                continue
+            part = None if stats is None else {}
+            segment = astar_search(state, position(a), position(b), bounds=self._bounds(self.cluster_of(a)),
+                                   stats=part)
+            if part is not None:
+                _merge_stats(stats, part)
+            if segment is None:
+                return None
+            cells.extend(segment[1:])
+        return cells
+
+
+def hpa_for(state):
+    """The shared HPA* planner of a grid state"""
+    planner = _planners.get(state)
+    if planner is None:
+        planner = _planners[state] = HPAPlanner(state)
+    return planner
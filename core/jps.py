@@ -0,0 +1,174 @@
+"""
+Jump Point Search over a GridState
+
+JPS finds the same optimal paths as A* on uniform-cost 8-connected grids
+but only pushes "jump points" (cells where the optimal route may turn) onto
+the heap, skipping across open stretches in a straight line. It assumes
+every passable cell has the default cost of 1; use astar_search otherwise.
+The movement model matches Spot.update_neighbors: diagonal moves may cut
+past blocked corners.
+"""
+
+import heapq
+import numpy as np
+from .grid_state import DIRECTIONS, DIAGONAL_COST
+
+INF = float("inf")
+
+
+def _sign(value):
+    return (value > 0) - (value < 0)
+
+
+def jps_search(state, start, goal, stats=None):
+    """Find a path between two (row, col) cells with Jump Point Search
+
+    Returns the full cell-by-cell path as a list of (row, col) including both
+    ends, or None. If a `stats` dict is given, the number of expanded jump
+    points, heap pushes and the largest heap size are stored in it.
+    """
+    # Passability snapshot padded with a blocked border, so the scans below
+    # index it by flat offset without any bounds checks
+    width = state.cols + 2
+    walkable = np.pad(state.passable_mask(), 1).astype(np.uint8).tobytes()
+    start_p = (start[0] + 1) * width + start[1] + 1
+    goal_p = (goal[0] + 1) * width + goal[1] + 1
+    goal_row, goal_col = divmod(goal_p, width)
+    diagonal_extra = DIAGONAL_COST - 1
+    if not walkable[goal_p]:
+        if stats is not None:
+            stats.update(expanded=0, pushes=0, max_open=0)
+        return None
+
+    def jump(p, dr, dc):
+        """Walk from p in direction (dr, dc) until a jump point, the goal or a wall"""
+        step = dr * width + dc
+        if dr and dc:
+            back_row = -dr * width
+            while True:
+                p += step
+                if not walkable[p]:
+                    return None
+                if p == goal_p:
+                    return p
+                if ((walkable[p + back_row + dc] and not walkable[p + back_row]) or
+                        (walkable[p - back_row - dc] and not walkable[p - dc])):
+                    return p
+                # A diagonal step is a jump point if a straight scan from it finds one
+                if jump(p, dr, 0) is not None or jump(p, 0, dc) is not None:
+                    return p
+        elif dr:
+            while True:
+                p += step
+                if not walkable[p]:
+                    return None
+                if p == goal_p:
+                    return p
+                if ((walkable[p + step + 1] and not walkable[p + 1]) or
+                        (walkable[p + step - 1] and not walkable[p - 1])):
+                    return p
+        else:
+            while True:
+                p += step
+                if not walkable[p]:
+                    return None
+                if p == goal_p:
+                    return p
+                if ((walkable[p + width + dc] and not walkable[p + width]) or
+                        (walkable[p - width + dc] and not walkable[p - width])):
+                    return p
+
+    def pruned_directions(p, parent):
+        """Directions worth scanning from p given where we came from"""
+        if parent is None:
+            return DIRECTIONS
+        r, c = divmod(p, width)
+        pr, pc = divmod(parent, width)
+        dr, dc = _sign(r - pr), _sign(c - pc)
+        if dr and dc:
+            directions = [(dr, 0), (0, dc), (dr, dc)]
+            if not walkable[p - dr * width]:
+                directions.append((-dr, dc))
+            if not walkable[p - dc]:
+                directions.append((dr, -dc))
+        elif dr:
+            directions = [(dr, 0)]
+            if not walkable[p + 1]:
+                directions.append((dr, 1))
+            if not walkable[p - 1]:
+                directions.append((dr, -1))
+        else:
+            directions = [(0, dc)]
+            if not walkable[p + width]:
+                directions.append((1, dc))
+            if not walkable[p - width]:
+                directions.append((-1, dc))
+        return directions
+
+    def octile(p):
+        r, c = divmod(p, width)
+        hr = abs(r - goal_row)
+        hc = abs(c - goal_col)
+        return hr + diagonal_extra * hc if hr > hc else hc + diagonal_extra * hr
+
+    g_score = {start_p: 0.0}
+    came_from = {}
+    open_heap = [(octile(start_p), 0, start_p, 0.0)]
+    push, pop = heapq.heappush, heapq.heappop
+    count = 0
+    expanded = 0
+    found = False
+    track = stats is not None
+    peak = 1
+
+    while open_heap:
+        _, _, current, current_g = pop(open_heap)
+        if current_g > g_score[current]:
+            continue
+        if current == goal_p:
+            found = True
+            break
+        expanded += 1
+
+        r, c = divmod(current, width)
+        for dr, dc in pruned_directions(current, came_from.get(current)):
+            point = jump(current, dr, dc)
+            if point is None:
+                continue
+            # Jump points lie on a straight or diagonal line from the current cell
+            pr, pc = divmod(point, width)
+            span_r = abs(pr - r)
+            span_c = abs(pc - c)
+            diagonal = min(span_r, span_c)
+            tentative = current_g + diagonal * DIAGONAL_COST + (max(span_r, span_c) - diagonal)
+            if tentative < g_score.get(point, INF):
+                g_score[point] = tentative
+                came_from[point] = current
+                count += 1
+                push(open_heap, (tentative + octile(point), count, point, tentative))
+                if track and len(open_heap) > peak:
+                    peak = len(open_heap)
+
+    if track:
+        stats['expanded'] = expanded
+        stats['pushes'] = count + 1
+        stats['max_open'] = peak
+    if not found:
+        return None
+
+    # Expand the jump points back into a cell-by-cell path (unpadded coordinates)
+    points = [goal_p]
+    while points[-1] != start_p:
+        points.append(came_from[points[-1]])
+    points.reverse()
+    path = [tuple(start)]
+    for a, b in zip(points, points[1:]):
+        r0, c0 = divmod(a, width)
+        r1, c1 = divmod(b, width)
+        dr, dc = _sign(r1 - r0), _sign(c1 - c0)
+        r, c = r0, c0
+        while (r, c) != (r1, c1):
+            r += dr
+            c += dc
+            path.append((r - 1, c - 1))
+    return path
@@ -0,0 +1,191 @@
+"""
+ALT (A*, Landmarks, Triangle inequality) heuristic
+
+A handful of landmark cells are picked far apart from each other, and
+Dijkstra runs from each of them, forwards and backwards, over the static
+layout (barriers and cell costs). For any cell v and goal t the triangle
+inequality then gives the lower bounds d(L, t) - d(L, v) and
+d(v, L) - d(t, L) on the true distance d(v, t). Their maximum is a
+much tighter heuristic than a straight-line distance on maze-like maps.
+
+Dynamic obstacles and red lights only remove moves from the static graph,
+so the bounds stay admissible while they come and go. The distance tables
+are float32 arrays of shape (landmarks, rows * cols). They are cached in
+memory per layout and, for maps loaded from a file, in a .npz next to it.
+"""
+
+import heapq
+import os
+import numpy as np
+from config.constants import ALT_LANDMARKS
+from .grid_state import DIRECTIONS, DIAGONAL_COST, BARRIER
+
+INF = float("inf")
+# Layouts whose landmark tables are kept in memory
+LANDMARK_CACHE_SIZE = 4
+
+_landmark_cache = {}  # static signature -> Landmarks
+
+
+def _dijkstra_all(rows, cols, blocked, cost, source, reverse=False):
+    """Distances from `source` to every cell (to `source` from every cell if `reverse`)"""
+    dist = np.full(rows * cols, np.inf)
+    dist[source] = 0.0
+    distances = dist.tolist()
+    moves = [(dr * cols + dc, dr, dc, DIAGONAL_COST if dr and dc else 1) for dr, dc in DIRECTIONS]
+    heap = [(0.0, source)]
+    pop, push = heapq.heappop, heapq.heappush
+    while heap:
+        d, current = pop(heap)
+        if d > distances[current]:
+            continue
+        row, col = divmod(current, cols)
+        # Moves pay the cost of the cell they enter; walking backwards that
+        # is the current cell instead of the neighbor
+        enter = cost[current]
+        for offset, dr, dc, step in moves:
+            r = row + dr
+            c = col + dc
+            if r < 0 or r >= rows or c < 0 or c >= cols:
+                continue
+            neighbor = current + offset
+            if blocked[neighbor]:
+                continue
+            nd = d + step * (enter if reverse else cost[neighbor])
+            if nd < distances[neighbor]:
+                distances[neighbor] = nd
+                push(heap, (nd, neighbor))
+    return np.array(distances, dtype=np.float32)
+
+
+class Landmarks:
+    """Landmark cells with forward and backward distance tables"""
+
+    def __init__(self, rows, cols, indices, forward, backward, signature):
+        self.rows = rows
+        self.cols = cols
+        self.indices = indices    # Landmark flat indices
+        self.forward = forward    # forward[k][v] = d(landmark k, v)
+        self.backward = backward  # backward[k][v] = d(v, landmark k)
+        self.signature = signature
+        self.cost_floor = 1.0     # Scale of the octile fallback, set per state by landmarks_for
+
+    @classmethod
+    def build(cls, state, count=ALT_LANDMARKS):
+        """Pick `count` landmarks by farthest-point selection and run their Dijkstras"""
+        rows, cols = state.rows, state.cols
+        blocked = np.ascontiguousarray(state.flags_view & BARRIER).tobytes()
+        cost = state.cost
+        open_cells = np.flatnonzero(np.frombuffer(blocked, dtype=np.uint8) == 0)
+        indices, forward, backward = [], [], []
+        if len(open_cells):
+            # Start from the open cell farthest from an arbitrary one, then
+            # keep adding the cell farthest from every landmark so far
+            seed = _dijkstra_all(rows, cols, blocked, cost, int(open_cells[0]))
+            nearest = np.where(np.isfinite(seed), seed, -1)
+            candidate = int(np.argmax(nearest))
+            nearest = np.full(rows * cols, np.inf)
+            while len(indices) < count:
+                indices.append(candidate)
+                distances = _dijkstra_all(rows, cols, blocked, cost, candidate)
+                forward.append(distances)
+                backward.append(_dijkstra_all(rows, cols, blocked, cost, candidate, reverse=True))
+                nearest = np.minimum(nearest, distances)
+                reachable = np.where(np.isfinite(nearest), nearest, -1)
+                reachable[indices] = -1
+                candidate = int(np.argmax(reachable))
+                if reachable[candidate] <= 0:
+                    break
+        shape = (len(indices), rows * cols)
+        return cls(rows, cols, np.array(indices, dtype=np.int64),
+                   np.array(forward, dtype=np.float32).reshape(shape),
+                   np.array(backward, dtype=np.float32).reshape(shape),
+                   state.static_signature())
+
+    @classmethod
+    def load(cls, path):
+        """Read landmark tables written by save()"""
+        with np.load(path) as data:
+            rows, cols = (int(v) for v in data["shape"])
+            return cls(rows, cols, data["indices"], data["forward"], data["backward"],
+                       str(data["signature"]))
+
+    def save(self, path):
+        """Write the landmark tables to a .npz file"""
+        np.savez_compressed(path, shape=np.array([self.rows, self.cols]), indices=self.indices,
+                            forward=self.forward, backward=self.backward,
+                            signature=np.array(self.signature))
+
+    def bound_to(self, goal):
+        """bound(index): lower bound on the distance from a flat index to one goal flat index
+
+        Computed per cell on demand, so a search only pays for the cells it
+        actually reaches.
+        """
+        cols = self.cols
+        goal_row, goal_col = divmod(goal, cols)
+        tables = [(float(forward[goal]), memoryview(forward), memoryview(backward), float(backward[goal]))
+                  for forward, backward in zip(self.forward, self.backward)]
+        diagonal = DIAGONAL_COST - 1
+        floor = self.cost_floor
+
+        def bound(index):
+            # Octile distance is a valid bound too and covers cells no landmark helps with
+            row, col = divmod(index, cols)
+            dr = abs(row - goal_row)
+            dc = abs(col - goal_col)
+            best = (dr + diagonal * dc if dr > dc else dc + diagonal * dr) * floor
+            for to_goal, forward, backward, from_goal in tables:
+                # Differences are NaN where neither end is reachable, and NaN never wins
+                value = to_goal - forward[index]
+                if value > best:
+                    best = value
+                value = backward[index] - from_goal
+                if value > best:
+                    best = value
+            return best
+
+        return bound
+
+    def heuristic(self, goal):
+        """heuristic(index, goal_index) for astar_search, specialised to one goal flat index"""
+        bound = self.bound_to(goal)
+        return lambda index, _goal: bound(index)
+
+    def spot_heuristic(self, goal):
+        """heuristic(spot, end) for core.astar.a_star, specialised to one goal flat index"""
+        bound = self.bound_to(goal)
+        return lambda spot, _end: bound(spot.index)
+
+def landmarks_for(state, map_name=None, count=ALT_LANDMARKS):
+    """Landmarks for a grid state's current layout, built at most once per layout
+
+    With a `map_name` the tables are also kept in maps/<map_name>.alt.npz
+    and reused by later runs as long as the layout is unchanged.
+    """
+    signature = state.static_signature()
+    landmarks = _landmark_cache.pop(signature, None)
+    path = f"maps/{map_name}.alt.npz" if map_name else None
+
+    if landmarks is None and path and os.path.exists(path):
+        try:
+            loaded = Landmarks.load(path)
+            if loaded.signature == signature:
+                landmarks = loaded
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Ignoring landmark cache '{path}': {e}")
+
+    if landmarks is None:
+        landmarks = Landmarks.build(state, count)
+        if path:
+            try:
+                landmarks.save(path)
+            except OSError as e:
+                print(f"Could not save landmark cache '{path}': {e}")
+
+    # Same layout, same costs: the floor only depends on the signature
+    landmarks.cost_floor = state.cost_floor()
+    _landmark_cache[signature] = landmarks  # Most recently used last
+    while len(_landmark_cache) > LANDMARK_CACHE_SIZE:
+        del _landmark_cache[next(iter(_landmark_cache))]
+    return landmarks
@@ -0,0 +1,146 @@
+"""
+LRU cache of planned paths with selective invalidation
+
+Paths are stored per (start, goal) cell pair together with the grid state
+version they were last validated against. Before every lookup the cache
+reads the cells changed since then from the GridState change log and drops
+the paths that cross one of them. A changed cell that can now be entered
+(a removed barrier, an obstacle that moved on, a light turned green) may
+open a shorter route, so paths it could shorten are dropped as well: those
+for which going through the cell is not ruled out by the octile distance
+bound (scaled by the cheapest cell cost). Everything else stays valid. If the log no longer reaches back far
+enough, the whole cache is cleared.
+"""
+
+import weakref
+from collections import OrderedDict
+import numpy as np
+from config.constants import PATH_CACHE_SIZE
+from .grid_state import DIAGONAL_COST
+
+# Slack when comparing a detour bound against a path cost (float rounding)
+COST_EPSILON = 1e-6
+
+# Opened cells checked against all cached paths at once
+OPENED_CHUNK = 1024
+
+_caches = weakref.WeakKeyDictionary()  # GridState -> PathCache
+
+
+class PathCache:
+    def __init__(self, state, size=PATH_CACHE_SIZE):
+        self.state = state
+        self.size = size
+        self.paths = OrderedDict()  # (start index, goal index) -> path of (row, col)
+        self.by_cell = {}           # flat index -> set of keys whose path crosses it
+        self.costs = {}             # key -> movement cost of its path
+        self.version = state.version
+        self.hits = 0
+        self.misses = 0
+
+    def _sync(self):
+        """Drop the paths that cross cells changed since the last check"""
+        state = self.state
+        if self.version == state.version:
+            return
+        changes = state.changes_since(self.version)
+        self.version = state.version
+        if changes is None:
+            self.clear()
+            return
+        by_cell = self.by_cell
+        for index in changes:
+            keys = by_cell.get(index)
+            if keys:
+                for key in list(keys):
+                    self._remove(key)
+        if self.paths:
+            opened = [index for index in changes if state.is_passable_index(index)]
+            if opened:
+                self._drop_improvable(opened)
+
+    def _drop_improvable(self, opened):
+        """Drop the paths that a route through one of the `opened` cells might beat"""
+        cols = self.state.cols
+        # Steps can cost less than 1 on cheap cells
+        floor = self.state.cost_floor()
+        keys = list(self.paths)
+        ends = np.array(keys, dtype=np.int64)
+        cost = np.array([self.costs[key] for key in keys])
+        opened = np.array(opened, dtype=np.int64)
+
+        def octile(a, b):
+            dr = np.abs(a // cols - b // cols)
+            dc = np.abs(a % cols - b % cols)
+            return np.maximum(dr, dc) + (DIAGONAL_COST - 1) * np.minimum(dr, dc)
+
+        # In chunks, so a tick that moves a whole swarm stays small in memory
+        stale = np.zeros(len(keys), dtype=bool)
+        for start in range(0, len(opened), OPENED_CHUNK):
+            cells = opened[start:start + OPENED_CHUNK, None]
+            bound = (octile(cells, ends[:, 0]) + octile(cells, ends[:, 1])) * floor
+            stale |= (bound < cost - COST_EPSILON).any(axis=0)
+        for k in np.flatnonzero(stale).tolist():
+            self._remove(keys[k])
+
+    def _remove(self, key):
+        """Forget one path and its cell index entries"""
+        path = self.paths.pop(key, None)
+        if path is None:
+            return
+        del self.costs[key]
+        cols = self.state.cols
+        for r, c in path:
+            keys = self.by_cell.get(r * cols + c)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.by_cell[r * cols + c]
+
+    def get(self, start, goal):
+        """Cached path between two (row, col) cells that is still valid, or None"""
+        self._sync()
+        key = (self.state.index(*start), self.state.index(*goal))
+        path = self.paths.get(key)
+        if path is None:
+            self.misses += 1
+            return None
+        self.paths.move_to_end(key)
+        self.hits += 1
+        return path
+
+    def put(self, start, goal, path):
+        """Remember a path planned on the current grid state"""
+        self._sync()
+        key = (self.state.index(*start), self.state.index(*goal))
+        self._remove(key)
+        self.paths[key] = path
+        cols = self.state.cols
+        cell_cost = self.state.cost
+        total = 0.0
+        previous = None
+        for r, c in path:
+            index = r * cols + c
+            self.by_cell.setdefault(index, set()).add(key)
+            if previous is not None:
+                step = DIAGONAL_COST if previous[0] != r and previous[1] != c else 1
+                total += step * cell_cost[index]
+            previous = (r, c)
+        self.costs[key] = total
+        while len(self.paths) > self.size:
+            self._remove(next(iter(self.paths)))
+
+    def clear(self):
+        """Forget every path"""
+        self.paths.clear()
+        self.by_cell.clear()
+        self.costs.clear()
+        self.version = self.state.version
+
+
+def path_cache_for(state):
+    """The shared path cache of a grid state"""
+    cache = _caches.get(state)
+    if cache is None:
+        cache = _caches[state] = PathCache(state)
+    return cache
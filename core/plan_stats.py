@@ -0,0 +1,106 @@
+"""
+Per-plan statistics and profiling hooks for robot planning
+
+When profiling is on (Robot.profile, default from the profile_planning
+setting) or any hook is registered, every Robot.plan_path call produces a
+PlanStats record: which planner ran and why, the search effort (nodes
+expanded, heap pushes, largest open set), the path length and the wall
+time spent. The robot keeps the latest record and running PlanCounters,
+and passes each record to the registered hooks as hook(robot, stats).
+
+With profiling off and no hooks, plan_path skips all of this and the
+searches are not asked to count anything.
+"""
+
+
+class PlanStats:
+    """What one plan_path call did"""
+
+    def __init__(self, planner, reason, sim_time, start, goal, found, path_length, wall_time, search):
+        self.planner = planner
+        self.reason = reason          # PLAN_* trigger
+        self.sim_time = sim_time
+        self.start = start            # (row, col)
+        self.goal = goal              # (row, col)
+        self.found = found
+        self.path_length = path_length  # Cells on the new path, waits included
+        self.wall_time = wall_time    # Seconds, drawing included when the search is animated
+        self.expanded = search.get('expanded', 0)
+        self.pushes = search.get('pushes', 0)
+        self.max_open = search.get('max_open', 0)
+        self.cache_hit = search.get('cache_hit', False)
+
+    def as_dict(self):
+        """Plain dict of the record, e.g. for JSON export"""
+        return {
+            "planner": self.planner,
+            "reason": self.reason,
+            "sim_time": self.sim_time,
+            "start": list(self.start),
+            "goal": list(self.goal),
+            "found": self.found,
+            "path_length": self.path_length,
+            "wall_time": self.wall_time,
+            "expanded": self.expanded,
+            "pushes": self.pushes,
+            "max_open": self.max_open,
+            "cache_hit": self.cache_hit,
+        }
+
+
+class PlanCounters:
+    """Running totals over many plans"""
+
+    def __init__(self):
+        self.plans = 0
+        self.failed = 0
+        self.cache_hits = 0
+        self.by_reason = {}   # PLAN_* -> number of plans
+        self.wall_time = 0.0
+        self.expanded = 0
+        self.pushes = 0
+        self.max_open = 0     # Largest open set of any plan
+        self.slowest = None   # PlanStats with the longest wall time
+
+    def add(self, stats):
+        """Count one PlanStats"""
+        self.plans += 1
+        self.failed += not stats.found
+        self.cache_hits += stats.cache_hit
+        self.by_reason[stats.reason] = self.by_reason.get(stats.reason, 0) + 1
+        self.wall_time += stats.wall_time
+        self.expanded += stats.expanded
+        self.pushes += stats.pushes
+        self.max_open = max(self.max_open, stats.max_open)
+        if self.slowest is None or stats.wall_time > self.slowest.wall_time:
+            self.slowest = stats
+
+    def as_dict(self):
+        """Plain dict of the totals"""
+        return {
+            "plans": self.plans,
+            "failed": self.failed,
+            "cache_hits": self.cache_hits,
+            "by_reason": dict(self.by_reason),
+            "wall_time": self.wall_time,
+            "expanded": self.expanded,
+            "pushes": self.pushes,
+            "max_open": self.max_open,
+            "slowest": self.slowest.as_dict() if self.slowest else None,
+        }
+
+
+# Callbacks run as hook(robot, stats) after every profiled plan
+plan_hooks = []
+
+
+def add_plan_hook(hook):
+    """Call hook(robot, stats) after every plan_path; turns on per-plan stats for all robots"""
+    if hook not in plan_hooks:
+        plan_hooks.append(hook)
+
+
+def remove_plan_hook(hook):
+    """Stop calling a hook added with add_plan_hook"""
+    if hook in plan_hooks:
+        plan_hooks.remove(hook)
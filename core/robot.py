@@ -1,26 +1,57 @@
 """ Robot class for pathfinding and movement """
-import pygame
 import time
+import pygame
 from config.constants import *
 from config.settings import *
 from entities.trail import TrailMarker
 from .astar import a_star
+from .clock import get_clock
+from .grid_state import BLOCKING, DYNAMIC
+from .dstar_lite import DStarLite
+from .search import astar_search
+from .jps import jps_search
+from .path_cache import path_cache_for
+from .landmarks import landmarks_for
+from .hpa import hpa_for
+from .spacetime import spacetime_search
+from .plan_stats import PlanStats, PlanCounters, plan_hooks
+
+# Tolerance when comparing the clock against a scheduled step time
+SCHEDULE_EPSILON = 1e-6
 
 class Robot:
-    def __init__(self, start, end, grid, draw_func):
+    def __init__(self, start, end, grid, draw_func=None, visualize=None, replan_visualize=None,
+                 planner=None, clock=None, reservations=None, obstacles=None):
         self.grid = grid
+        self.clock = clock or get_clock()
         self.draw = draw_func
+        # Planning backend (PLANNER_ASTAR / PLANNER_DSTAR)
+        self.planner = planner or default_planner
+        self.incremental = None  # D* Lite search state kept between replans
+        self.reservations = reservations  # Shared ReservationTable when part of a fleet
+        self.obstacles = obstacles  # DynamicObstacleManager whose motion space-time plans predict
+        # Planner visualization policies (VIS_SEARCH / VIS_PATH / VIS_NONE)
+        self.visualize = visualize or plan_visualization
+        self.replan_visualize = replan_visualize or replan_visualization
         self.start = start
         self.end = end
         self.path = []
         self.index = 0
         self.current = start
         self.trails = []
-        self.last_move_time = time.time()
+        self.last_move_time = self.clock.now()
         self.paused = False
         self.pause_time = 0
+        self.step_time = MOVE_DELAY / DEFAULT_SPEED
+        self.depart_time = 0.0  # Time of step 0 of a space-time plan
         # ✅ Track completed targets with priorities
         self.completed_targets = []
+        self.steps_taken = 0
+        self.replan_count = 0
+        # Per-plan statistics, recorded while profiling or when a plan hook is set
+        self.profile = profile_planning
+        self.last_plan = None  # PlanStats of the latest plan
+        self.plan_counters = PlanCounters()
         
     def set_new_goal(self, new_goal):
         # ✅ Mark previous goal as completed
@@ -34,27 +65,182 @@ class Robot:
         ))
         print(f"🎯 New target: Priority {getattr(new_goal, 'priority', 'Unknown')}")
 
-    def plan_path(self):
-        """Plan a path from current position to end using A*"""
-        for row in self.grid:
-            for spot in row:
-                if not spot.is_barrier() and not spot.is_start() and not spot.is_end() and not spot.is_dynamic():
-                    spot.reset()
-                spot.previous = None
+    def set_planner(self, planner):
+        """Change the planning backend, replanning the rest of the route with it
+
+        A path from another backend does not carry the step times a
+        space-time plan is followed by (and a space-time path holds waits),
+        so a robot under way plans again instead of keeping it.
+        """
+        if planner == self.planner:
+            return
+        self.planner = planner
+        self.incremental = None
+        if self.path and not self.reached_goal():
+            self.plan_path(self.replan_visualize, PLAN_SWITCH)
+
+    def plan_path(self, visualize=None, reason=PLAN_INITIAL):
+        """Plan a path from current position to end with the selected backend
+
+        `reason` (a PLAN_* constant) says what triggered the plan; it is
+        recorded with the plan's statistics when profiling.
+        """
+        if visualize is None:
+            visualize = self.visualize
+        if self.profile or plan_hooks:
+            found = self._plan_profiled(visualize, reason)
+        else:
+            found = self._plan(visualize)
+        if not found:
+            self.draw_fail_overlay()
+        return found
+
+    def _plan(self, visualize, stats=None):
+        """Run the selected backend; it fills `stats` with its search counters if given"""
+        if self.planner == PLANNER_DSTAR:
+            return self._plan_incremental(visualize, stats)
+        if self.planner == PLANNER_SPACETIME:
+            return self._plan_spacetime(visualize, stats)
+        if self.planner == PLANNER_HPA:
+            return self._plan_hierarchical(visualize, stats)
+        return self._plan_astar(visualize, stats)
+
+    def _plan_profiled(self, visualize, reason):
+        """Plan while timing it, then record the PlanStats and pass it to the plan hooks"""
+        start, goal = self.current.get_pos(), self.end.get_pos()
+        search = {}
+        began = time.perf_counter()
+        found = self._plan(visualize, search)
+        wall_time = time.perf_counter() - began
+        stats = PlanStats(self.planner, reason, self.clock.now(), start, goal, found,
+                          len(self.path), wall_time, search)
+        self.last_plan = stats
+        self.plan_counters.add(stats)
+        for hook in list(plan_hooks):
+            hook(self, stats)
+        return found
+
+    def _plan_astar(self, visualize, stats=None):
+        """Plan from scratch with A*; only the animated search uses the Spot-based version"""
+        if visualize != VIS_SEARCH:
+            state = self.grid.state
+            start, goal = self.current.get_pos(), self.end.get_pos()
+            cache = path_cache_for(state)
+            cells = cache.get(start, goal)
+            if cells is None:
+                if use_landmarks:
+                    cells = astar_search(state, start, goal, heuristic=self._landmarks().heuristic(self.end.index),
+                                         stats=stats)
+                elif state.has_uniform_cost():
+                    # Jump Point Search gives the same paths far faster on uniform-cost maps
+                    cells = jps_search(state, start, goal, stats=stats)
+                else:
+                    cells = astar_search(state, start, goal, stats=stats)
+                if cells:
+                    cache.put(start, goal, cells)
+            elif stats is not None:
+                stats['cache_hit'] = True
+            self.set_path([self.grid[r][c] for r, c in cells] if cells else [], visualize)
+            return cells is not None
+
+        # Clear the previous animated search; cells that have no spot yet were never drawn on
+        for spot in self.grid.created_spots():
+            if spot.color in (RED, GREEN, PURPLE):
+                spot.sync_color()
+            spot.previous = None
         self.path.clear()
         self.index = 0
         
-        # ✅ Update neighbors to account for dynamic obstacles
-        for row in self.grid:
-            for spot in row:
-                spot.update_neighbors(self.grid)
-        
-        if a_star(self.draw, self.grid, self.current, self.end):  # Use current position, not start
+        heuristic_func = self._landmarks().spot_heuristic(self.end.index) if use_landmarks else None
+        if a_star(self.draw, self.grid, self.current, self.end,
+                  visualize=visualize, draw_every=draw_every,
+                  heuristic_func=heuristic_func, stats=stats):  # Use current position, not start
             self.extract_path()
             return True
+        return False
+
+    def _landmarks(self):
+        """ALT landmarks for the current layout (precomputed once per layout)"""
+        return landmarks_for(self.grid.state, getattr(self.grid, 'map_name', None))
+
+    def _plan_incremental(self, visualize, stats=None):
+        """Plan with D* Lite, repairing the previous search instead of restarting it"""
+        state = self.grid.state
+        goal = self.end.get_pos()
+        planner = self.incremental
+        if planner is None or state.index(*goal) != planner.goal or not planner.sync():
+            planner = self.incremental = DStarLite(state, self.current.get_pos(), goal)
         else:
-            self.draw_fail_overlay()
-            return False
+            planner.move_start(self.current.get_pos())
+
+        cells = planner.plan(stats)
+        self.set_path([self.grid[r][c] for r, c in cells] if cells else [], visualize)
+        return cells is not None
+
+    def _plan_hierarchical(self, visualize, stats=None):
+        """Plan with HPA*: search the cluster graph, then refine only the clusters on the route"""
+        cells = hpa_for(self.grid.state).plan(self.current.get_pos(), self.end.get_pos(), stats)
+        self.set_path([self.grid[r][c] for r, c in cells] if cells else [], visualize)
+        return cells is not None
+
+    def _plan_spacetime(self, visualize, stats=None):
+        """Plan a timed path that waits for or routes around predicted red lights and obstacles"""
+        now = self.clock.now()
+        state = self.grid.state
+        table = self.reservations
+        blocked = can_stop = max_steps = blocked_until = timed_cells = None
+        blocking = BLOCKING
+        if table is None:
+            # Step 0 is the last move, so step 1 is due as soon as the move gate allows
+            self.depart_time = max(now - self.step_time, self.last_move_time)
+        else:
+            # Fleet robots share step boundaries so their reservations line up
+            first_step = table.step_at(now)
+            self.depart_time = first_step * self.step_time
+            table.release(self)
+            blocked, can_stop = table.callbacks(self, first_step)
+            max_steps = table.horizon
+
+        slack = getattr(self.clock, 'tick', 0.0)
+        if self.obstacles is not None and predict_obstacles:
+            # Obstacles block cells only while the forecast expects them there
+            tick = getattr(self.clock, 'tick', SIM_TICK)
+            forecast = self.obstacles.forecast(state, now, OBSTACLE_FORECAST_TICKS * tick)
+            blocked = forecast.blocked_callback(self.depart_time, self.step_time, slack, blocked)
+            blocking = BLOCKING & ~DYNAMIC
+            if table is None:
+                # Only the forecast refuses moves, and only into the cells it covers
+                blocked_until = forecast.steps(self.depart_time, self.step_time)
+                timed_cells = forecast.cells()
+
+        cells = spacetime_search(state, self.current.get_pos(), self.end.get_pos(),
+                                 self.depart_time, self.step_time, slack=slack,
+                                 blocked=blocked, can_stop=can_stop, max_steps=max_steps,
+                                 blocking=blocking, blocked_until=blocked_until,
+                                 timed_cells=timed_cells, stats=stats)
+        if table is not None:
+            if cells:
+                table.reserve(self, [state.index(r, c) for r, c in cells], first_step)
+            else:
+                table.park(self, self.current.index, first_step)
+        self.set_path([self.grid[r][c] for r, c in cells] if cells else [], visualize)
+        self.index = 1  # path[0] is the current cell
+        return cells is not None
+
+    def set_path(self, path, visualize=VIS_PATH):
+        """Replace the current path, updating the path coloring only where it changed"""
+        for spot in self.path:
+            if spot.color == PURPLE:
+                spot.color = spot.original_color
+        self.path = path
+        self.index = 0
+        if visualize == VIS_NONE:
+            return
+        for spot in path[1:-1]:
+            if not spot.is_start() and not spot.is_end():
+                spot.make_path()
+        if self.draw:
+            self.draw()
 
     def draw_fail_overlay(self):
         """Draw overlay when pathfinding fails"""
@@ -73,14 +259,18 @@ class Robot:
         self.path = path
 
     def step(self):
-        current_time = time.time()
+        """Advance the robot one move if it is due on the simulation clock"""
+        current_time = self.clock.now()
+
+        if self.planner == PLANNER_SPACETIME:
+            return self._step_scheduled(current_time)
 
         if self.paused:
-            if current_time - self.pause_time >= 2:
+            if current_time - self.pause_time >= PAUSE_DURATION:
                 self.paused = False
             return False
 
-        if current_time - self.last_move_time < 0.4 / DEFAULT_SPEED:
+        if current_time - self.last_move_time < self.step_time:
             return True
 
         self.last_move_time = current_time
@@ -98,31 +288,86 @@ class Robot:
             # ✅ Check for dynamic obstacles or new barriers - replan if found
             if next_spot.is_barrier() or next_spot.is_dynamic():
                 print("🚧 Path blocked! Replanning...")
-                if not self.plan_path():  # Try to replan
+                self.replan_count += 1
+                if not self.plan_path(self.replan_visualize, PLAN_BLOCKED):  # Try to replan
                     print("❌ Cannot find alternative path!")
                     return False
                 return False  # Skip this step, try again with new path
 
-            # ✅ Add trail marker
-            self.trails.append(TrailMarker(
-                (self.current.x + self.current.width // 2,
-                 self.current.y + self.current.width // 2),
-                (*PURPLE, TRAIL_ALPHA),
-                self.current.width // 4
-            ))
-
-            # ✅ Update all trail markers
-            for trail in self.trails:
-                trail.update()
-
-            # ✅ Move to next position
-            self.current.reset()
-            self.current = next_spot
-            self.current.make_start()
-            self.index += 1
+            self._move_to(next_spot)
             return True
         return False
 
+    def on_lights(self, changes):
+        """Light listener: stop waiting as soon as the light ahead turns green; returns True if it did
+
+        `changes` is the list of (row, col, state) a TrafficLightController
+        reports when lights flip.
+        """
+        if not self.paused or self.index >= len(self.path):
+            return False
+        ahead = self.path[self.index].get_pos()
+        if any(state == "green" and (row, col) == ahead for row, col, state in changes):
+            self.paused = False
+            return True
+        return False
+
+    def next_step_time(self):
+        """Simulation time at which step() will next do something (for the event scheduler)"""
+        if self.planner == PLANNER_SPACETIME and self.index < len(self.path):
+            return self.depart_time + self.index * self.step_time - SCHEDULE_EPSILON
+        if self.paused:
+            return self.pause_time + PAUSE_DURATION
+        return self.last_move_time + self.step_time
+
+    def _step_scheduled(self, current_time):
+        """Follow a space-time plan: take (or wait out) step `index` once its time has come"""
+        if self.index >= len(self.path):
+            return False
+        if current_time < self.depart_time + self.index * self.step_time - SCHEDULE_EPSILON:
+            return True
+
+        self.last_move_time = current_time
+        next_spot = self.path[self.index]
+        if next_spot is self.current:
+            # Planned wait, e.g. for a light that turns green on a later step
+            self.index += 1
+            return True
+
+        # The plan predicted lights and the grid; replan only if reality differs
+        # (another robot standing in the way included)
+        if (next_spot.is_barrier() or next_spot.is_dynamic() or next_spot.is_start() or
+                (next_spot.is_traffic_stop and next_spot.light_state != "green")):
+            print("🚧 Schedule broken! Replanning...")
+            self.replan_count += 1
+            if not self.plan_path(self.replan_visualize, PLAN_SCHEDULE):
+                print("❌ Cannot find alternative path!")
+            return False
+
+        self._move_to(next_spot)
+        return True
+
+    def _move_to(self, next_spot):
+        """Move onto the next spot of the path, leaving a trail marker behind"""
+        # ✅ Add trail marker
+        self.trails.append(TrailMarker(
+            (self.current.x + self.current.width // 2,
+             self.current.y + self.current.width // 2),
+            (*PURPLE, TRAIL_ALPHA),
+            self.current.width // 4
+        ))
+
+        # ✅ Update all trail markers
+        for trail in self.trails:
+            trail.update()
+
+        # ✅ Move to next position
+        self.current.reset()
+        self.current = next_spot
+        self.current.make_start()
+        self.index += 1
+        self.steps_taken += 1
+
     def reached_goal(self):
         """Check if robot has reached the goal"""
         return self.current == self.end
@@ -0,0 +1,108 @@
+"""
+Discrete-event scheduler for the simulation entities
+
+Robots, obstacles and traffic lights each register an action with the
+simulation time it is next due. Every tick run_due() pops only the actions
+whose time has come, so an entity that is waiting (a robot between steps,
+an obstacle between moves, lights between switches) costs nothing until
+then. An action is called as action(now) and returns the time it wants to
+run next, or None to go idle until it is rescheduled.
+
+Events live in a binary heap ordered by (time, insertion order).
+Rescheduling or cancelling an event only marks its old heap entry dead;
+dead entries are dropped when they reach the top. Headless runs can ask
+next_time() for the earliest pending event and jump the clock straight to
+it instead of ticking through idle time.
+"""
+
+import heapq
+
+INF = float("inf")
+
+
+class Event:
+    """A scheduled action; keep it to reschedule or cancel the action"""
+
+    __slots__ = ("time", "action", "entry")
+
+    def __init__(self, action):
+        self.time = INF
+        self.action = action
+        self.entry = None  # Live heap entry [time, order, event], None while idle
+
+    def pending(self):
+        """Check if the event is waiting in the heap"""
+        return self.entry is not None
+
+
+class Scheduler:
+    """Heap of timed actions, run when the simulation clock reaches them"""
+
+    def __init__(self):
+        self._heap = []
+        self._order = 0
+        self.processed = 0  # Actions run so far
+
+    def _push(self, event, time):
+        """Put an event in the heap, retiring its previous entry"""
+        if event.entry is not None:
+            event.entry[2] = None
+            event.entry = None
+        event.time = INF if time is None else time
+        if event.time == INF:
+            return
+        self._order += 1
+        event.entry = [event.time, self._order, event]
+        heapq.heappush(self._heap, event.entry)
+
+    def schedule(self, time, action):
+        """Run action(now) at simulation time `time` (None or inf: idle); returns its Event"""
+        event = Event(action)
+        self._push(event, time)
+        return event
+
+    def reschedule(self, event, time):
+        """Move an event to a new time (None or inf: idle)"""
+        self._push(event, time)
+
+    def cancel(self, event):
+        """Stop an event from running"""
+        self._push(event, None)
+
+    def next_time(self):
+        """Time of the earliest pending event, or inf when nothing is scheduled"""
+        heap = self._heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else INF
+
+    def run_due(self, now):
+        """Run every action due at or before `now`; returns how many ran
+
+        Actions are run in time order. One that asks to run again at or
+        before `now` waits for the next call, so a tick always ends.
+        """
+        heap = self._heap
+        due = []
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            event = entry[2]
+            if event is not None:
+                event.entry = None
+                due.append(event)
+        ran = 0
+        for event in due:
+            # An earlier action may have rescheduled or cancelled this one
+            if event.entry is not None or event.time > now:
+                continue
+            self._push(event, event.action(now))
+            ran += 1
+        self.processed += ran
+        return ran
+
+    def clear(self):
+        """Drop every pending event"""
+        for entry in self._heap:
+            if entry[2] is not None:
+                entry[2].entry = None
+        self._heap.clear()
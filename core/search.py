@@ -0,0 +1,110 @@
+"""
+Lean heap-based A* over a GridState
+
+Unlike core.astar.a_star this search never touches Spot objects: it reads
+the state layers by flat index, keeps scores lazily in dicts (only for
+cells it actually reaches), skips stale heap entries instead of tracking
+an open-set hash and does not recolor anything.
+"""
+
+import heapq
+from .grid_state import DIRECTIONS, DIAGONAL_COST, BLOCKING, TRAFFIC, LIGHT_RED
+
+INF = float("inf")
+
+
+def octile(a, b, cols):
+    """Octile distance between two flat indices (admissible for 8-connected moves)"""
+    dr = abs(a // cols - b // cols)
+    dc = abs(a % cols - b % cols)
+    if dr < dc:
+        dr, dc = dc, dr
+    return dr + (DIAGONAL_COST - 1) * dc
+
+
+def neighbor_table(cols):
+    """(flat offset, row delta, col delta, step cost) for each move direction"""
+    return [(dr * cols + dc, dr, dc, DIAGONAL_COST if dr and dc else 1)
+            for dr, dc in DIRECTIONS]
+
+
+def astar_search(state, start, goal, heuristic=None, stats=None, bounds=None):
+    """Find a path between two (row, col) cells on a GridState
+
+    Returns the path as a list of (row, col) including both ends, or None.
+    `heuristic(index, goal_index)` defaults to the octile distance, scaled
+    by the cheapest cell cost so it never overestimates. If a
+    `stats` dict is given, the number of expanded nodes, heap pushes and
+    the largest heap size are stored in it.
+    `bounds` = (first row, end row, first col, end col) keeps the search
+    inside a rectangle.
+    """
+    cols = state.cols
+    row_lo, row_hi, col_lo, col_hi = bounds or (0, state.rows, 0, cols)
+    flags, light, cost = state.flags, state.light, state.cost
+    start_i = start[0] * cols + start[1]
+    goal_i = goal[0] * cols + goal[1]
+    goal_row, goal_col = goal
+    diagonal_extra = DIAGONAL_COST - 1
+    floor = state.cost_floor()
+
+    moves = neighbor_table(cols)
+    g_score = {start_i: 0.0}
+    came_from = {}
+    h0 = heuristic(start_i, goal_i) if heuristic else octile(start_i, goal_i, cols) * floor
+    open_heap = [(h0, 0, start_i, 0.0)]
+    push, pop = heapq.heappush, heapq.heappop
+    count = 0
+    expanded = 0
+    found = False
+    track = stats is not None
+    peak = 1
+
+    while open_heap:
+        _, _, current, current_g = pop(open_heap)
+        # Stale entry: a cheaper route to this cell was pushed later
+        if current_g > g_score[current]:
+            continue
+        if current == goal_i:
+            found = True
+            break
+        expanded += 1
+
+        row, col = divmod(current, cols)
+        for offset, dr, dc, step in moves:
+            r = row + dr
+            c = col + dc
+            if r < row_lo or r >= row_hi or c < col_lo or c >= col_hi:
+                continue
+            neighbor = current + offset
+            f_bits = flags[neighbor]
+            if f_bits & BLOCKING or (f_bits & TRAFFIC and light[neighbor] == LIGHT_RED):
+                continue
+            tentative = current_g + step * cost[neighbor]
+            if tentative < g_score.get(neighbor, INF):
+                g_score[neighbor] = tentative
+                came_from[neighbor] = current
+                if heuristic:
+                    h = heuristic(neighbor, goal_i)
+                else:
+                    # Inlined octile distance
+                    hr = r - goal_row if r > goal_row else goal_row - r
+                    hc = c - goal_col if c > goal_col else goal_col - c
+                    h = (hr + diagonal_extra * hc if hr > hc else hc + diagonal_extra * hr) * floor
+                count += 1
+                push(open_heap, (tentative + h, count, neighbor, tentative))
+                if track and len(open_heap) > peak:
+                    peak = len(open_heap)
+
+    if track:
+        stats['expanded'] = expanded
+        stats['pushes'] = count + 1
+        stats['max_open'] = peak
+    if not found:
+        return None
+
+    path = [goal_i]
+    while path[-1] != start_i:
+        path.append(came_from[path[-1]])
+    path.reverse()
+    return [divmod(i, cols) for i in path]
@@ -0,0 +1,192 @@
+"""
+Space-time A* that plans around predicted traffic light phases
+
+Every move (straight or diagonal) and every wait takes one step of
+`step_time` seconds, so the search minimizes arrival time rather than
+distance. Light cells may only be entered at steps where their
+deterministic cycle (see entities.traffic_light) shows green, which lets
+the planner choose between waiting at the light and taking a detour.
+Cell costs only break ties between equally fast routes.
+
+Without a `blocked` callback waiting is always allowed, so the earliest
+arrival at a cell dominates every later one and the search only keeps one
+label per cell (a time-dependent Dijkstra/A*). With a callback, for
+example a reservation table shared by several robots, states are
+(cell, step) pairs and waits are explicit moves bounded by `max_steps`.
+A callback that only looks a limited number of steps ahead (an obstacle
+forecast) passes `blocked_until`, and states after that step go back to
+one label per cell. One that only ever refuses arrivals at a few cells
+passes them as `timed_cells`: every other cell can be waited in freely, so
+it keeps one label too, and moves out of it into a timed cell wait there
+for the first step the callback allows (as in safe interval planning).
+"""
+
+import heapq
+from .grid_state import DIRECTIONS, DIAGONAL_COST, BLOCKING, TRAFFIC
+from config.constants import TRAFFIC_LIGHT_CYCLE
+from entities.traffic_light import light_state_at
+
+INF = float("inf")
+
+
+def chebyshev(a, b, cols):
+    """Chebyshev distance between two flat indices (steps needed, one per move)"""
+    return max(abs(a // cols - b // cols), abs(a % cols - b % cols))
+
+
+def spacetime_search(state, start, goal, start_time, step_time, slack=0.0,
+                     blocked=None, can_stop=None, max_steps=None, stats=None,
+                     blocking=BLOCKING, blocked_until=None, timed_cells=None):
+    """Find the fastest timed path between two (row, col) cells
+
+    Step k of the plan is taken at `start_time + k * step_time`. Light cells
+    must be green at that time and still green `slack` seconds later (the
+    clock granularity of whoever executes the plan). `blocked(from_index,
+    to_index, step)` may forbid arriving in a cell at a step; a wait is a
+    move with from_index == to_index. `can_stop(index, step)` may refuse to
+    end the plan at the goal if the cell is needed later. If `blocked`
+    never refuses an arrival after step `blocked_until`, or only refuses
+    arrivals at the cells in `timed_cells` (flat indices, arriving from
+    any cell), passing them keeps the search small. `blocking` is the flag mask of cells
+    that can never be entered (drop DYNAMIC when `blocked` predicts the
+    obstacles instead).
+
+    Returns one (row, col) per step, starting with `start` and repeating a
+    cell for each wait, or None. If a `stats` dict is given, the number of
+    expanded states, heap pushes and the largest heap size are stored in it.
+    """
+    rows, cols = state.rows, state.cols
+    flags, cost, light_start = state.flags, state.cost, state.light_start
+    start_i = start[0] * cols + start[1]
+    goal_i = goal[0] * cols + goal[1]
+    if max_steps is None:
+        max_steps = rows * cols
+    # Longest useful wait for one light: a full cycle
+    cycle_steps = int(TRAFFIC_LIGHT_CYCLE / step_time) + 2
+
+    def green_at(index, step):
+        """Check if a light cell can be entered at a step"""
+        phase = light_start.get(index, 0.0)
+        arrive = start_time + step * step_time
+        return (light_state_at(arrive, phase) == "green" and
+                light_state_at(arrive + slack, phase) == "green")
+
+    def first_entry(index, step):
+        """Earliest step >= `step` at which a cell can be entered, or None"""
+        if not flags[index] & TRAFFIC:
+            return step
+        for wait in range(cycle_steps):
+            if green_at(index, step + wait):
+                return step + wait
+        return None
+
+    # Last step whose arrivals `blocked` may refuse
+    if blocked is None:
+        timed_until = -1
+    else:
+        timed_until = max_steps if blocked_until is None else blocked_until
+
+    def timed_at(index, step):
+        """Check if arrivals at a cell and step may be refused (and so get their own label)"""
+        return step <= timed_until and (timed_cells is None or index in timed_cells)
+
+    def first_free(current, index, step):
+        """Earliest step >= `step` to move into a timed cell after waiting in an untimed one"""
+        for arrive in range(step, timed_until + 1):
+            if flags[index] & TRAFFIC and not green_at(index, arrive):
+                continue
+            if not blocked(current, index, arrive):
+                return arrive
+        return first_entry(index, max(step, timed_until + 1))
+
+    # Labels: best (step, cost) per cell, or per (cell, step) while the callback applies
+    start_key = (start_i, 0) if timed_at(start_i, 0) else start_i
+    best = {start_key: (0, 0.0)}
+    came_from = {}
+    open_heap = [(chebyshev(start_i, goal_i, cols), 0.0, 0, start_i, 0)]
+    push, pop = heapq.heappush, heapq.heappop
+    count = 0
+    expanded = 0
+    found = None
+    track = stats is not None
+    peak = 1
+
+    while open_heap:
+        _, current_cost, _, current, step = pop(open_heap)
+        key = (current, step) if timed_at(current, step) else current
+        if (step, current_cost) > best[key]:
+            continue
+        if current == goal_i and (can_stop is None or can_stop(current, step)):
+            found = key
+            break
+        if step >= max_steps:
+            continue
+        expanded += 1
+
+        row, col = divmod(current, cols)
+        successors = []
+        # Waits are explicit moves only where the callback may refuse them
+        holds = isinstance(key, tuple) and step + 1 <= timed_until
+        if holds and not blocked(current, current, step + 1):
+            successors.append((current, step + 1, current_cost))
+        for dr, dc in DIRECTIONS:
+            r = row + dr
+            c = col + dc
+            if r < 0 or r >= rows or c < 0 or c >= cols:
+                continue
+            neighbor = r * cols + c
+            if flags[neighbor] & blocking:
+                continue
+            if holds:
+                arrive = step + 1
+                if flags[neighbor] & TRAFFIC and not green_at(neighbor, arrive):
+                    continue
+                if blocked(current, neighbor, arrive):
+                    continue
+            elif timed_at(neighbor, step + 1):
+                arrive = first_free(current, neighbor, step + 1)
+                if arrive is None:
+                    continue
+            else:
+                # Wait in place until the cell can be entered
+                arrive = first_entry(neighbor, step + 1)
+                if arrive is None:
+                    continue
+            move_cost = current_cost + (DIAGONAL_COST if dr and dc else 1) * cost[neighbor]
+            successors.append((neighbor, arrive, move_cost))
+
+        for neighbor, arrive, move_cost in successors:
+            label = (arrive, move_cost)
+            next_key = (neighbor, arrive) if timed_at(neighbor, arrive) else neighbor
+            if label < best.get(next_key, (INF, INF)):
+                best[next_key] = label
+                came_from[next_key] = key
+                count += 1
+                push(open_heap, (arrive + chebyshev(neighbor, goal_i, cols), move_cost,
+                                 count, neighbor, arrive))
+                if track and len(open_heap) > peak:
+                    peak = len(open_heap)
+
+    if track:
+        stats['expanded'] = expanded
+        stats['pushes'] = count + 1
+        stats['max_open'] = peak
+    if found is None:
+        return None
+
+    # Walk the labels back, expanding implicit waits into repeated cells
+    path = []
+    key = found
+    while True:
+        index = key[0] if isinstance(key, tuple) else key
+        step = best[key][0]
+        parent = came_from.get(key)
+        if parent is None:
+            path.append(index)
+            break
+        parent_step = best[parent][0]
+        parent_index = parent[0] if isinstance(parent, tuple) else parent
+        path.extend([index] + [parent_index] * (step - parent_step - 1))
+        key = parent
+    path.reverse()
+    return [divmod(i, cols) for i in path]
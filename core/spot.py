@@ -1,98 +1,103 @@
 import pygame
-import time
 from config.constants import *
+from ui.resources import render_text
+from .clock import get_clock
+from .grid_state import BARRIER, DYNAMIC, TRAFFIC, START, END, KIND_MASK, LIGHT_CODES
+from entities.traffic_light import light_state_at, LIGHT_COLORS
+
+# Display color of each cell kind in the grid state
+KIND_COLORS = {BARRIER: BLACK, DYNAMIC: BLUE, START: ORANGE, END: TURQUOISE}
 
 class Spot:
-    def __init__(self, row, col, width, total_rows):
+    """Drawable view of one cell; passability, cost and light state live in the GridState"""
+
+    def __init__(self, row, col, width, total_rows, state, total_cols=None):
         self.row = row
         self.col = col
+        self.state = state
+        self.index = state.index(row, col)
         self.target_priority = None  
         self.x = row * width
         self.y = col * width
-        self.color = WHITE
+        self._color = WHITE
         self.original_color = WHITE
-        self.neighbors = []
+        self.grid = None  # Set by make_grid; used to turn neighbor cells into spots
         self.width = width
         self.total_rows = total_rows
+        self.total_cols = total_rows if total_cols is None else total_cols
         self.previous = None
-        self.cost = 1
-        
-        # Traffic light properties
-        self.is_traffic_stop = False
-        self.light_state = "green"
-        self.light_cycle_start = time.time()
+
+    @property
+    def color(self):
+        """Display color of this spot"""
+        return self._color
+
+    @color.setter
+    def color(self, value):
+        # Record appearance changes so the renderer can redraw just this cell
+        if value != self._color:
+            self._color = value
+            self.state.dirty_cells.add(self.index)
+
+    @property
+    def neighbors(self):
+        """Passable neighbor spots, derived from the grid state on every access"""
+        grid = self.grid
+        return [grid[r][c] for r, c in self.state.passable_neighbors(self.row, self.col)]
+
+    @property
+    def cost(self):
+        """Movement cost multiplier of this spot"""
+        return self.state.cost[self.index]
+
+    @cost.setter
+    def cost(self, value):
+        self.state.set_cost(self.row, self.col, value)
+
+    @property
+    def is_traffic_stop(self):
+        """Whether this spot holds a traffic light"""
+        return bool(self.state.flags[self.index] & TRAFFIC)
+
+    @is_traffic_stop.setter
+    def is_traffic_stop(self, value):
+        if value:
+            self.state.set_flag(self.row, self.col, TRAFFIC)
+        else:
+            self.state.clear_flag(self.row, self.col, TRAFFIC)
+        self.state.dirty_cells.add(self.index)
+
+    @property
+    def light_cycle_start(self):
+        """Simulation time at which this light's cycle started"""
+        return self.state.get_light_start(self.row, self.col)
+
+    @light_cycle_start.setter
+    def light_cycle_start(self, value):
+        self.state.set_light_start(self.row, self.col, value)
+
+    @property
+    def light_state(self):
+        """Current traffic light state name"""
+        return self.state.get_light(self.row, self.col)
+
+    @light_state.setter
+    def light_state(self, value):
+        if value != self.light_state:
+            self.state.set_light(self.row, self.col, value)
+            self.state.dirty_cells.add(self.index)
 
     def get_pos(self):
         """Get the grid position of this spot"""
         return self.row, self.col
-    # Add these methods to your existing Spot class:
-
-def make_dynamic(self):
-    """Make this spot a dynamic obstacle"""
-    self.color = ORANGE  # Use orange color for dynamic obstacles
-
-def is_dynamic(self):
-    """Check if this spot is a dynamic obstacle"""
-    return self.color == ORANGE
-
-# Modify the existing draw method to include dynamic obstacle rendering:
-def draw(self, win):
-    pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.width))
-    
-    # Draw priority numbers for targets
-    if self.is_end() and hasattr(self, 'priority') and self.priority:
-        font = pygame.font.Font(None, 24)
-        text = font.render(str(self.priority), True, WHITE)
-        text_rect = text.get_rect(center=(self.x + self.width//2, self.y + self.width//2))
+
+    def draw_priority(self, win, x=None, y=None, size=None):
+        """Draw the priority number on a target spot"""
+        if x is None:
+            x, y, size = self.x, self.y, self.width
+        text = render_text(str(self.priority), 24, WHITE)
+        text_rect = text.get_rect(center=(x + size // 2, y + size // 2))
         win.blit(text, text_rect)
-    
-    # Draw traffic lights
-    if self.is_traffic_stop:
-        radius = self.width // 4
-        offset = self.width // 4
-        if self.light_state == "green":
-            pygame.draw.circle(win, GREEN,
-                               (self.x + offset, self.y + offset), radius)
-        elif self.light_state == "yellow":
-            pygame.draw.circle(win, YELLOW,
-                               (self.x + self.width // 2, self.y + offset), radius)
-        else:
-            pygame.draw.circle(win, RED,
-                               (self.x + self.width - offset, self.y + offset), radius)
-    
-    # Draw dynamic obstacle indicator (moving animation)
-    if self.is_dynamic():
-        import time
-        # Create a pulsing effect
-        pulse = int(50 * (1 + 0.5 * abs(time.time() * 2 % 2 - 1)))
-        color_with_pulse = (min(255, ORANGE[0] + pulse), 
-                           min(255, ORANGE[1] + pulse), 
-                           min(255, ORANGE[2]))
-        pygame.draw.rect(win, color_with_pulse, (self.x, self.y, self.width, self.width))
-        
-        # Draw movement indicator
-        center_x, center_y = self.x + self.width//2, self.y + self.width//2
-        pygame.draw.circle(win, WHITE, (center_x, center_y), 3)
-
-# Modify the update_neighbors method to handle dynamic obstacles:
-def update_neighbors(self, grid):
-    self.neighbors = []
-    dirs = [(0, 1), (1, 0), (-1, 0), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1)]
-    for d in dirs:
-        r, c = self.row + d[0], self.col + d[1]
-        if 0 <= r < self.total_rows and 0 <= c < self.total_rows:
-            neighbor = grid[r][c]
-
-            # Check if neighbor is a red traffic light or dynamic obstacle
-            if neighbor.is_traffic_stop and neighbor.light_state == "red":
-                continue  # Skip this neighbor if it's a red light
-            
-            # Dynamic obstacles block movement
-            if neighbor.is_dynamic():
-                continue  # Skip dynamic obstacles
-            
-            if not neighbor.is_barrier():
-                self.neighbors.append(neighbor)
 
     def is_closed(self):
         """Check if this spot is in the closed set (A* algorithm)"""
@@ -104,29 +109,29 @@ def update_neighbors(self, grid):
 
     def is_barrier(self):
         """Check if this spot is a barrier/obstacle"""
-        return self.color == BLACK
+        return bool(self.state.flags[self.index] & BARRIER)
 
     def is_start(self):
         """Check if this spot is the start position"""
-        return self.color == ORANGE
+        return bool(self.state.flags[self.index] & START)
 
     def is_end(self):
         """Check if this spot is an end/target position"""
-        return self.color == TURQUOISE
+        return bool(self.state.flags[self.index] & END)
 
     def is_dynamic(self):
         """Check if this spot is a dynamic obstacle"""
-        return self.color == BLUE
+        return bool(self.state.flags[self.index] & DYNAMIC)
 
     def is_target_spot(self):
         """Check if this spot is a target (alias for is_end)"""
         return self.is_end()
 
     def reset(self):
-        """Reset the spot to its original state"""
+        """Clear the spot's kind and markers; its movement cost stays in the cost layer"""
         self.color = WHITE
         self.original_color = WHITE
-        self.cost = 1
+        self.state.set_kind(self.row, self.col, 0)
         self.previous = None
         self.target_priority = None
 
@@ -134,6 +139,7 @@ def update_neighbors(self, grid):
         """Mark this spot as the start position"""
         self.color = ORANGE
         self.original_color = ORANGE
+        self.state.set_kind(self.row, self.col, START)
 
     def make_closed(self):
         """Mark this spot as closed (A* algorithm)"""
@@ -147,11 +153,13 @@ def update_neighbors(self, grid):
         """Mark this spot as a barrier/obstacle"""
         self.color = BLACK
         self.original_color = BLACK
+        self.state.set_kind(self.row, self.col, BARRIER)
 
     def make_end(self):
         """Mark this spot as an end/target position"""
         self.color = TURQUOISE
         self.original_color = TURQUOISE
+        self.state.set_kind(self.row, self.col, END)
 
     def make_target(self, priority=1):
         """Mark this spot as a target with given priority"""
@@ -166,44 +174,51 @@ def update_neighbors(self, grid):
         """Mark this spot as a dynamic obstacle"""
         self.color = BLUE
         self.original_color = BLUE
+        self.state.set_kind(self.row, self.col, DYNAMIC)
 
     def make_traffic_light(self):
         """Mark this spot as a traffic light"""
+        self.state.set_kind(self.row, self.col, 0)
         self.is_traffic_stop = True
-        self.light_cycle_start = time.time()
+        self.light_cycle_start = get_clock().now()
         self.update_traffic_light()
 
+    def sync_color(self):
+        """Take the display color from what the grid state holds in this cell"""
+        flags = self.state.flags[self.index]
+        if flags & TRAFFIC:
+            self.color = LIGHT_COLORS[self.state.light[self.index]]
+            return
+        color = KIND_COLORS.get(flags & KIND_MASK, WHITE)
+        self.color = color
+        self.original_color = color
+
     def update_traffic_light(self):
-        """Update traffic light state based on timing"""
+        """Update traffic light state based on the simulation clock"""
         if not self.is_traffic_stop:
             return
             
-        current_time = time.time()
-        cycle_pos = ((current_time - self.light_cycle_start) % TRAFFIC_LIGHT_CYCLE) / TRAFFIC_LIGHT_CYCLE
-
-        if cycle_pos < 0.7:  # 70% of cycle is green
-            self.light_state = "green"
-            self.color = GREEN
-        elif cycle_pos < 0.8:  # 10% of cycle is yellow
-            self.light_state = "yellow"
-            self.color = YELLOW
-        else:  # 20% of cycle is red
-            self.light_state = "red"
-            self.color = RED
-
-    def draw(self, win):
-        """Draw this spot on the window"""
-        pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.width))
+        state = light_state_at(get_clock().now(), self.light_cycle_start)
+        self.light_state = state
+        self.color = LIGHT_COLORS[LIGHT_CODES[state]]
+
+    def draw(self, win, rect=None):
+        """Draw this spot on the window, at its world position or at a screen `rect`"""
+        if rect is None:
+            x, y, size = self.x, self.y, self.width
+        else:
+            x, y, size = rect[0], rect[1], rect[2]
+        pygame.draw.rect(win, self.color, (x, y, size, size))
 
         # Draw traffic light indicators
-        if self.is_traffic_stop:
-            radius = self.width // 6
-            center_y = self.y + self.width // 2
+        if self.is_traffic_stop and size >= 6:
+            radius = size // 6
+            center_y = y + size // 2
             
             # Draw three circles for traffic light states
-            red_center = (self.x + self.width // 4, center_y)
-            yellow_center = (self.x + self.width // 2, center_y)
-            green_center = (self.x + 3 * self.width // 4, center_y)
+            red_center = (x + size // 4, center_y)
+            yellow_center = (x + size // 2, center_y)
+            green_center = (x + 3 * size // 4, center_y)
             
             # Draw inactive circles
             pygame.draw.circle(win, GRAY, red_center, radius)
@@ -218,25 +233,10 @@ def update_neighbors(self, grid):
             elif self.light_state == "green":
                 pygame.draw.circle(win, GREEN, green_center, radius)
 
+        # Draw priority numbers for targets (they would spill over smaller cells)
+        if self.is_end() and getattr(self, 'priority', None) and size >= 16:
+            self.draw_priority(win, x, y, size)
+
     def update_neighbors(self, grid):
-        """Update the list of valid neighbors for pathfinding"""
-        self.neighbors = []
-        # 8-directional movement (including diagonals)
-        directions = [(0, 1), (1, 0), (-1, 0), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1)]
-        
-        for dr, dc in directions:
-            r, c = self.row + dr, self.col + dc
-            
-            # Check bounds
-            if 0 <= r < self.total_rows and 0 <= c < self.total_rows:
-                neighbor = grid[r][c]
-
-                # Skip red traffic lights
-                if (hasattr(neighbor, 'is_traffic_stop') and 
-                    neighbor.is_traffic_stop and 
-                    neighbor.light_state == "red"):
-                    continue
-
-                # Skip barriers
-                if not neighbor.is_barrier():
-                    self.neighbors.append(neighbor)
\ No newline at end of file
+        """Attach this spot to its grid; neighbors are derived lazily from the grid state"""
+        self.grid = grid
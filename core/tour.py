@@ -0,0 +1,260 @@
+"""
+Visiting order for several targets (an open travelling-salesman tour)
+
+Pairwise travel costs come from one Dijkstra per point over the static map
+(barriers and cell costs; lights and dynamic obstacles are transient and
+ignored). The costs are cached per map signature and, for larger target
+sets, computed across a process pool. Small sets are solved exactly with
+Held-Karp; larger ones start from nearest-neighbour and are improved with
+2-opt and Or-opt moves.
+"""
+
+import heapq
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from .grid_state import DIRECTIONS, DIAGONAL_COST, BARRIER
+
+INF = float("inf")
+# Largest target count solved exactly (Held-Karp is O(2^n * n^2))
+HELD_KARP_LIMIT = 11
+# Fewest Dijkstra sources worth spreading across processes
+PARALLEL_MIN_SOURCES = 8
+# Map signatures whose costs are kept
+COST_CACHE_MAPS = 4
+
+_cost_cache = {}  # map signature -> {(source, target): cost}
+_worker_map = None
+
+
+def _dijkstra(rows, cols, blocked, cost, source, targets):
+    """Costs from one flat index to each of `targets` (INF where unreachable)"""
+    remaining = set(targets)
+    remaining.discard(source)
+    found = {source: 0.0}
+    dist = {source: 0.0}
+    moves = [(dr * cols + dc, dr, dc, DIAGONAL_COST if dr and dc else 1) for dr, dc in DIRECTIONS]
+    heap = [(0.0, source)]
+    pop, push = heapq.heappop, heapq.heappush
+    while heap and remaining:
+        d, current = pop(heap)
+        if d > dist[current]:
+            continue
+        if current in remaining:
+            remaining.discard(current)
+            found[current] = d
+        row, col = divmod(current, cols)
+        for offset, dr, dc, step in moves:
+            r = row + dr
+            c = col + dc
+            if r < 0 or r >= rows or c < 0 or c >= cols:
+                continue
+            neighbor = current + offset
+            if blocked[neighbor]:
+                continue
+            nd = d + step * cost[neighbor]
+            if nd < dist.get(neighbor, INF):
+                dist[neighbor] = nd
+                push(heap, (nd, neighbor))
+    return [found.get(target, INF) for target in targets]
+
+
+def _init_worker(rows, cols, blocked, cost):
+    global _worker_map
+    _worker_map = (rows, cols, blocked, cost)
+
+
+def _worker_dijkstra(args):
+    source, targets = args
+    return _dijkstra(*_worker_map, source, targets)
+
+
+def pairwise_costs(state, points, workers=None):
+    """Matrix of travel costs between (row, col) points, cached per static map"""
+    blocked = bytes((state.flags_view & BARRIER).data)
+    signature = state.static_signature()
+    cache = _cost_cache.pop(signature, {})
+    _cost_cache[signature] = cache  # Most recently used last
+    while len(_cost_cache) > COST_CACHE_MAPS:
+        del _cost_cache[next(iter(_cost_cache))]
+
+    indices = [state.index(r, c) for r, c in points]
+    sources = [i for i in dict.fromkeys(indices)
+               if any((i, j) not in cache for j in indices)]
+    if sources:
+        jobs = [(source, indices) for source in sources]
+        if len(sources) >= PARALLEL_MIN_SOURCES and (workers is None or workers > 1):
+            workers = min(workers or os.cpu_count() or 1, len(sources))
+            # Plain copy of the cost layer: it may be a view of a mapped file, which does not pickle
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(state.rows, state.cols, blocked,
+                                               array('f', state.cost))) as pool:
+                rows = list(pool.map(_worker_dijkstra, jobs))
+        else:
+            rows = [_dijkstra(state.rows, state.cols, blocked, state.cost, source, indices)
+                    for source, _ in jobs]
+        for source, row in zip(sources, rows):
+            for target, cost in zip(indices, row):
+                cache[(source, target)] = cost
+
+    return [[cache[(a, b)] for b in indices] for a in indices]
+
+
+def route_cost(matrix, route):
+    """Total cost of visiting the nodes of `route` in order"""
+    return sum(matrix[a][b] for a, b in zip(route, route[1:]))
+
+
+def held_karp(matrix, nodes, first):
+    """Cheapest open route starting at `first` through all `nodes` (exact)"""
+    nodes = list(nodes)
+    n = len(nodes)
+    if not n:
+        return [first]
+    # best[(mask, j)] = (cost, previous j) for routes visiting `mask` and ending at nodes[j]
+    best = {(1 << j, j): (matrix[first][nodes[j]], None) for j in range(n)}
+    for size in range(2, n + 1):
+        for mask in range(1 << n):
+            if bin(mask).count("1") != size:
+                continue
+            for j in range(n):
+                if not mask & (1 << j):
+                    continue
+                rest = mask ^ (1 << j)
+                options = [(best[(rest, k)][0] + matrix[nodes[k]][nodes[j]], k)
+                           for k in range(n) if rest & (1 << k)]
+                best[(mask, j)] = min(options)
+    full = (1 << n) - 1
+    end = min(range(n), key=lambda j: best[(full, j)][0])
+    route = []
+    mask = full
+    while end is not None:
+        route.append(nodes[end])
+        end, mask = best[(mask, end)][1], mask ^ (1 << end)
+    route.append(first)
+    route.reverse()
+    return route
+
+
+def nearest_neighbor(matrix, nodes, first):
+    """Greedy open route: always go to the cheapest unvisited node next"""
+    remaining = set(nodes)
+    route = [first]
+    while remaining:
+        here = route[-1]
+        nearest = min(remaining, key=lambda node: (matrix[here][node], node))
+        remaining.discard(nearest)
+        route.append(nearest)
+    return route
+
+
+def _prefix_costs(matrix, route):
+    """Running cost of `route` walked forwards and of each leg walked backwards"""
+    forward = [0.0]
+    backward = [0.0]
+    for a, b in zip(route, route[1:]):
+        forward.append(forward[-1] + matrix[a][b])
+        backward.append(backward[-1] + matrix[b][a])
+    return forward, backward
+
+
+def two_opt(matrix, route):
+    """Improve an open route by reversing segments; route[0] stays fixed"""
+    n = len(route)
+    improved = True
+    while improved:
+        improved = False
+        forward, backward = _prefix_costs(matrix, route)
+        for i in range(1, n - 1):
+            for j in range(i + 1, n):
+                # Reverse route[i..j]; legs inside the segment flip direction
+                before = matrix[route[i - 1]][route[i]] + forward[j] - forward[i]
+                after = matrix[route[i - 1]][route[j]] + backward[j] - backward[i]
+                if j + 1 < n:
+                    before += matrix[route[j]][route[j + 1]]
+                    after += matrix[route[i]][route[j + 1]]
+                if after < before - 1e-9:
+                    route[i:j + 1] = route[i:j + 1][::-1]
+                    improved = True
+                    break
+            if improved:
+                break
+    return route
+
+
+def or_opt(matrix, route):
+    """Improve an open route by moving runs of 1-3 nodes elsewhere; route[0] stays fixed"""
+    def leg(a, b):
+        return 0.0 if b is None else matrix[a][b]
+
+    improved = True
+    while improved:
+        improved = False
+        n = len(route)
+        for length in (1, 2, 3):
+            for i in range(1, n - length + 1):
+                first, last = route[i], route[i + length - 1]
+                prev = route[i - 1]
+                after = route[i + length] if i + length < n else None
+                # Saving from cutting the run out and joining its neighbours
+                removed = leg(prev, first) + leg(last, after) - leg(prev, after)
+                rest = route[:i] + route[i + length:]
+                for k in range(1, len(rest) + 1):
+                    if k == i:
+                        continue
+                    a = rest[k - 1]
+                    b = rest[k] if k < len(rest) else None
+                    added = matrix[a][first] + leg(last, b) - leg(a, b)
+                    if added < removed - 1e-9:
+                        route[:] = rest[:k] + route[i:i + length] + rest[k:]
+                        improved = True
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+    return route
+
+
+def solve_route(matrix, nodes, first):
+    """Good (exact for small sets) open route from `first` through `nodes`"""
+    nodes = list(nodes)
+    if len(nodes) <= HELD_KARP_LIMIT:
+        return held_karp(matrix, nodes, first)
+    route = nearest_neighbor(matrix, nodes, first)
+    before = None
+    while before != route:
+        before = list(route)
+        two_opt(matrix, route)
+        or_opt(matrix, route)
+    return route
+
+
+def plan_tour(state, start, targets, priorities=None, workers=None):
+    """Order in which to visit `targets` (row, col) from `start`
+
+    Returns a list of indices into `targets`. With `priorities` (one value per
+    target) every target of a lower priority value is visited before any of
+    a higher one, and the order is only optimized within each priority.
+    Targets unreachable from the start go last.
+    """
+    if not targets:
+        return []
+    matrix = pairwise_costs(state, [start] + list(targets), workers)
+    nodes = range(1, len(targets) + 1)
+    unreachable = [node for node in nodes if matrix[0][node] == INF]
+    reachable = [node for node in nodes if matrix[0][node] != INF]
+
+    if priorities is None:
+        groups = [reachable]
+    else:
+        levels = sorted({priorities[node - 1] for node in reachable})
+        groups = [[node for node in reachable if priorities[node - 1] == level] for level in levels]
+
+    order = []
+    here = 0
+    for group in groups:
+        route = solve_route(matrix, group, here)
+        order.extend(route[1:])
+        here = route[-1]
+    return [node - 1 for node in order + unreachable]
@@ -1,12 +1,30 @@
 """
 Dynamic obstacles that move around the grid
+
+Obstacles that follow a path are DynamicObstacle objects. Random walkers
+placed by hand live in an ObstacleSwarm instead, which keeps them as
+arrays and moves every walker that is due in one batched step per tick.
 """
+import math
 import random
-import time
+from collections import deque
+import numpy as np
 from config.constants import *
+from config.settings import vectorized_obstacles
+from core.clock import get_clock, TICK_EPSILON
+from core.forecast import ObstacleForecast
+from core.grid_state import BARRIER, DYNAMIC, TRAFFIC, START, END
+
+# Cells an obstacle may not move into
+OBSTACLE_BLOCKERS = BARRIER | DYNAMIC | TRAFFIC | START | END
+# Random walk headings as (row, col) steps
+HEADINGS = np.array([(0, 1), (1, 0), (-1, 0), (0, -1)], dtype=np.int64)
+# Cells a random walker may be on after its next move
+REACH = ((0, 0), (0, 1), (1, 0), (-1, 0), (0, -1))
 
 class DynamicObstacle:
-    def __init__(self, row=None, col=None, grid=None, path=None, name="Dynamic Obstacle", speed=1):
+    def __init__(self, row=None, col=None, grid=None, path=None, name="Dynamic Obstacle", speed=1,
+                 clock=None):
         if path:
             # Path-based obstacle
             self.path = path
@@ -26,30 +44,87 @@ class DynamicObstacle:
         
         self.name = name
         self.speed = speed
-        self.last_move_time = time.time()
-        self.move_interval = random.uniform(1.0, 3.0) / speed  # Move interval affected by speed
+        self.clock = clock or get_clock()
+        self.last_move_time = self.clock.now()
+        self.move_interval = random.uniform(*OBSTACLE_MOVE_INTERVAL) / speed  # Move interval affected by speed
+        self.upcoming = deque()  # Later move intervals, drawn ahead for forecasts
         self.direction = random.choice([(0, 1), (1, 0), (-1, 0), (0, -1)])
-        self.id = f"dynamic_{row}_{col}_{int(time.time())}"
+        self.id = f"dynamic_{row}_{col}_{self.clock.ticks}"
+        self.on_move = None  # Called as on_move(obstacle, (old_row, old_col)) after a move
         
         # Mark the initial position as dynamic
         if self.current:
             self.current.make_dynamic()
     
     def update(self):
-        """Update the obstacle position"""
-        current_time = time.time()
+        """Update the obstacle position when its move interval has elapsed"""
+        current_time = self.clock.now()
         
         if current_time - self.last_move_time >= self.move_interval:
             self.move()
             self.last_move_time = current_time
-            self.move_interval = random.uniform(1.0, 3.0) / self.speed
+            self.move_interval = self._draw_interval()
+
+    def next_move_time(self):
+        """Clock time of the next move"""
+        return self._move_time(self.last_move_time, self.move_interval)
+
+    def on_due(self, now):
+        """Scheduler action: move if due, then return the next move time"""
+        self.update()
+        return self.next_move_time()
+
+    def _draw_interval(self):
+        """Next move interval: the oldest one drawn ahead for a forecast, or a fresh one"""
+        if self.upcoming:
+            return self.upcoming.popleft()
+        return random.uniform(*OBSTACLE_MOVE_INTERVAL) / self.speed
+
+    def _move_time(self, since, interval):
+        """Clock time of a move due `interval` seconds after `since` (the first tick reaching it)"""
+        tick = getattr(self.clock, 'tick', 0)
+        if tick:
+            return since + math.ceil(interval / tick - TICK_EPSILON) * tick
+        return since + interval
+
+    def forecast(self, forecast):
+        """Add the cells this obstacle will hold within the horizon to an ObstacleForecast"""
+        if not self.current:
+            return
+        move_time = self.next_move_time()
+        if not self.path:
+            # Random walker: its cell until the next move, then its cell or a neighbour
+            state = self.current.state
+            reach = move_time + OBSTACLE_MOVE_INTERVAL[0] / self.speed
+            forecast.add(self.current.index, forecast.start_time, move_time)
+            for dr, dc in REACH:
+                if state.in_bounds(self.row + dr, self.col + dc):
+                    forecast.add(state.index(self.row + dr, self.col + dc), move_time, reach)
+            return
+
+        # Path follower: walk the path, drawing the intervals it will use
+        spot, index, since = self.current, self.index, forecast.start_time
+        k = 0
+        while True:
+            forecast.add(spot.index, since, move_time)
+            if move_time >= forecast.end_time:
+                return
+            if k == len(self.upcoming):
+                self.upcoming.append(random.uniform(*OBSTACLE_MOVE_INTERVAL) / self.speed)
+            index = (index + 1) % len(self.path)
+            spot = self.path[index]
+            since, move_time = move_time, self._move_time(move_time, self.upcoming[k])
+            k += 1
     
     def move(self):
         """Move the obstacle to a new position"""
+        old_cell = (self.row, self.col)
         if self.path:
             self._move_along_path()
         else:
             self._move_randomly()
+        if self.on_move and (self.row, self.col) != old_cell:
+            self.on_move(self, old_cell)
     
     def _move_along_path(self):
         """Move along predefined path"""
@@ -66,11 +141,8 @@ class DynamicObstacle:
         self.row = self.current.row
         self.col = self.current.col
         
-        # Only mark as dynamic if it's not a barrier, start, or end
-        if (not self.current.is_barrier() and 
-            not self.current.is_start() and 
-            not self.current.is_end() and
-            not self.current.is_traffic_stop):
+        # Only mark as dynamic if it's not a barrier, start, end or light
+        if not self.current.state.flags[self.current.index] & OBSTACLE_BLOCKERS:
             self.current.make_dynamic()
     
     def _move_randomly(self):
@@ -82,77 +154,476 @@ class DynamicObstacle:
         if self.current and self.current.is_dynamic():
             self.current.reset()
         
+        state = self.grid.state
+        
         # Try to find a valid new position
         attempts = 0
-        while attempts < 8:  # Try 8 different directions
+        while attempts < OBSTACLE_MOVE_ATTEMPTS:  # Try several different directions
             # Randomly change direction sometimes
-            if random.random() < 0.3:
+            if random.random() < OBSTACLE_TURN_CHANCE:
                 self.direction = random.choice([(0, 1), (1, 0), (-1, 0), (0, -1)])
             
             new_row = self.row + self.direction[0]
             new_col = self.col + self.direction[1]
             
-            # Check bounds
-            if 0 <= new_row < len(self.grid) and 0 <= new_col < len(self.grid[0]):
+            # Check bounds and that the new position is free
+            if (state.in_bounds(new_row, new_col) and
+                    not state.has(new_row, new_col, OBSTACLE_BLOCKERS)):
                 new_spot = self.grid[new_row][new_col]
                 
-                # Check if the new position is valid
-                if (not new_spot.is_barrier() and 
-                    not new_spot.is_start() and 
-                    not new_spot.is_end() and 
-                    not new_spot.is_dynamic() and
-                    not new_spot.is_traffic_stop):
-                    
-                    # Move to new position
-                    self.row = new_row
-                    self.col = new_col
-                    self.current = new_spot
-                    new_spot.make_dynamic()
-                    return
+                # Move to new position
+                self.row = new_row
+                self.col = new_col
+                self.current = new_spot
+                new_spot.make_dynamic()
+                return
             
             # If current direction doesn't work, try a random one
             self.direction = random.choice([(0, 1), (1, 0), (-1, 0), (0, -1)])
             attempts += 1
 
+        # Boxed in: stay put and keep the cell marked
+        if self.current:
+            self.current.make_dynamic()
+
+class ObstacleSwarm:
+    """Random-walk obstacles stored as a struct of arrays and moved in batches
+
+    Each walker is a slot in parallel arrays (row, col, heading, speed and
+    next move time), and `occupant` maps every cell to the slot standing on
+    it (-1 for none). update() selects the walkers that are due and tries
+    all their moves at once: bounds and blocker checks are array masks,
+    walkers heading for the same cell are settled by letting the first one
+    have it, and the losers turn at random and try again in the next round,
+    as DynamicObstacle does one walker at a time. The flags of the cells
+    left and entered are then written in bulk.
+    """
+
+    def __init__(self, grid, clock=None, capacity=64):
+        self.grid = grid
+        self.state = grid.state
+        self.clock = clock or get_clock()
+        # Seeded from `random` so seeded headless runs stay reproducible
+        self.rng = np.random.default_rng(random.getrandbits(32))
+        self.count = 0
+        self.row = np.zeros(capacity, dtype=np.int64)
+        self.col = np.zeros(capacity, dtype=np.int64)
+        self.heading = np.zeros(capacity, dtype=np.int64)  # Index into HEADINGS
+        self.speed = np.ones(capacity)
+        self.next_move = np.zeros(capacity)
+        self.occupant = np.full(self.state.rows * self.state.cols, -1, dtype=np.int64)
+        self.wake = np.inf  # Earliest next_move of any walker
+
+    def _grow(self):
+        """Double the capacity of the walker arrays"""
+        size = 2 * len(self.row)
+        for name in ("row", "col", "heading", "speed", "next_move"):
+            old = getattr(self, name)
+            new = np.zeros(size, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def add(self, row, col, speed=1):
+        """Place a walker on a free cell; returns its slot, or None if the cell is blocked"""
+        state = self.state
+        if not state.in_bounds(row, col) or state.has(row, col, OBSTACLE_BLOCKERS):
+            return None
+        if self.count == len(self.row):
+            self._grow()
+        slot = self.count
+        self.count += 1
+        self.row[slot] = row
+        self.col[slot] = col
+        self.heading[slot] = self.rng.integers(len(HEADINGS))
+        self.speed[slot] = speed
+        self.next_move[slot] = self.clock.now() + self.rng.uniform(*OBSTACLE_MOVE_INTERVAL) / speed
+        self.wake = min(self.wake, self.next_move[slot])
+        index = state.index(row, col)
+        self.occupant[index] = slot
+        self.grid.refresh(state.set_flags_at([index], DYNAMIC).tolist())
+        return slot
+
+    def remove(self, slot):
+        """Take a walker off the grid; the last walker moves into its slot"""
+        index = self.state.index(self.row[slot], self.col[slot])
+        self.occupant[index] = -1
+        self.grid.refresh(self.state.clear_flags_at([index], DYNAMIC).tolist())
+        last = self.count - 1
+        if slot != last:
+            for array in (self.row, self.col, self.heading, self.speed, self.next_move):
+                array[slot] = array[last]
+            self.occupant[self.state.index(self.row[slot], self.col[slot])] = slot
+        self.count = last
+        self.wake = self.next_move[:last].min(initial=np.inf)
+
+    def slot_at(self, row, col):
+        """Slot of the walker on a cell, or None"""
+        if not self.state.in_bounds(row, col):
+            return None
+        slot = int(self.occupant[self.state.index(row, col)])
+        return slot if slot >= 0 else None
+
+    def remove_at(self, row, col):
+        """Remove the walker on a cell; returns whether there was one"""
+        slot = self.slot_at(row, col)
+        if slot is None:
+            return False
+        self.remove(slot)
+        return True
+
+    def near(self, row, col, radius):
+        """(rows, cols) arrays of the walkers within `radius` cells (Chebyshev distance)"""
+        state = self.state
+        r0, c0 = max(0, row - radius), max(0, col - radius)
+        window = self.occupant.reshape(state.rows, state.cols)[r0:row + radius + 1, c0:col + radius + 1]
+        rows, cols = np.nonzero(window >= 0)
+        return rows + r0, cols + c0
+
+    def occupied(self, index, from_time, to_time):
+        """Forecast query: may a walker be on a cell at any time in [from_time, to_time)?
+
+        A walker holds its cell until its next move and may then be on that
+        cell or a neighbour for its shortest move interval.
+        """
+        state = self.state
+        row, col = divmod(index, state.cols)
+        shortest = OBSTACLE_MOVE_INTERVAL[0]
+        for dr, dc in REACH:
+            r, c = row + dr, col + dc
+            if not state.in_bounds(r, c):
+                continue
+            slot = self.occupant[r * state.cols + c]
+            if slot < 0:
+                continue
+            move_time = self.next_move[slot]
+            # Its own cell is held from now on, a neighbour only after the move
+            if from_time < move_time + shortest / self.speed[slot] and (
+                    not (dr or dc) or move_time < to_time):
+                return True
+        return False
+
+    def reach_cells(self):
+        """Flat indices a walker may be on up to its next move: its cell and neighbours"""
+        state = self.state
+        rows, cols = self.row[:self.count], self.col[:self.count]
+        cells = []
+        for dr, dc in REACH:
+            r, c = rows + dr, cols + dc
+            inside = (r >= 0) & (r < state.rows) & (c >= 0) & (c < state.cols)
+            cells.append(r[inside] * state.cols + c[inside])
+        return np.unique(np.concatenate(cells)).tolist()
+
+    def positions(self):
+        """(rows, cols) arrays of every walker's cell"""
+        return self.row[:self.count].copy(), self.col[:self.count].copy()
+
+    def clear(self):
+        """Remove every walker"""
+        cells = self.row[:self.count] * self.state.cols + self.col[:self.count]
+        self.occupant[cells] = -1
+        self.grid.refresh(self.state.clear_flags_at(cells, DYNAMIC).tolist())
+        self.count = 0
+        self.wake = np.inf
+
+    def next_move_time(self):
+        """Time of the earliest walker move (inf with no walkers)"""
+        return self.wake
+
+    def on_due(self, now):
+        """Scheduler action: move the due walkers, then return the next move time"""
+        self.update()
+        return self.wake
+
+    def update(self):
+        """Move every walker whose interval has elapsed; returns how many moved"""
+        now = self.clock.now()
+        if now < self.wake:
+            return 0
+        n = self.count
+        due = np.flatnonzero(self.next_move[:n] <= now)
+        state = self.state
+        rows, cols = state.rows, state.cols
+        flags = state.flags_view.reshape(-1)
+        rng = self.rng
+
+        heading = self.heading[due]
+        turn = rng.random(len(due)) < OBSTACLE_TURN_CHANCE
+        heading[turn] = rng.integers(len(HEADINGS), size=int(turn.sum()))
+        pending = due
+        changed = []
+        moved = 0
+        for _ in range(OBSTACLE_MOVE_ATTEMPTS):
+            step = HEADINGS[heading]
+            new_row = self.row[pending] + step[:, 0]
+            new_col = self.col[pending] + step[:, 1]
+            inside = (new_row >= 0) & (new_row < rows) & (new_col >= 0) & (new_col < cols)
+            target = np.where(inside, new_row * cols + new_col, 0)
+            free = np.flatnonzero(inside & (flags[target] & OBSTACLE_BLOCKERS == 0))
+            # Walkers after the same cell: the first one gets it
+            _, first = np.unique(target[free], return_index=True)
+            won = free[first]
+
+            if len(won):
+                slots = pending[won]
+                old = self.row[slots] * cols + self.col[slots]
+                new = target[won]
+                self.row[slots] = new_row[won]
+                self.col[slots] = new_col[won]
+                self.heading[slots] = heading[won]
+                self.occupant[old] = -1
+                self.occupant[new] = slots
+                # Cells left this round are free for the walkers still trying
+                changed.append(state.clear_flags_at(old, DYNAMIC))
+                changed.append(state.set_flags_at(new, DYNAMIC))
+                moved += len(won)
+
+            lost = np.ones(len(pending), dtype=bool)
+            lost[won] = False
+            pending = pending[lost]
+            if not len(pending):
+                break
+            # Blocked or beaten to the cell: turn at random and try again
+            heading = rng.integers(len(HEADINGS), size=len(pending))
+            self.heading[pending] = heading
+
+        self.next_move[due] = now + rng.uniform(*OBSTACLE_MOVE_INTERVAL, size=len(due)) / self.speed[due]
+        self.wake = self.next_move[:n].min(initial=np.inf)
+        if changed:
+            self.grid.refresh(np.concatenate(changed).tolist())
+        return moved
+
 class DynamicObstacleManager:
+    """Moving obstacles plus an index of the cells they occupy
+
+    `cells` maps every occupied (row, col) to the obstacles on it and is
+    kept up to date as they move, so "who is at (r, c)" is one dict lookup
+    and "what is within k cells" looks at no more than (2k + 1)^2 cells.
+    Removal swaps the last obstacle into the freed slot, so it is O(1) but
+    does not keep the list order.
+
+    With the vectorized_obstacles setting, random walkers go into `swarm`
+    (an ObstacleSwarm for the grid they were placed on) rather than the
+    object list; the counts and removal by cell cover both.
+
+    Obstacles are moved either by polling update_all() every tick or, once
+    attach() gave the manager a Scheduler, by one event per obstacle (and
+    one for the swarm) that only runs when a move is due.
+    """
+
     def __init__(self):
         self.obstacles = []
+        self.cells = {}    # (row, col) -> obstacles on that cell
+        self._slots = {}   # obstacle -> its position in self.obstacles
+        self.swarm = None
+        self.scheduler = None
+        self._events = {}  # obstacle or swarm -> its scheduler Event
+
+    def attach(self, scheduler):
+        """Move the obstacles from scheduler events instead of update_all()"""
+        self._unschedule_all()
+        self.scheduler = scheduler
+        for obstacle in self.obstacles:
+            self._schedule(obstacle)
+        if self.swarm is not None:
+            self._schedule(self.swarm)
+
+    def _schedule(self, mover):
+        """(Re)schedule an obstacle or the swarm at its next move time"""
+        if self.scheduler is None:
+            return
+        event = self._events.get(mover)
+        if event is None:
+            self._events[mover] = self.scheduler.schedule(mover.next_move_time(), mover.on_due)
+        else:
+            self.scheduler.reschedule(event, mover.next_move_time())
+
+    def _unschedule(self, mover):
+        """Cancel the event of an obstacle or the swarm"""
+        event = self._events.pop(mover, None)
+        if event is not None:
+            self.scheduler.cancel(event)
+
+    def _unschedule_all(self):
+        """Cancel every obstacle event"""
+        for event in self._events.values():
+            self.scheduler.cancel(event)
+        self._events.clear()
     
-    def add_obstacle(self, row=None, col=None, grid=None, path=None, name=None, speed=1):
-        """Add a new dynamic obstacle"""
+    def _track(self, obstacle):
+        """Start indexing an obstacle"""
+        self._slots[obstacle] = len(self.obstacles)
+        self.obstacles.append(obstacle)
+        self.cells.setdefault((obstacle.row, obstacle.col), []).append(obstacle)
+        obstacle.on_move = self._moved
+        self._schedule(obstacle)
+
+    def _unindex(self, obstacle, cell):
+        """Drop an obstacle from a cell's entry"""
+        here = self.cells.get(cell)
+        if here and obstacle in here:
+            here.remove(obstacle)
+            if not here:
+                del self.cells[cell]
+
+    def _moved(self, obstacle, old_cell):
+        """Move an obstacle's index entry after it stepped"""
+        self._unindex(obstacle, old_cell)
+        self.cells.setdefault((obstacle.row, obstacle.col), []).append(obstacle)
+        # The mover cleared the cell it left; re-mark it if another obstacle is still there
+        others = self.cells.get(old_cell)
+        if others:
+            spot = others[0].current
+            if spot and not spot.state.flags[spot.index] & OBSTACLE_BLOCKERS:
+                spot.make_dynamic()
+
+    def add_obstacle(self, row=None, col=None, grid=None, path=None, name=None, speed=1, clock=None):
+        """Add a new dynamic obstacle
+
+        A random walker joins the swarm when vectorized_obstacles is on; it
+        has no object, so None is returned.
+        """
+        if not path and grid is not None and vectorized_obstacles:
+            if self.swarm is None or self.swarm.grid is not grid:
+                if self.swarm is not None:
+                    self._unschedule(self.swarm)
+                self.swarm = ObstacleSwarm(grid, clock)
+            self.swarm.add(row, col, speed)
+            self._schedule(self.swarm)
+            return None
+
         if name is None:
             name = f"Obstacle {len(self.obstacles) + 1}"
         
-        obstacle = DynamicObstacle(row, col, grid, path, name, speed)
-        self.obstacles.append(obstacle)
+        obstacle = DynamicObstacle(row, col, grid, path, name, speed, clock)
+        self._track(obstacle)
         return obstacle
+
+    def set_obstacles(self, obstacles):
+        """Replace the managed obstacles (e.g. with the ones of a loaded map)
+
+        With vectorized_obstacles, random walkers among them move into the
+        swarm of their grid.
+        """
+        for obstacle in self.obstacles:
+            obstacle.on_move = None
+        self._unschedule_all()
+        self.obstacles = []
+        self.cells.clear()
+        self._slots.clear()
+        self.swarm = None
+        for obstacle in obstacles:
+            if not obstacle.path and obstacle.current and vectorized_obstacles:
+                obstacle.current.reset()
+                self.add_obstacle(obstacle.row, obstacle.col, obstacle.grid, speed=obstacle.speed,
+                                  clock=obstacle.clock)
+            else:
+                self._track(obstacle)
     
     def remove_obstacle(self, obstacle):
         """Remove a dynamic obstacle"""
-        # Clear its position
-        if obstacle.current and obstacle.current.is_dynamic():
+        slot = self._slots.pop(obstacle, None)
+        if slot is None:
+            return
+        last = self.obstacles.pop()
+        if last is not obstacle:
+            self.obstacles[slot] = last
+            self._slots[last] = slot
+        cell = (obstacle.row, obstacle.col)
+        self._unindex(obstacle, cell)
+        self._unschedule(obstacle)
+        obstacle.on_move = None
+
+        # Clear its position unless another obstacle shares it
+        if obstacle.current and obstacle.current.is_dynamic() and cell not in self.cells:
             obstacle.current.reset()
-        
-        if obstacle in self.obstacles:
-            self.obstacles.remove(obstacle)
+
+    def forecast(self, state, start_time, horizon):
+        """ObstacleForecast of every obstacle on a grid state for `horizon` seconds from `start_time`
+
+        Dynamic cells no managed obstacle accounts for are expected to stay put.
+        """
+        forecast = ObstacleForecast(start_time, horizon)
+        known = np.zeros(state.rows * state.cols, dtype=bool)
+        for obstacle in self.obstacles:
+            if obstacle.current and obstacle.current.state is state:
+                obstacle.forecast(forecast)
+                known[obstacle.current.index] = True
+        if self.swarm is not None and self.swarm.state is state:
+            forecast.add_source(self.swarm.occupied, self.swarm.reach_cells())
+            known |= self.swarm.occupant >= 0
+        stray = np.flatnonzero((state.flags_view.reshape(-1) & DYNAMIC != 0) & ~known)
+        for index in stray.tolist():
+            forecast.add(index, start_time, forecast.end_time)
+        return forecast
+
+    def remove_at(self, row, col):
+        """Remove the obstacle on a cell, object or swarm walker; returns whether there was one"""
+        obstacle = self.obstacle_at(row, col)
+        if obstacle:
+            self.remove_obstacle(obstacle)
+            return True
+        return self.swarm is not None and self.swarm.remove_at(row, col)
+
+    def obstacle_at(self, row, col):
+        """The obstacle on a cell (the latest to arrive if several are), or None"""
+        here = self.cells.get((row, col))
+        return here[-1] if here else None
+
+    def obstacles_at(self, row, col):
+        """All obstacles on a cell"""
+        return list(self.cells.get((row, col), ()))
+
+    def obstacles_near(self, row, col, radius):
+        """Obstacles within `radius` cells of a cell (Chebyshev distance, so a square)"""
+        cells = self.cells
+        if (2 * radius + 1) ** 2 > len(cells):
+            # Fewer occupied cells than cells in the square: check those instead
+            return [obstacle for (r, c), here in cells.items()
+                    if abs(r - row) <= radius and abs(c - col) <= radius
+                    for obstacle in here]
+        found = []
+        for r in range(row - radius, row + radius + 1):
+            for c in range(col - radius, col + radius + 1):
+                here = cells.get((r, c))
+                if here:
+                    found.extend(here)
+        return found
     
     def update_all(self):
         """Update all dynamic obstacles"""
         for obstacle in self.obstacles:
             obstacle.update()
+        if self.swarm:
+            self.swarm.update()
     
     def clear_all(self):
         """Clear all dynamic obstacles"""
         for obstacle in self.obstacles:
+            obstacle.on_move = None
             # Clear their positions
             if obstacle.current and obstacle.current.is_dynamic():
                 obstacle.current.reset()
+        self._unschedule_all()
         self.obstacles.clear()
+        self.cells.clear()
+        self._slots.clear()
+        if self.swarm:
+            self.swarm.clear()
     
     def get_obstacle_count(self):
         """Get the number of active obstacles"""
-        return len(self.obstacles)
+        return len(self.obstacles) + (self.swarm.count if self.swarm else 0)
     
     def get_obstacles(self):
         """Get all obstacles"""
-        return self.obstacles
\ No newline at end of file
+        return self.obstacles
+
+    def walkers(self):
+        """(row, col, speed) of every random walker, swarm and object alike"""
+        walkers = [(obstacle.row, obstacle.col, obstacle.speed)
+                   for obstacle in self.obstacles if not obstacle.path]
+        if self.swarm is not None:
+            count = self.swarm.count
+            walkers.extend(zip(self.swarm.row[:count].tolist(), self.swarm.col[:count].tolist(),
+                               self.swarm.speed[:count].tolist()))
+        return walkers
@@ -0,0 +1,132 @@
+"""
+Traffic light scheduling
+
+All lights share one cycle (green, then yellow, then red) and differ only in
+the simulation time their cycle started. TrafficLightController keeps the
+light cells and their phase offsets in arrays, recomputes every light in one
+vectorized pass and then sleeps until the earliest upcoming switch, so
+frames in which no light flips cost a single comparison.
+"""
+
+import numpy as np
+from config.constants import *
+from core.clock import get_clock
+from core.grid_state import TRAFFIC, LIGHT_GREEN, LIGHT_YELLOW, LIGHT_RED, LIGHT_STATES
+
+# Display color for each light code
+LIGHT_COLORS = (GREEN, YELLOW, RED)
+
+GREEN_END = LIGHT_GREEN_SHARE * TRAFFIC_LIGHT_CYCLE
+YELLOW_END = (LIGHT_GREEN_SHARE + LIGHT_YELLOW_SHARE) * TRAFFIC_LIGHT_CYCLE
+# Wake slightly early so rounding in the switch time never delays a flip
+SWITCH_EPSILON = 1e-9
+
+
+def light_state_at(now, cycle_start):
+    """Light state name at time `now` for a light whose cycle began at `cycle_start`"""
+    elapsed = (now - cycle_start) % TRAFFIC_LIGHT_CYCLE
+    if elapsed < GREEN_END:
+        return "green"
+    if elapsed < YELLOW_END:
+        return "yellow"
+    return "red"
+
+
+def light_codes_at(now, cycle_starts):
+    """Vectorized light_state_at: array of light codes for an array of cycle starts"""
+    elapsed = (now - cycle_starts) % TRAFFIC_LIGHT_CYCLE
+    return np.where(elapsed < GREEN_END, LIGHT_GREEN,
+                    np.where(elapsed < YELLOW_END, LIGHT_YELLOW, LIGHT_RED)).astype(np.uint8)
+
+
+def time_to_switch(now, cycle_starts):
+    """Array of seconds until each light next changes state"""
+    elapsed = (now - cycle_starts) % TRAFFIC_LIGHT_CYCLE
+    return np.where(elapsed < GREEN_END, GREEN_END - elapsed,
+                    np.where(elapsed < YELLOW_END, YELLOW_END - elapsed,
+                             TRAFFIC_LIGHT_CYCLE - elapsed))
+
+
+class TrafficLightController:
+    """Updates every traffic light on a grid, only when one is due to flip"""
+
+    def __init__(self, grid, clock=None):
+        self.clock = clock  # None follows the shared simulation clock
+        self.listeners = []
+        self.set_grid(grid)
+
+    def set_grid(self, grid):
+        """Attach the controller to a (new) grid"""
+        self.grid = grid
+        self.state = grid.state
+        self.indices = np.empty(0, dtype=np.intp)
+        self.starts = np.empty(0)
+        self.next_switch = float("inf")
+        self._lights_version = None
+
+    def add_listener(self, callback):
+        """Call `callback(changes)` with a list of (row, col, state) whenever lights flip"""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Stop notifying a listener"""
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def _rebuild(self):
+        """Re-index the light cells and their phase offsets from the grid state"""
+        state = self.state
+        self.indices = np.flatnonzero(state.flags_view.ravel() & TRAFFIC)
+        light_start = state.light_start
+        self.starts = np.array([light_start.get(i, 0.0) for i in self.indices.tolist()], dtype=float)
+        self._lights_version = state.lights_version
+
+    def stale(self):
+        """Check if lights were added, removed or re-phased since the last update"""
+        return self._lights_version != self.state.lights_version
+
+    def on_due(self, now):
+        """Scheduler action: update the lights, then return the time of the next switch"""
+        self.update(now)
+        return self.next_switch
+
+    def update(self, now=None):
+        """Bring every light up to date; returns the list of (row, col, state) that changed"""
+        if now is None:
+            now = (self.clock or get_clock()).now()
+
+        rebuilt = self.stale()
+        if rebuilt:
+            self._rebuild()
+        elif now < self.next_switch - SWITCH_EPSILON:
+            return []
+
+        if not len(self.indices):
+            self.next_switch = float("inf")
+            return []
+
+        codes = light_codes_at(now, self.starts)
+        if rebuilt:
+            # New or re-phased lights may not have their colors yet
+            changed = np.arange(len(codes))
+        else:
+            changed = np.flatnonzero(codes != self.state.light_view.ravel()[self.indices])
+        self.next_switch = now + float(time_to_switch(now, self.starts).min())
+
+        changes = []
+        cols = self.state.cols
+        for k in changed.tolist():
+            row, col = divmod(int(self.indices[k]), cols)
+            code = int(codes[k])
+            spot = self.grid[row][col]
+            name = LIGHT_STATES[code]
+            flipped = spot.light_state != name
+            spot.light_state = name
+            spot.color = LIGHT_COLORS[code]
+            if flipped:
+                changes.append((row, col, name))
+
+        if changes:
+            for listener in self.listeners:
+                listener(changes)
+        return changes
@@ -2,8 +2,8 @@
 Trail markers for robot path visualization
 """
 
-import pygame
 from config.constants import FADING_SPEED
+from ui.resources import trail_sprite, alpha_bucket
 
 class TrailMarker:
     def __init__(self, pos, color, size):
@@ -17,14 +17,16 @@ class TrailMarker:
         """Update the trail marker (fade over time)"""
         self.alpha = max(0, self.alpha - FADING_SPEED)
     
-    def draw(self, win):
-        """Draw the trail marker"""
+    def draw(self, win, camera=None):
+        """Draw the trail marker, through a camera if given"""
         if self.alpha > 0:
-            # Create a surface for transparency
-            s = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-            color_with_alpha = (*self.color[:3], self.alpha)
-            pygame.draw.circle(s, color_with_alpha, (self.size, self.size), self.size)
-            win.blit(s, (self.pos[0] - self.size, self.pos[1] - self.size))
+            pos, size = self.pos, self.size
+            if camera is not None:
+                pos = camera.to_screen(*pos)
+                size = max(1, int(size * camera.scale))
+            # Reuse a cached translucent sprite instead of allocating one per frame
+            sprite = trail_sprite(tuple(self.color[:3]), size, alpha_bucket(self.alpha))
+            win.blit(sprite, (pos[0] - size, pos[1] - size))
     
     def is_faded(self):
         """Check if the trail marker has completely faded"""
@@ -2,12 +2,20 @@ import pygame
 import os
 from config.settings import *
 from config.constants import *
-from core.grid import make_grid, get_clicked_pos
+from core.grid import make_grid
 from core.robot import Robot
-from ui.renderer import draw
-from ui.input_handler import get_text_input
+from core.clock import SimClock, set_clock
+from core.scheduler import Scheduler
+from core.tour import plan_tour
+from ui.renderer import DirtyRenderer
+from ui.input_handler import get_text_input, get_file_path
 from utils.file_manager import save_map, load_map, save_obstacles, load_obstacles
+from utils.image_import import import_image
 from entities.dynamic_obstacle import DynamicObstacleManager
+from entities.traffic_light import TrafficLightController
+
+# File dialog filter for the image map importer
+IMAGE_FILETYPES = [("Images", "*.png *.jpg *.jpeg *.bmp *.gif *.tif *.tiff"), ("All files", "*.*")]
 
 def main(win, width):
     global sim_speed, traffic_light_tool
@@ -17,63 +25,109 @@ def main(win, width):
         os.makedirs("maps")
 
     pygame.font.init()
-    grid = make_grid(ROWS, width)
+    grid = make_grid(ROWS, COLS)
     start = robot = None
     barrier_mode = False
     traffic_light_tool = False
     dynamic_obstacle_tool = False  # ✅ New tool for dynamic obstacles
+    plan_vis = plan_visualization  # Planner visualization policy
+    planner = default_planner  # Planning backend for new robots
     click_count = 0
     barrier_placed = False 
     priority_counter = 1
     targets = []
     run = True
     clock = pygame.time.Clock()
+    sim_clock = set_clock(SimClock(SIM_TICK))  # Advanced one tick per frame
     sim_running = False
     
     # ✅ Dynamic obstacle manager
     dynamic_manager = DynamicObstacleManager()
+    renderer = DirtyRenderer(win, width)
+    camera = renderer.camera
+    lights = TrafficLightController(grid)
 
-    while run:
-        clock.tick(30)
-
-        # Update traffic lights
-        for row in grid:
-            for spot in row:
-                if spot.is_traffic_stop:
-                    spot.update_traffic_light()
-        
-        # ✅ Update dynamic obstacles
-        dynamic_manager.update_all()
-
-        draw(win, grid, ROWS, width,
-             robot.trails if robot else [],
-             robot.get_center() if robot else None,
-             robot,
-             barrier_mode,
-             dynamic_obstacle_tool)  # ✅ Pass dynamic tool state
-
-        if sim_running and robot:
-            if not robot.reached_goal():
-                robot.step()
-            elif targets:
-                robot.start = robot.current  # Continue from last position
-                # ✅ Sort targets by priority before getting next one
+    # Lights, obstacles and the robot run only when their next action is due
+    scheduler = Scheduler()
+    dynamic_manager.attach(scheduler)
+    light_event = scheduler.schedule(sim_clock.now(), lights.on_due)
+
+    def advance_robot(now):
+        """Scheduler action: step the robot or send it to its next target"""
+        nonlocal sim_running
+        if not (sim_running and robot):
+            return None
+        if not robot.reached_goal():
+            robot.step()
+            # Pick the next target on the following tick
+            return now if robot.reached_goal() else robot.next_step_time()
+        if targets:
+            robot.start = robot.current  # Continue from last position
+            # ✅ Sort targets by priority before getting next one
+            if not optimize_tour:
                 targets.sort(key=lambda x: x[0])
-                _, next_target = targets.pop(0)
-                robot.set_new_goal(next_target)
-                robot.plan_path()
-                print(f"Moving to target with priority {_}")  # Debug info
-            else:
-                sim_running = False
-                print("All targets completed.")
+            priority, next_target = targets.pop(0)
+            robot.set_new_goal(next_target)
+            robot.plan_path(reason=PLAN_NEW_GOAL)
+            print(f"Moving to target with priority {priority}")  # Debug info
+            return robot.next_step_time()
+        sim_running = False
+        print("All targets completed.")
+        if robot.plan_counters.plans:
+            counters = robot.plan_counters
+            print(f"⏱️ {counters.plans} plans in {counters.wall_time * 1000:.1f} ms, "
+                  f"{counters.expanded} nodes expanded, slowest "
+                  f"{counters.slowest.wall_time * 1000:.1f} ms ({counters.slowest.reason})")
+        return None
+
+    robot_event = scheduler.schedule(None, advance_robot)
+
+    def on_lights(changes):
+        """Light listener: wake a robot waiting at a light the moment it turns green"""
+        if robot and robot.on_lights(changes):
+            scheduler.reschedule(robot_event, robot.next_step_time())
+
+    lights.add_listener(on_lights)
+
+    def tool_modes():
+        """Current tool state for the sidebar"""
+        return {
+            'barrier_mode': barrier_mode,
+            'traffic_light_tool': traffic_light_tool,
+            'dynamic_mode': dynamic_obstacle_tool,
+        }
+
+    while run:
+        clock.tick(FPS)
+        now = sim_clock.advance()
+
+        # Placing, removing or re-phasing a light wakes the light controller
+        if lights.stale():
+            scheduler.reschedule(light_event, now)
+        # Run the traffic lights, dynamic obstacles and robot actions that are due
+        scheduler.run_due(now)
+
+        renderer.draw(grid,
+                      robot.trails if robot else [],
+                      robot.get_center() if robot else None,
+                      robot,
+                      dynamic_manager,
+                      tool_modes())  # ✅ Pass dynamic tool state
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 run = False
 
+            # Camera: wheel zooms at the cursor, middle drag pans
+            if event.type == pygame.MOUSEWHEEL:
+                camera.zoom(event.y, pygame.mouse.get_pos())
+            if event.type == pygame.MOUSEMOTION and event.buttons[1]:
+                camera.pan(-event.rel[0], -event.rel[1])
+
             if pygame.mouse.get_pressed()[0]:
-                row, col = get_clicked_pos(pygame.mouse.get_pos(), ROWS, width)
-                if 0 <= row < ROWS and 0 <= col < ROWS:
+                cell = camera.cell_at(pygame.mouse.get_pos())
+                if cell:
+                    row, col = cell
                     spot = grid[row][col]
 
                     if barrier_mode:
@@ -91,7 +145,7 @@ def main(win, width):
                     # ✅ Handle dynamic obstacle placement
                     elif dynamic_obstacle_tool:
                         if (not spot.is_barrier() and not spot.is_start() and 
-                            not spot.is_end() and not spot.is_traffic_stop() and 
+                            not spot.is_end() and not spot.is_traffic_stop and 
                             not spot.is_dynamic()):
                             dynamic_manager.add_obstacle(row, col, grid)
                             print(f"Dynamic obstacle added at ({row}, {col})")
@@ -109,18 +163,16 @@ def main(win, width):
                             priority_counter += 1  # ✅ increment after use
 
             elif pygame.mouse.get_pressed()[2]:
-                row, col = get_clicked_pos(pygame.mouse.get_pos(), ROWS, width)
-                if 0 <= row < ROWS and 0 <= col < ROWS:
+                cell = camera.cell_at(pygame.mouse.get_pos())
+                if cell:
+                    row, col = cell
                     spot = grid[row][col]
                     
                     # ✅ Handle removing dynamic obstacles
                     if spot.is_dynamic():
-                        # Find and remove the dynamic obstacle at this position
-                        for obstacle in dynamic_manager.obstacles[:]:  # Copy list to avoid modification during iteration
-                            if obstacle.row == row and obstacle.col == col:
-                                dynamic_manager.remove_obstacle(obstacle)
-                                print(f"Dynamic obstacle removed from ({row}, {col})")
-                                break
+                        # Look up the dynamic obstacle at this position in the cell index
+                        if dynamic_manager.remove_at(row, col):
+                            print(f"Dynamic obstacle removed from ({row}, {col})")
                     
                     if spot == start:
                         start = None
@@ -134,20 +186,25 @@ def main(win, width):
 
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    for row in grid:
-                        for spot in row:
-                            spot.update_neighbors(grid)
                     if start and targets:
                         # ✅ Sort targets by priority
                         targets.sort(key=lambda x: x[0])
+                        if optimize_tour:
+                            order = plan_tour(grid.state, start.get_pos(),
+                                              [t.get_pos() for _, t in targets],
+                                              [p for p, _ in targets] if tour_respect_priority else None,
+                                              workers=1)  # No process pool inside the GUI
+                            targets = [targets[i] for i in order]
                         _, current_target = targets.pop(0)
                         robot = Robot(start, current_target, grid,
-                                      lambda: draw(win, grid, ROWS, width,
-                                                   robot.trails,
-                                                   robot.get_center(),
-                                                   robot, barrier_mode, dynamic_obstacle_tool))
+                                      lambda: renderer.draw(grid,
+                                                            robot.trails,
+                                                            robot.get_center(),
+                                                            robot, dynamic_manager, tool_modes()),
+                                      visualize=plan_vis, planner=planner, obstacles=dynamic_manager)
                         robot.plan_path()
                         sim_running = True
+                        scheduler.reschedule(robot_event, sim_clock.now())
                         print(f"Starting navigation to target with priority {_}")
 
                 if event.key == pygame.K_b:
@@ -172,7 +229,8 @@ def main(win, width):
                     print("Other tools: OFF")
 
                 if event.key == pygame.K_c or event.key == pygame.K_r:
-                    grid = make_grid(ROWS, width)
+                    grid = make_grid(grid.state.rows, grid.state.cols)
+                    lights.set_grid(grid)
                     start = robot = None
                     sim_running = False
                     click_count = 0
@@ -186,32 +244,88 @@ def main(win, width):
                     # ✅ Clear all dynamic obstacles
                     dynamic_manager.clear_all()
 
-                    # Clear priority from each spot
-                    for row in grid:
-                        for spot in row:
-                            if hasattr(spot, 'priority'):
-                                spot.priority = None
-
                 if event.key == pygame.K_o:
                     save_obstacles(grid)
 
                 if event.key == pygame.K_p:
                     load_obstacles(grid)
 
+                # Cycle planner visualization: search -> path -> headless
+                if event.key == pygame.K_v:
+                    modes_cycle = [VIS_SEARCH, VIS_PATH, VIS_NONE]
+                    plan_vis = modes_cycle[(modes_cycle.index(plan_vis) + 1) % len(modes_cycle)]
+                    if robot:
+                        robot.visualize = plan_vis
+                    print(f"Planner visualization: {plan_vis}")
+
+                # Cycle planning backend
+                if event.key == pygame.K_n:
+                    planner = PLANNERS[(PLANNERS.index(planner) + 1) % len(PLANNERS)]
+                    if robot:
+                        robot.set_planner(planner)
+                        if sim_running:
+                            scheduler.reschedule(robot_event, sim_clock.now())
+                    print(f"Planner: {planner}")
+
+                # Camera: arrows pan, +/- zoom, F fits the whole grid
+                if event.key == pygame.K_LEFT:
+                    camera.pan(-PAN_STEP, 0)
+                if event.key == pygame.K_RIGHT:
+                    camera.pan(PAN_STEP, 0)
+                if event.key == pygame.K_UP:
+                    camera.pan(0, -PAN_STEP)
+                if event.key == pygame.K_DOWN:
+                    camera.pan(0, PAN_STEP)
+                if event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                    camera.zoom(1)
+                if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    camera.zoom(-1)
+                if event.key == pygame.K_f:
+                    camera.fit()
+
                 if event.key in [pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4]:
                     sim_speed = [0.1, 0.3, 0.5, 1.0][event.key - pygame.K_1]
 
                 if event.key == pygame.K_s:
                     map_name = get_text_input("Enter a name for this map:", "Save Map")
                     if map_name:
-                        save_map(grid, start, None, map_name)
+                        save_map(grid, start, [t[1] for t in targets], map_name,
+                                 dynamic_manager.get_obstacles(), walkers=dynamic_manager.walkers())
 
                 if event.key == pygame.K_l:
                     map_name = get_text_input("Enter the name of the map to load:", "Load Map")
                     if map_name:
                         result = load_map(grid, map_name)
                         if result:
-                            grid, start, _ = result
+                            grid, start, loaded_targets, loaded_obstacles, _ = result
+                            lights.set_grid(grid)
+                            targets = [(t.target_priority, t) for t in loaded_targets]
+                            for priority, target in targets:
+                                target.priority = priority
+                            priority_counter = max([p for p, _ in targets], default=0) + 1
+                            click_count = 1 if start else 0
+                            robot = None
+                            sim_running = False
+                            dynamic_manager.set_obstacles(loaded_obstacles)
+
+                if event.key == pygame.K_i:
+                    image_path = get_file_path("Import Image Map", IMAGE_FILETYPES)
+                    if image_path:
+                        try:
+                            state = import_image(image_path)
+                        except Exception as e:
+                            print(f"Error importing image '{image_path}': {e}")
+                        else:
+                            grid = make_grid(state.rows, state.cols, state=state)
+                            lights.set_grid(grid)
+                            start = robot = None
+                            sim_running = False
+                            click_count = 0
+                            priority_counter = 1
+                            targets.clear()
+                            barrier_placed = False
+                            dynamic_manager.clear_all()
+                            print(f"Imported {image_path} as a {state.rows} x {state.cols} grid")
                 
                 # ✅ Display help/controls
                 if event.key == pygame.K_h:
@@ -224,8 +338,14 @@ def main(win, width):
                     print("D: Dynamic obstacle tool")  # New
                     print("C/R: Clear/Reset grid")
                     print("1-4: Set simulation speed")
+                    print("V: Cycle planner visualization")
+                    print("N: Cycle planning backend")
+                    print("Arrows / middle drag: Pan view")
+                    print("+/- / mouse wheel: Zoom view")
+                    print("F: Fit grid to view")
                     print("S: Save map")
                     print("L: Load map")
+                    print("I: Import image as map")
                     print("O: Save obstacles")
                     print("P: Load obstacles")
                     print("H: Show this help")
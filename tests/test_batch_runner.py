@@ -0,0 +1,55 @@
+"""
+Headless batch runs of a saved map
+"""
+
+import contextlib
+import io
+import pytest
+from core.grid import make_grid
+from utils import file_manager
+from utils.batch_runner import run_scenario, run_batch
+
+# Results that depend on the wall clock rather than the simulation
+WALL_KEYS = ("wall_time", "plan_wall_time", "max_plan_time")
+
+
+@pytest.fixture
+def city(tmp_path, monkeypatch):
+    """A 20x20 map with a wall, a light, a walker and three targets, saved in a scratch maps/"""
+    monkeypatch.chdir(tmp_path)
+    grid = make_grid(20)
+    for row in range(2, 18):
+        grid[row][10].make_barrier()
+    grid[18][10].make_traffic_light()
+    targets = [grid[2][18], grid[17][17], grid[10][2]]
+    for priority, spot in enumerate(targets, 1):
+        spot.make_end()
+        spot.target_priority = priority
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert file_manager.save_map(grid, grid[0][0], targets, "city", binary=False,
+                                     walkers=[(5, 15, 1)])
+    return "city"
+
+
+def _simulated(result):
+    return {key: value for key, value in result.items() if key not in WALL_KEYS}
+
+
+def test_scenario_completes_and_repeats_exactly(city):
+    first = run_scenario(city, seed=3)
+    assert first["loaded"] and first["completed"]
+    assert first["targets_completed"] == first["targets_total"] == 3
+    assert first["plans"] >= 3
+    assert _simulated(run_scenario(city, seed=3)) == _simulated(first)
+
+
+def test_missing_map_is_reported_not_raised(city):
+    result = run_scenario("nowhere", seed=0)
+    assert not result["loaded"] and not result["completed"]
+
+
+def test_batch_runs_every_seed(city):
+    results, summary = run_batch([city], range(2), workers=1)
+    assert [r["seed"] for r in results] == [0, 1]
+    assert summary["overall"]["runs"] == 2
+    assert summary["per_map"][city]["completion_rate"] == 1.0
@@ -0,0 +1,55 @@
+"""
+Fixed-timestep simulation clock
+"""
+
+import random
+import pytest
+from core.clock import SimClock, get_clock, set_clock
+from core.grid import make_grid
+from entities.dynamic_obstacle import DynamicObstacle
+
+
+def test_time_is_derived_from_ticks():
+    clock = SimClock(1 / 60, start=5.0)
+    for _ in range(100000):
+        clock.advance()
+    assert clock.ticks == 100000
+    assert clock.now() == 5.0 + 100000 * (1 / 60)
+
+
+def test_advance_to_lands_on_the_next_whole_tick():
+    clock = SimClock(0.1)
+    assert clock.advance_to(0.25) == pytest.approx(0.3)
+    assert clock.ticks == 3
+    # Exactly on a tick, despite float rounding in 0.1 * 6
+    assert clock.advance_to(0.6) == pytest.approx(0.6)
+    assert clock.ticks == 6
+    # Never stands still
+    clock.advance_to(0.0)
+    assert clock.ticks == 7
+
+
+def test_reset_and_shared_clock():
+    clock = set_clock(SimClock(0.5))
+    assert get_clock() is clock
+    clock.advance(4)
+    clock.reset(1.0)
+    assert clock.now() == 1.0 and clock.ticks == 0
+
+
+def _walk(seed):
+    random.seed(seed)
+    clock = SimClock(0.05)
+    grid = make_grid(15)
+    walker = DynamicObstacle(7, 7, grid, clock=clock)
+    cells = []
+    for _ in range(400):
+        clock.advance()
+        walker.update()
+        cells.append((walker.row, walker.col))
+    return cells
+
+
+def test_seeded_runs_repeat_exactly():
+    assert _walk(1) == _walk(1)
+    assert len(set(_walk(1))) > 1
@@ -0,0 +1,81 @@
+"""
+Spatial index of dynamic obstacles against plain scans of their positions
+"""
+
+import random
+import pytest
+import entities.dynamic_obstacle as dynamic_obstacle
+from core.clock import SimClock, set_clock
+from core.grid import make_grid
+from entities.dynamic_obstacle import DynamicObstacleManager, ObstacleSwarm
+
+SIZE = 30
+
+
+@pytest.fixture
+def crowd(monkeypatch):
+    """Manager with object walkers and patrols that have moved for a while"""
+    monkeypatch.setattr(dynamic_obstacle, "vectorized_obstacles", False)
+    random.seed(4)
+    clock = set_clock(SimClock(0.05))
+    grid = make_grid(SIZE)
+    manager = DynamicObstacleManager()
+    for _ in range(40):
+        manager.add_obstacle(random.randrange(SIZE), random.randrange(SIZE), grid, speed=2)
+    for row in (3, 12, 21):
+        patrol = [grid[row][col] for col in range(SIZE)]
+        manager.add_obstacle(row, 0, grid, path=patrol + patrol[-2:0:-1])
+    for _ in range(300):
+        clock.advance()
+        manager.update_all()
+    return manager
+
+
+def _scan(manager):
+    cells = {}
+    for obstacle in manager.obstacles:
+        cells.setdefault((obstacle.row, obstacle.col), set()).add(obstacle)
+    return cells
+
+
+def test_index_matches_positions_after_moves(crowd):
+    assert {cell: set(here) for cell, here in crowd.cells.items()} == _scan(crowd)
+    for (row, col), here in _scan(crowd).items():
+        assert set(crowd.obstacles_at(row, col)) == here
+        assert crowd.obstacle_at(row, col) in here
+
+
+@pytest.mark.parametrize("radius", [0, 1, 3, 40])
+def test_near_matches_a_linear_scan(crowd, radius):
+    for row, col in ((0, 0), (15, 15), (29, 3), (12, 20)):
+        expected = {o for o in crowd.obstacles
+                    if abs(o.row - row) <= radius and abs(o.col - col) <= radius}
+        assert set(crowd.obstacles_near(row, col, radius)) == expected
+
+
+def test_removal_keeps_the_index(crowd):
+    for obstacle in list(crowd.obstacles)[::3]:
+        crowd.remove_obstacle(obstacle)
+    assert {cell: set(here) for cell, here in crowd.cells.items()} == _scan(crowd)
+    assert sorted(crowd._slots.values()) == list(range(len(crowd.obstacles)))
+
+
+def test_swarm_lookups_match_positions():
+    random.seed(5)
+    clock = set_clock(SimClock(0.05))
+    grid = make_grid(SIZE)
+    swarm = ObstacleSwarm(grid, clock)
+    for _ in range(60):
+        swarm.add(random.randrange(SIZE), random.randrange(SIZE))
+    for _ in range(200):
+        clock.advance()
+        swarm.update()
+    rows, cols = swarm.positions()
+    positions = list(zip(rows.tolist(), cols.tolist()))
+    assert len(set(positions)) == len(positions) == swarm.count
+    for slot, (row, col) in enumerate(positions):
+        assert swarm.slot_at(row, col) == slot
+        assert grid[row][col].is_dynamic()
+    near_rows, near_cols = swarm.near(15, 15, 4)
+    assert sorted(zip(near_rows.tolist(), near_cols.tolist())) == sorted(
+        (row, col) for row, col in positions if abs(row - 15) <= 4 and abs(col - 15) <= 4)
@@ -0,0 +1,78 @@
+"""
+Saved maps in both formats: cost and obstacle round trips, listing, backup and delete
+"""
+
+import contextlib
+import io
+import os
+import pytest
+from core.grid import make_grid
+from core.grid_state import DYNAMIC
+from entities.dynamic_obstacle import DynamicObstacleManager
+from utils import file_manager
+from utils.binary_map import EXTENSION as BINARY_EXTENSION
+
+
+@pytest.fixture
+def map_dir(tmp_path, monkeypatch):
+    """Run in an empty directory so maps/ and saves/ are scratch"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _save(name, binary):
+    grid = make_grid(6, 8)
+    grid[1][2].make_barrier()
+    grid.state.set_cost(3, 4, 2.5)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert file_manager.save_map(grid, grid[0][0], [grid[5][7]], name, binary=binary)
+
+
+def _load(name):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return file_manager.load_map(None, name)
+
+
+@pytest.mark.parametrize("binary", [True, False])
+def test_costs_round_trip(map_dir, binary):
+    _save("costly", binary)
+    grid = _load("costly")[0]
+    assert grid.state.cost_view[3, 4] == 2.5
+    assert grid.state.custom_costs == 1
+    assert grid[1][2].is_barrier()
+
+
+def test_binary_maps_are_listed_backed_up_and_deleted(map_dir):
+    _save("plan", True)
+    _save("both", True)
+    _save("both", False)
+    names = [entry["name"] for entry in file_manager.list_available_maps()]
+    assert sorted(names) == ["both", "plan"]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        backup = file_manager.backup_map("plan")
+        assert backup.endswith(BINARY_EXTENSION) and os.path.exists(backup)
+        assert file_manager.delete_map("both")
+    assert not os.path.exists("maps/both.json")
+    assert not os.path.exists(f"maps/both{BINARY_EXTENSION}")
+    assert _load("both") is None
+
+
+@pytest.mark.parametrize("binary", [True, False])
+def test_swarm_walkers_round_trip(map_dir, binary):
+    grid = make_grid(10)
+    manager = DynamicObstacleManager()
+    placed = [(2, 3, 1.0), (5, 5, 2.0), (8, 1, 0.5)]
+    for row, col, speed in placed:
+        manager.add_obstacle(row, col, grid, speed=speed)
+    assert manager.swarm.count == len(placed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert file_manager.save_map(grid, grid[0][0], [grid[9][9]], "walkers", manager.get_obstacles(),
+                                     binary=binary, walkers=manager.walkers())
+
+    loaded_grid, _, _, obstacles, _ = _load("walkers")
+    restored = DynamicObstacleManager()
+    restored.set_obstacles(obstacles)
+    assert sorted(restored.walkers()) == sorted(placed)
+    assert restored.swarm.grid is loaded_grid
+    assert sorted(loaded_grid.state.cells_with(DYNAMIC)) == sorted((r, c) for r, c, _ in placed)
@@ -0,0 +1,34 @@
+"""
+Fleet robots driven by the event scheduler reach their targets without collisions
+"""
+
+import contextlib
+import io
+from core.clock import SimClock, set_clock
+from core.fleet import FleetManager
+from core.grid import make_grid
+from core.scheduler import Scheduler, INF
+
+
+def test_crossing_robots_never_share_a_cell():
+    clock = set_clock(SimClock(0.05))
+    grid = make_grid(12)
+    fleet = FleetManager(grid, clock)
+    routes = [((0, 0), (11, 11)), ((11, 0), (0, 11)), ((0, 6), (11, 6))]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for start, goal in routes:
+            fleet.add_robot(grid[start[0]][start[1]], [grid[goal[0]][goal[1]]])
+        fleet.plan_all()
+
+        scheduler = Scheduler()
+        scheduler.schedule(clock.now(), fleet.on_due)
+        while not fleet.done() and clock.ticks < 5000:
+            next_time = scheduler.next_time()
+            assert next_time != INF
+            clock.advance_to(next_time)
+            scheduler.run_due(clock.now())
+            cells = [robot.current.get_pos() for robot in fleet.robots]
+            assert len(set(cells)) == len(cells)
+
+    assert fleet.done()
+    assert [robot.current.get_pos() for robot in fleet.robots] == [goal for _, goal in routes]
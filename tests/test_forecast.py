@@ -0,0 +1,59 @@
+"""
+Obstacle forecasts and space-time robots planning with them
+"""
+
+import contextlib
+import io
+import random
+from config.constants import VIS_NONE, PLANNER_SPACETIME, PLAN_SCHEDULE
+from core.clock import SimClock, set_clock
+from core.grid import make_grid
+from core.robot import Robot
+from entities.dynamic_obstacle import DynamicObstacleManager
+
+SIZE = 16
+
+
+def _patrol(grid, manager, col, speed=2):
+    """Obstacle walking up and down one column"""
+    lane = [grid[row][col] for row in range(SIZE)]
+    return manager.add_obstacle(0, col, grid, path=lane + lane[-2:0:-1], speed=speed)
+
+
+def test_patrol_forecast_matches_its_moves():
+    random.seed(2)
+    clock = set_clock(SimClock(0.05))
+    grid = make_grid(SIZE)
+    manager = DynamicObstacleManager()
+    patrol = _patrol(grid, manager, 8)
+    forecast = manager.forecast(grid.state, clock.now(), 20.0)
+    while clock.now() < 19.5:
+        clock.advance()
+        patrol.update()
+        now = clock.now()
+        assert forecast.occupied(patrol.current.index, now, now + 0.01)
+
+
+def test_spacetime_robot_plans_around_a_patrol():
+    random.seed(7)
+    clock = set_clock(SimClock(0.05))
+    grid = make_grid(SIZE)
+    manager = DynamicObstacleManager()
+    patrols = [_patrol(grid, manager, col) for col in (5, 10)]
+    start, goal = grid[8][0], grid[8][SIZE - 1]
+    start.make_start()
+    goal.make_end()
+
+    robot = Robot(start, goal, grid, None, visualize=VIS_NONE, replan_visualize=VIS_NONE,
+                  planner=PLANNER_SPACETIME, obstacles=manager, clock=clock)
+    robot.profile = True
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert robot.plan_path()
+        while not robot.reached_goal() and clock.now() < 60.0:
+            clock.advance()
+            manager.update_all()
+            robot.step()
+            assert all(robot.current is not patrol.current for patrol in patrols)
+    assert robot.reached_goal()
+    # The forecast kept the plan valid: no replans because an obstacle got in the way
+    assert PLAN_SCHEDULE not in robot.plan_counters.by_reason
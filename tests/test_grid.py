@@ -0,0 +1,66 @@
+"""
+Spot views over a GridState: lazily derived neighbors and rectangular grids
+"""
+
+from core.grid import make_grid
+from core.search import astar_search
+from ui.camera import Camera
+
+
+def _positions(spots):
+    return sorted(spot.get_pos() for spot in spots)
+
+
+def test_neighbors_follow_the_grid_state():
+    grid = make_grid(10)
+    spot = grid[5][5]
+    assert len(spot.neighbors) == 8
+    assert _positions(grid[0][0].neighbors) == [(0, 1), (1, 0), (1, 1)]
+
+    # No update_neighbors sweep between the edits and the reads
+    grid[4][4].make_barrier()
+    grid[4][5].make_dynamic()
+    assert (4, 4) not in _positions(spot.neighbors)
+    assert (4, 5) not in _positions(spot.neighbors)
+    grid[4][4].reset()
+    assert (4, 4) in _positions(spot.neighbors)
+
+
+def test_red_lights_are_not_neighbors():
+    grid = make_grid(10)
+    light = grid[5][6]
+    light.make_traffic_light()
+    light.light_state = "red"
+    assert (5, 6) not in _positions(grid[5][5].neighbors)
+    light.light_state = "green"
+    assert (5, 6) in _positions(grid[5][5].neighbors)
+
+
+def test_neighbors_create_only_the_spots_they_return():
+    grid = make_grid(200)
+    grid[100][100].neighbors
+    assert len(list(grid.created_spots())) == 9
+
+
+def test_rectangular_grid_layout():
+    grid = make_grid(12, 30, cell_size=10)
+    state = grid.state
+    assert (len(grid), len(grid[0])) == (12, 30)
+    assert state.flags_view.shape == (12, 30)
+    corner = grid[11][29]
+    assert corner.index == state.index(11, 29) == 12 * 30 - 1
+    assert (corner.x, corner.y) == (110, 290)
+    assert _positions(corner.neighbors) == [(10, 28), (10, 29), (11, 28)]
+    path = astar_search(state, (0, 0), (11, 29))
+    assert path[-1] == (11, 29) and len(path) == 30
+
+
+def test_camera_fits_and_picks_cells_on_a_rectangular_grid():
+    camera = Camera(600, 400, gap=10)
+    camera.set_grid(120, 40)
+    # 120 rows across 600 px: the largest zoom level up to 5 px per cell
+    assert camera.cell_px == 4
+    assert camera.cell_at((4 * 7 + 2, 4 * 3 + 2)) == (7, 3)
+    # The 40 columns end at 160 px, well inside the view
+    assert camera.cell_at((10, 300)) is None
+    assert camera.visible_range() == (0, 120, 0, 40)
@@ -0,0 +1,89 @@
+"""
+GridState change log under bulk obstacle moves
+"""
+
+import numpy as np
+from core.clock import SimClock, set_clock
+from core.dstar_lite import DStarLite
+from core.grid import make_grid
+from core.grid_state import GridState, BARRIER, DYNAMIC, CHANGE_LOG_SIZE
+from core.hpa import HPAPlanner
+from core.search import astar_search
+from entities.dynamic_obstacle import ObstacleSwarm
+
+SIZE = 100
+
+
+def test_bulk_move_is_one_record():
+    state = GridState(SIZE, SIZE)
+    version = state.version
+    cells = np.arange(0, SIZE * SIZE, 2)
+    assert len(cells) > CHANGE_LOG_SIZE
+    state.set_flags_at(cells, DYNAMIC)
+    assert state.version == version + 1
+    assert state.changes_since(version) == set(cells.tolist())
+    # Obstacles are not part of the layout
+    assert state.layout_changes_since(version) == set()
+
+
+def test_barrier_changes_reach_the_layout_log():
+    state = GridState(SIZE, SIZE)
+    version = state.version
+    state.set_flags_at([5, 6, 7], BARRIER)
+    state.set_flag(1, 1, DYNAMIC)
+    state.set_cost(2, 2, 3.0)
+    assert state.changes_since(version) == {5, 6, 7, SIZE + 1, 2 * SIZE + 2}
+    assert state.layout_changes_since(version) == {5, 6, 7, 2 * SIZE + 2}
+
+
+def test_hpa_does_not_rebuild_for_a_moving_swarm():
+    clock = set_clock(SimClock(0.05))
+    grid = make_grid(SIZE)
+    state = grid.state
+    swarm = ObstacleSwarm(grid, clock)
+    for index in range(0, SIZE * SIZE, 3):
+        swarm.add(*divmod(index, SIZE))
+    assert swarm.count > CHANGE_LOG_SIZE // 2
+
+    hpa = HPAPlanner(state, cluster_size=10)
+    rebuilds = []
+    rebuild = hpa.rebuild
+    hpa.rebuild = lambda: (rebuilds.append(1), rebuild())
+    dstar = DStarLite(state, (0, 1), (SIZE - 1, SIZE - 2))
+    dstar.plan()
+
+    for _ in range(5):
+        clock.advance_to(clock.now() + 10.0)
+        assert swarm.update() > CHANGE_LOG_SIZE // 2
+        hpa.sync()
+        # D* Lite still gets every moved cell instead of restarting
+        assert dstar.sync()
+    assert not rebuilds
+    assert hpa.version == state.version
+
+    # A new barrier still reaches HPA incrementally
+    state.set_flag(50, 50, BARRIER)
+    hpa.sync()
+    assert not rebuilds
+    assert hpa.blocked[state.index(50, 50)] == 1
+
+    # D* Lite kept up with the swarm
+    path = dstar.plan()
+    expected = astar_search(state, (0, 1), (SIZE - 1, SIZE - 2))
+    assert (path is None) == (expected is None)
+
+
+def test_static_signature_follows_the_layout():
+    state = GridState(SIZE, SIZE)
+    signature = state.static_signature()
+    state.set_flags_at(np.arange(SIZE), DYNAMIC)
+    state.set_light(3, 3, "red")
+    assert state.static_signature() == signature
+    state.set_cost(4, 4, 2.0)
+    changed = state.static_signature()
+    assert changed != signature
+    state.set_flag(5, 5, BARRIER)
+    assert state.static_signature() not in (signature, changed)
+    state.clear_flag(5, 5, BARRIER)
+    state.set_cost(4, 4, 1.0)
+    assert state.static_signature() == signature
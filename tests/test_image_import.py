@@ -0,0 +1,78 @@
+"""
+Image import: cost zones, strip-wise reading and surviving a simulated run
+"""
+
+import contextlib
+import io
+import numpy as np
+import pytest
+from PIL import Image, ImageFile
+from config.constants import VIS_SEARCH, PLANNER_ASTAR
+from core.clock import SimClock, set_clock
+from core.grid import make_grid
+from core.robot import Robot
+from entities.dynamic_obstacle import DynamicObstacleManager
+from utils.image_import import import_image
+
+SIZE = 40
+
+
+def _import_band(tmp_path):
+    """Import a white image with an orange band across grid rows 10-29"""
+    image = Image.new("RGB", (SIZE, SIZE), (255, 255, 255))
+    image.paste((255, 165, 0), (10, 0, 30, SIZE))
+    path = tmp_path / "band.png"
+    image.save(path)
+    return import_image(path, rows=SIZE, cols=SIZE)
+
+
+def test_band_imports_as_cost_zone(tmp_path):
+    state = _import_band(tmp_path)
+    assert state.cost_view[15, 5] == 3.0
+    assert state.cost_view[5, 5] == 1.0
+
+
+def test_costs_survive_robot_obstacles_and_animated_plans(tmp_path):
+    clock = set_clock(SimClock(0.1))
+    state = _import_band(tmp_path)
+    costs = state.cost_view.copy()
+    grid = make_grid(SIZE, SIZE, state=state)
+
+    manager = DynamicObstacleManager()
+    patrol = [grid[15][col] for col in range(10)] + [grid[15][col] for col in range(9, 0, -1)]
+    manager.add_obstacle(15, 0, grid, path=patrol)
+
+    start, goal = grid[0][20], grid[SIZE - 1][20]
+    start.make_start()
+    goal.make_end()
+    with contextlib.redirect_stdout(io.StringIO()):
+        robot = Robot(start, goal, grid, lambda: None, visualize=VIS_SEARCH,
+                      replan_visualize=VIS_SEARCH, planner=PLANNER_ASTAR)
+        assert robot.plan_path()
+        while not robot.reached_goal() and clock.ticks < 5000:
+            clock.advance()
+            manager.update_all()
+            robot.step()
+
+    assert robot.reached_goal()
+    assert (state.cost_view == costs).all()
+
+
+@pytest.mark.parametrize("suffix", ["bmp", "tif", "ppm"])
+def test_uncompressed_images_are_read_in_strips(tmp_path, monkeypatch, suffix):
+    rng = np.random.default_rng(0)
+    pixels = np.full((90, 130, 3), 255, dtype=np.uint8)
+    pixels[rng.random((90, 130)) < 0.3] = (0, 0, 0)
+    pixels[20:45] = (255, 165, 0)
+    image = Image.fromarray(pixels)
+    image.save(tmp_path / "plan.png")
+    image.save(tmp_path / f"plan.{suffix}")
+    expected = import_image(tmp_path / "plan.png", rows=40, cols=30)
+
+    def no_load(self):
+        raise AssertionError("image decoded whole")
+    monkeypatch.setattr(ImageFile.ImageFile, "load", no_load)
+    # Small strips, so the image is read in many pieces
+    state = import_image(tmp_path / f"plan.{suffix}", rows=40, cols=30, tile_pixels=2000)
+    assert np.array_equal(state.flags_view, expected.flags_view)
+    assert np.array_equal(state.cost_view, expected.cost_view)
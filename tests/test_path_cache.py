@@ -0,0 +1,61 @@
+"""
+Path cache invalidation when cells are blocked and freed
+"""
+
+from core.grid_state import GridState, BARRIER
+from core.path_cache import PathCache
+from core.search import astar_search
+
+
+def _wall_with_gap(size=20, wall_col=10, gap_row=18):
+    """Grid with a vertical wall of barriers open only at `gap_row`"""
+    state = GridState(size, size)
+    for row in range(size):
+        if row != gap_row:
+            state.set_flag(row, wall_col, BARRIER)
+    return state
+
+
+def test_blocked_path_is_dropped():
+    state = GridState(10, 10)
+    cache = PathCache(state)
+    path = astar_search(state, (0, 0), (0, 9))
+    cache.put((0, 0), (0, 9), path)
+    state.set_flag(0, 5, BARRIER)
+    assert cache.get((0, 0), (0, 9)) is None
+
+
+def test_detour_is_dropped_when_a_shorter_route_opens():
+    state = _wall_with_gap()
+    cache = PathCache(state)
+    detour = astar_search(state, (2, 2), (2, 17))
+    cache.put((2, 2), (2, 17), detour)
+    assert cache.get((2, 2), (2, 17)) == detour
+
+    state.clear_flag(2, 10, BARRIER)
+    assert cache.get((2, 2), (2, 17)) is None
+    assert len(astar_search(state, (2, 2), (2, 17))) < len(detour)
+
+
+def test_far_changes_keep_paths_that_cannot_improve():
+    state = GridState(20, 20)
+    cache = PathCache(state)
+    straight = astar_search(state, (0, 0), (0, 9))
+    cache.put((0, 0), (0, 9), straight)
+    state.set_flag(15, 15, BARRIER)
+    state.clear_flag(15, 15, BARRIER)
+    assert cache.get((0, 0), (0, 9)) == straight
+
+
+def test_detour_over_cheap_cells_is_dropped():
+    state = _wall_with_gap()
+    for row in range(20):
+        for col in range(20):
+            state.set_cost(row, col, 0.25)
+    cache = PathCache(state)
+    detour = astar_search(state, (2, 2), (2, 17))
+    cache.put((2, 2), (2, 17), detour)
+
+    # In whole steps the gap is no shortcut; at a quarter cost per step it is
+    state.clear_flag(2, 10, BARRIER)
+    assert cache.get((2, 2), (2, 17)) is None
@@ -0,0 +1,65 @@
+"""
+Per-plan statistics and profiling hooks
+"""
+
+import json
+import pytest
+from config.constants import VIS_NONE, PLANNERS, PLAN_INITIAL, PLAN_NEW_GOAL
+from core.clock import SimClock, set_clock
+from core.grid import make_grid
+from core.plan_stats import add_plan_hook, remove_plan_hook, plan_hooks
+from core.robot import Robot
+
+
+def _robot(planner):
+    set_clock(SimClock(0.05))
+    grid = make_grid(20)
+    for row in range(3, 17):
+        grid[row][10].make_barrier()
+    start, goal = grid[10][2], grid[10][18]
+    start.make_start()
+    goal.make_end()
+    return Robot(start, goal, grid, None, visualize=VIS_NONE, replan_visualize=VIS_NONE, planner=planner)
+
+
+def test_no_stats_without_profiling_or_hooks():
+    robot = _robot(PLANNERS[0])
+    robot.profile = False
+    assert not plan_hooks
+    assert robot.plan_path()
+    assert robot.last_plan is None and robot.plan_counters.plans == 0
+
+
+@pytest.mark.parametrize("planner", PLANNERS)
+def test_hooks_see_every_plan(planner):
+    robot = _robot(planner)
+    robot.profile = False
+    seen = []
+
+    def hook(who, stats):
+        seen.append((who, stats, len(who.path)))
+    add_plan_hook(hook)
+    try:
+        assert robot.plan_path()
+        robot.set_new_goal(robot.grid[2][18])
+        robot.plan_path(reason=PLAN_NEW_GOAL)
+    finally:
+        remove_plan_hook(hook)
+    robot.plan_path()
+    assert len(seen) == 2
+
+    assert [stats.reason for _, stats, _ in seen] == [PLAN_INITIAL, PLAN_NEW_GOAL]
+    assert all(who is robot for who, _, _ in seen)
+    assert all(stats.path_length == length > 0 for _, stats, length in seen)
+    first = seen[0][1]
+    assert first.planner == planner and first.found
+    assert first.start == (10, 2) and first.goal == (10, 18)
+    assert first.expanded > 0 or first.cache_hit
+    assert robot.last_plan is seen[-1][1]
+
+    counters = robot.plan_counters
+    assert counters.plans == 2 and counters.failed == 0
+    assert counters.by_reason == {PLAN_INITIAL: 1, PLAN_NEW_GOAL: 1}
+    assert counters.slowest in (stats for _, stats, _ in seen)
+    json.dumps(counters.as_dict())
+    assert not plan_hooks
@@ -0,0 +1,154 @@
+"""
+Every planner against astar_search on random maps
+
+JPS, ALT (with either A*), D* Lite and the Spot-based A* must find paths
+exactly as cheap as astar_search. HPA* trades optimality for speed, so its paths only have to
+be valid and found whenever one exists.
+"""
+
+import random
+import pytest
+from core.astar import a_star
+from core.dstar_lite import DStarLite
+from core.grid import make_grid
+from core.grid_state import BARRIER, DIAGONAL_COST
+from core.hpa import HPAPlanner
+from core.jps import jps_search
+from core.landmarks import landmarks_for
+from core.search import astar_search
+
+SIZE = 24
+SEEDS = range(12)
+
+
+def _random_map(seed, costs, cheap=False):
+    """Grid with 25% barriers (and slow cells if `costs`, some cheap ones too if `cheap`),
+    plus a free start and goal"""
+    rng = random.Random(seed)
+    grid = make_grid(SIZE)
+    state = grid.state
+    for row in range(SIZE):
+        for col in range(SIZE):
+            roll = rng.random()
+            if roll < 0.25:
+                state.set_flag(row, col, BARRIER)
+            elif costs and roll < 0.4:
+                state.set_cost(row, col, rng.choice((0.25, 0.5, 3.0) if cheap else (2.0, 3.0, 5.0)))
+    free = [(row, col) for row in range(SIZE) for col in range(SIZE) if state.is_passable(row, col)]
+    start, goal = rng.sample(free, 2)
+    return grid, start, goal
+
+
+def _cost(state, path):
+    """Movement cost of a path, checking every step is a passable 8-connected move"""
+    total = 0.0
+    for (r0, c0), (r1, c1) in zip(path, path[1:]):
+        assert max(abs(r1 - r0), abs(c1 - c0)) == 1
+        assert (r1, c1) in state.passable_neighbors(r0, c0)
+        step = DIAGONAL_COST if r0 != r1 and c0 != c1 else 1
+        total += step * state.cost[state.index(r1, c1)]
+    return total
+
+
+def _check_optimal(state, start, goal, path):
+    expected = astar_search(state, start, goal)
+    if expected is None:
+        assert path is None
+        return
+    assert path[0] == start and path[-1] == goal
+    assert _cost(state, path) == pytest.approx(_cost(state, expected))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_jps_matches_astar(seed):
+    grid, start, goal = _random_map(seed, costs=False)
+    _check_optimal(grid.state, start, goal, jps_search(grid.state, start, goal))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_astar_matches_dijkstra_on_cheap_cells(seed):
+    grid, start, goal = _random_map(seed, costs=True, cheap=True)
+    state = grid.state
+    path = astar_search(state, start, goal)
+    expected = astar_search(state, start, goal, heuristic=lambda index, goal_index: 0)
+    assert (path is None) == (expected is None)
+    if path is not None:
+        assert _cost(state, path) == pytest.approx(_cost(state, expected))
+
+
+@pytest.mark.parametrize("cheap", [False, True])
+@pytest.mark.parametrize("seed", SEEDS)
+def test_alt_matches_astar(seed, cheap):
+    grid, start, goal = _random_map(seed, costs=True, cheap=cheap)
+    state = grid.state
+    heuristic = landmarks_for(state).heuristic(state.index(*goal))
+    _check_optimal(state, start, goal, astar_search(state, start, goal, heuristic=heuristic))
+
+
+@pytest.mark.parametrize("cheap", [False, True])
+@pytest.mark.parametrize("seed", SEEDS)
+def test_dstar_lite_matches_astar(seed, cheap):
+    grid, start, goal = _random_map(seed, costs=True, cheap=cheap)
+    _check_optimal(grid.state, start, goal, DStarLite(grid.state, start, goal).plan())
+
+
+@pytest.mark.parametrize("cheap", [False, True])
+@pytest.mark.parametrize("landmarks", [False, True])
+@pytest.mark.parametrize("seed", SEEDS)
+def test_spot_astar_matches_astar(seed, landmarks, cheap):
+    grid, start, goal = _random_map(seed, costs=True, cheap=cheap)
+    start_spot, goal_spot = grid[start[0]][start[1]], grid[goal[0]][goal[1]]
+    heuristic = landmarks_for(grid.state).spot_heuristic(goal_spot.index) if landmarks else None
+    found = a_star(None, grid, start_spot, goal_spot, heuristic_func=heuristic)
+    path = None
+    if found:
+        spot, path = goal_spot, []
+        while spot is not start_spot:
+            path.append(spot.get_pos())
+            spot = spot.previous
+        path = [start] + path[::-1]
+    _check_optimal(grid.state, start, goal, path)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_hpa_finds_valid_paths(seed):
+    grid, start, goal = _random_map(seed, costs=True)
+    state = grid.state
+    path = HPAPlanner(state, cluster_size=8).plan(start, goal)
+    expected = astar_search(state, start, goal)
+    assert (path is None) == (expected is None)
+    if path is not None:
+        assert path[0] == start and path[-1] == goal
+        assert _cost(state, path) >= _cost(state, expected) - 1e-9
+
+
+def test_dstar_lite_restarts_when_cells_get_cheaper():
+    grid, start, goal = _random_map(0, costs=True)
+    state = grid.state
+    planner = DStarLite(state, start, goal)
+    planner.plan()
+    state.set_cost(*goal, 3.0)
+    assert planner.sync()
+    state.set_cost(*goal, 0.5)
+    assert not planner.sync()
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_dstar_lite_repairs_after_changes(seed):
+    grid, start, goal = _random_map(seed, costs=True)
+    state = grid.state
+    planner = DStarLite(state, start, goal)
+    path = planner.plan()
+    rng = random.Random(seed)
+    # Block part of the path, free some barriers, move the start along
+    for row, col in (path or [])[2:-1:3]:
+        state.set_flag(row, col, BARRIER)
+    for _ in range(10):
+        row, col = rng.randrange(SIZE), rng.randrange(SIZE)
+        if (row, col) not in (start, goal):
+            state.clear_flag(row, col, BARRIER)
+    if path and len(path) > 1 and state.is_passable(*path[1]):
+        start = path[1]
+        planner.move_start(start)
+    assert planner.sync()
+    _check_optimal(state, start, goal, planner.plan())
@@ -0,0 +1,63 @@
+"""
+Dirty-rectangle rendering on a headless display
+"""
+
+import pygame
+import pytest
+from config.constants import RED, WHITE, BLACK
+from config.settings import WIDTH, WINDOW_WIDTH
+from core.grid import make_grid
+from ui.renderer import DirtyRenderer
+from ui.resources import clear_caches
+
+
+@pytest.fixture
+def window(monkeypatch):
+    """Dummy display whose updates are recorded: None for a full update, else the rects"""
+    pygame.init()
+    win = pygame.display.set_mode((WINDOW_WIDTH, WIDTH))
+    updates = []
+    monkeypatch.setattr(pygame.display, "update", lambda rects=None: updates.append(rects))
+    yield win, updates
+    pygame.quit()
+    clear_caches()
+
+
+def _center(renderer, row, col):
+    return renderer.camera.cell_rect(row, col).center
+
+
+def test_only_changed_cells_are_redrawn(window):
+    win, updates = window
+    renderer = DirtyRenderer(win)
+    grid = make_grid(20)
+    renderer.draw(grid, [], None)
+    assert updates == [None]
+
+    # Nothing changed: nothing is pushed to the display
+    renderer.draw(grid, [], None)
+    assert updates == [None]
+
+    grid[3][4].color = RED
+    renderer.draw(grid, [], None)
+    rects = updates[-1]
+    assert len(rects) == 1
+    assert rects[0] == renderer.camera.cell_rect(3, 4).clip(renderer.view)
+    assert win.get_at(_center(renderer, 3, 4))[:3] == RED
+    assert win.get_at(_center(renderer, 3, 5))[:3] == WHITE
+
+
+def test_barrier_edits_reach_the_cached_background(window):
+    win, updates = window
+    renderer = DirtyRenderer(win)
+    grid = make_grid(20)
+    renderer.draw(grid, [], None)
+    grid[6][6].make_barrier()
+    renderer.draw(grid, [], None)
+    assert win.get_at(_center(renderer, 6, 6))[:3] == BLACK
+
+    # A later full redraw (e.g. after a camera move) keeps the barrier
+    renderer.invalidate()
+    renderer.draw(grid, [], None)
+    assert updates[-1] is None
+    assert win.get_at(_center(renderer, 6, 6))[:3] == BLACK
@@ -0,0 +1,52 @@
+"""
+Cached fonts, text and trail sprites
+"""
+
+import pygame
+import pytest
+from config.constants import BLACK
+from config.settings import WIDTH, WINDOW_WIDTH
+from entities.trail import TrailMarker
+from ui import resources
+from ui.renderer import draw_ui
+from ui.resources import render_text, trail_sprite, alpha_bucket, clear_caches
+
+
+@pytest.fixture
+def window():
+    pygame.init()
+    clear_caches()
+    yield pygame.display.set_mode((WINDOW_WIDTH, WIDTH))
+    pygame.quit()
+    clear_caches()
+
+
+def test_text_and_sprites_are_rendered_once(window):
+    assert render_text("Mode:", 'section', BLACK) is render_text("Mode:", 'section', BLACK)
+    assert render_text("Mode:", 'normal', BLACK) is not render_text("Mode:", 'section', BLACK)
+    assert trail_sprite((255, 0, 0), 4, 120) is trail_sprite((255, 0, 0), 4, 120)
+
+
+def test_fading_trails_share_sprites(window):
+    assert alpha_bucket(121) == alpha_bucket(119) == 120
+    assert alpha_bucket(-3) == 0 and alpha_bucket(300) == 255
+    marker = TrailMarker((50, 50), (255, 0, 0, 200), 4)
+    marker.draw(window)
+    sprites = resources.trail_sprite.cache_info().currsize
+    marker.alpha -= 1  # Same bucket
+    marker.draw(window)
+    assert resources.trail_sprite.cache_info().currsize == sprites
+
+
+def test_sidebar_loads_fonts_only_once(window, monkeypatch):
+    draw_ui(window)
+    loads = []
+    real = pygame.font.SysFont
+
+    def counting(*args, **kwargs):
+        loads.append(args)
+        return real(*args, **kwargs)
+    monkeypatch.setattr(pygame.font, "SysFont", counting)
+    for _ in range(3):
+        draw_ui(window)
+    assert loads == []
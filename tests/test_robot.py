@@ -0,0 +1,56 @@
+"""
+Switching a robot's planner mid-route
+"""
+
+import contextlib
+import io
+from config.constants import VIS_NONE, PLANNER_ASTAR, PLANNER_SPACETIME, PLAN_SWITCH
+from core.clock import SimClock, set_clock
+from core.grid import make_grid
+from core.robot import Robot
+
+
+def _robot(planner):
+    clock = set_clock(SimClock(0.01))
+    grid = make_grid(30)
+    start, goal = grid[0][0], grid[29][29]
+    start.make_start()
+    goal.make_end()
+    # The simulation has been running a while before the robot sets off
+    clock.advance_to(60.0)
+    robot = Robot(start, goal, grid, None, visualize=VIS_NONE, replan_visualize=VIS_NONE,
+                  planner=planner, clock=clock)
+    robot.profile = True
+    return robot, clock
+
+
+def _run(robot, clock, ticks):
+    for _ in range(ticks):
+        clock.advance()
+        robot.step()
+
+
+def test_switch_to_spacetime_keeps_step_timing():
+    robot, clock = _robot(PLANNER_ASTAR)
+    with contextlib.redirect_stdout(io.StringIO()):
+        robot.plan_path()
+        _run(robot, clock, 50)
+        robot.set_planner(PLANNER_SPACETIME)
+        assert robot.last_plan.reason == PLAN_SWITCH
+        steps = robot.steps_taken
+        ticks = 100
+        _run(robot, clock, ticks)
+    # One move per step time, not one per tick
+    assert robot.steps_taken - steps <= ticks * clock.tick / robot.step_time + 1
+
+
+def test_switch_back_to_astar_drops_planned_waits():
+    robot, clock = _robot(PLANNER_SPACETIME)
+    with contextlib.redirect_stdout(io.StringIO()):
+        robot.plan_path()
+        _run(robot, clock, 50)
+        robot.set_planner(PLANNER_ASTAR)
+        path = list(robot.path)
+        _run(robot, clock, 5000)
+    assert len(set(path)) == len(path)
+    assert robot.reached_goal()
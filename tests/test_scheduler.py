@@ -0,0 +1,72 @@
+"""
+Discrete-event scheduler
+"""
+
+from core.scheduler import Scheduler, INF
+
+
+def _recorder(log, name, then=None):
+    """Action that logs (name, now) and asks to run again at then(now)"""
+    def action(now):
+        log.append((name, now))
+        return then(now) if then else None
+    return action
+
+
+def test_actions_run_in_time_then_insertion_order():
+    scheduler = Scheduler()
+    log = []
+    scheduler.schedule(2.0, _recorder(log, "late"))
+    scheduler.schedule(1.0, _recorder(log, "first"))
+    scheduler.schedule(1.0, _recorder(log, "second"))
+    scheduler.schedule(None, _recorder(log, "idle"))
+    assert scheduler.next_time() == 1.0
+    assert scheduler.run_due(1.5) == 2
+    assert log == [("first", 1.5), ("second", 1.5)]
+    assert scheduler.run_due(3.0) == 1
+    assert scheduler.next_time() == INF
+    assert scheduler.processed == 3
+
+
+def test_reschedule_and_cancel():
+    scheduler = Scheduler()
+    log = []
+    moved = scheduler.schedule(1.0, _recorder(log, "moved"))
+    dropped = scheduler.schedule(1.0, _recorder(log, "dropped"))
+    scheduler.reschedule(moved, 5.0)
+    scheduler.cancel(dropped)
+    assert not dropped.pending()
+    assert scheduler.next_time() == 5.0
+    assert scheduler.run_due(4.0) == 0
+    scheduler.run_due(5.0)
+    assert log == [("moved", 5.0)]
+
+
+def test_a_tick_always_ends():
+    scheduler = Scheduler()
+    log = []
+    # Asks to run again immediately, every time
+    event = scheduler.schedule(0.0, _recorder(log, "eager", lambda now: now))
+    assert scheduler.run_due(1.0) == 1
+    assert event.pending() and event.time == 1.0
+    assert scheduler.run_due(1.0) == 1
+    assert len(log) == 2
+
+
+def test_periodic_action_and_clock_jumps():
+    scheduler = Scheduler()
+    log = []
+    scheduler.schedule(0.0, _recorder(log, "tick", lambda now: now + 0.5))
+    now = 0.0
+    while now < 2.0:
+        now = scheduler.next_time()
+        scheduler.run_due(now)
+    assert [time for _, time in log] == [0.0, 0.5, 1.0, 1.5, 2.0]
+
+
+def test_clear_drops_everything():
+    scheduler = Scheduler()
+    events = [scheduler.schedule(t, _recorder([], "x")) for t in (1.0, 2.0)]
+    scheduler.clear()
+    assert scheduler.next_time() == INF
+    assert not any(event.pending() for event in events)
@@ -0,0 +1,54 @@
+"""
+Space-time planning around predicted traffic light phases
+"""
+
+from core.grid_state import GridState, BARRIER, TRAFFIC
+from core.spacetime import spacetime_search
+from entities.traffic_light import light_state_at
+
+STEP = 0.25
+LIGHT = (0, 3)
+
+
+def _corridor(rows_open):
+    """10-wide grid with `rows_open` free rows and a light at LIGHT that is red until t=1.0"""
+    state = GridState(3, 10)
+    for row in range(rows_open, 3):
+        for col in range(10):
+            state.set_flag(row, col, BARRIER)
+    state.set_flag(*LIGHT, TRAFFIC)
+    state.set_light_start(*LIGHT, -4.0)
+    return state
+
+
+def _check_lights(state, path, start_time):
+    """Every arrival on a light cell happens while it is green"""
+    phase = state.get_light_start(*LIGHT)
+    for step, (cell, previous) in enumerate(zip(path[1:], path), 1):
+        if cell == LIGHT and previous != LIGHT:
+            assert light_state_at(start_time + step * STEP, phase) == "green"
+
+
+def test_waits_for_green_in_a_corridor():
+    state = _corridor(rows_open=1)
+    assert light_state_at(0.0, -4.0) == "red"
+    path = spacetime_search(state, (0, 0), (0, 6), 0.0, STEP)
+    assert path[0] == (0, 0) and path[-1] == (0, 6)
+    _check_lights(state, path, 0.0)
+    # Green at t=1.0 is step 4: the light is three cells away, so one wait
+    assert len(path) == 8
+    assert len(set(path)) == 7
+
+
+def test_detours_around_a_red_light():
+    state = _corridor(rows_open=2)
+    path = spacetime_search(state, (0, 0), (0, 6), 0.0, STEP)
+    assert LIGHT not in path
+    assert len(path) == len(set(path)) == 7
+
+
+def test_green_light_is_crossed_without_waiting():
+    state = _corridor(rows_open=1)
+    path = spacetime_search(state, (0, 0), (0, 6), 1.0, STEP)
+    _check_lights(state, path, 1.0)
+    assert path == [(0, col) for col in range(7)]
@@ -0,0 +1,53 @@
+"""
+Tour planning: priority order, tour quality and the in-process path
+"""
+
+import itertools
+import pytest
+import core.tour as tour
+from core.grid_state import GridState, BARRIER
+from core.tour import plan_tour, pairwise_costs, route_cost
+
+TARGETS = [(2, 17), (17, 2), (3, 3), (16, 16), (10, 10), (2, 9), (17, 9), (9, 2)]
+
+
+def _state():
+    state = GridState(20, 20)
+    for row in range(4, 15):
+        state.set_flag(row, 6, BARRIER)
+    return state
+
+
+def test_priorities_are_visited_in_order():
+    state = _state()
+    priorities = [2, 1, 3, 1, 2, 3, 1, 2]
+    order = plan_tour(state, (0, 0), TARGETS, priorities, workers=1)
+    assert sorted(order) == list(range(len(TARGETS)))
+    assert [priorities[i] for i in order] == sorted(priorities)
+
+
+def test_tour_is_optimal_for_few_targets():
+    state = _state()
+    targets = TARGETS[:6]
+    order = plan_tour(state, (0, 0), targets, workers=1)
+    matrix = pairwise_costs(state, [(0, 0)] + targets, workers=1)
+    best = min(route_cost(matrix, [0] + [i + 1 for i in perm])
+               for perm in itertools.permutations(range(len(targets))))
+    assert route_cost(matrix, [0] + [i + 1 for i in order]) == pytest.approx(best)
+
+
+def test_unreachable_targets_go_last():
+    state = _state()
+    for row, col in ((0, 18), (1, 18), (1, 19)):
+        state.set_flag(row, col, BARRIER)
+    order = plan_tour(state, (5, 5), [(0, 19), (10, 10)], workers=1)
+    assert order == [1, 0]
+
+
+def test_single_worker_stays_in_process(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("process pool started")
+    monkeypatch.setattr(tour, "ProcessPoolExecutor", no_pool)
+    monkeypatch.setattr(tour, "_cost_cache", {})
+    order = plan_tour(_state(), (0, 0), TARGETS, workers=1)
+    assert sorted(order) == list(range(len(TARGETS)))
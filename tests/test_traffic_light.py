@@ -0,0 +1,81 @@
+"""
+Traffic light flip events and robots waiting at a light
+"""
+
+import contextlib
+import io
+from config.constants import VIS_NONE, PLANNER_ASTAR
+from core.clock import SimClock, set_clock
+from core.grid import make_grid
+from core.robot import Robot
+from core.scheduler import Scheduler
+from entities.traffic_light import TrafficLightController
+
+
+def _light(grid, row, col, cycle_start):
+    spot = grid[row][col]
+    spot.make_traffic_light()
+    spot.light_cycle_start = cycle_start
+    return spot
+
+
+def test_listeners_get_each_flip_once():
+    clock = set_clock(SimClock(0.05))
+    grid = make_grid(10)
+    _light(grid, 5, 5, 0.0)
+    lights = TrafficLightController(grid, clock)
+    events = []
+    lights.add_listener(events.append)
+
+    lights.update(0.0)
+    assert events == []
+    lights.update(3.6)  # Green ends at 3.5
+    assert events == [[(5, 5, "yellow")]]
+    lights.update(3.7)
+    assert len(events) == 1
+    lights.update(4.1)
+    assert events[-1] == [(5, 5, "red")]
+
+    lights.remove_listener(events.append)
+    lights.update(5.1)
+    assert len(events) == 2
+    assert grid[5][5].light_state == "green"
+
+
+def test_robot_leaves_as_soon_as_the_light_turns_green():
+    clock = set_clock(SimClock(0.05))
+    grid = make_grid(10)
+    for col in range(10):
+        grid[1][col].make_barrier()
+    clock.advance_to(60.0)
+    # Red from 60.0 until 61.0
+    _light(grid, 0, 1, 56.0)
+    start, goal = grid[0][0], grid[0][9]
+    start.make_start()
+    goal.make_end()
+    robot = Robot(start, goal, grid, None, visualize=VIS_NONE, replan_visualize=VIS_NONE,
+                  planner=PLANNER_ASTAR, clock=clock)
+
+    scheduler = Scheduler()
+    lights = TrafficLightController(grid, clock)
+    scheduler.schedule(clock.now(), lights.on_due)
+
+    def advance_robot(now):
+        robot.step()
+        return None if robot.reached_goal() else robot.next_step_time()
+
+    robot_event = scheduler.schedule(clock.now(), advance_robot)
+
+    def on_lights(changes):
+        if robot.on_lights(changes):
+            scheduler.reschedule(robot_event, robot.next_step_time())
+
+    lights.add_listener(on_lights)
+    with contextlib.redirect_stdout(io.StringIO()):
+        robot.plan_path()
+        while clock.now() < 61.3:
+            clock.advance()
+            scheduler.run_due(clock.now())
+    assert robot.paused is False
+    # Without the listener the robot would wait out PAUSE_DURATION until 62.0
+    assert robot.current.get_pos() != (0, 0)
@@ -0,0 +1,124 @@
+"""
+Viewport onto the grid for panning and zooming
+
+Spots are laid out in world pixels (CELL_SIZE per cell) no matter how big
+the grid is. The camera shows part of that world in the grid area of the
+window at one of ZOOM_LEVELS, given in window pixels per cell: whole
+numbers when zoomed in, so cells tile the view exactly, and fractions when
+zoomed out far enough that one window pixel covers several cells.
+"""
+
+import math
+import pygame
+from config.constants import ZOOM_LEVELS
+from config.settings import CELL_SIZE
+from core.grid import get_clicked_pos
+
+class Camera:
+    """Maps world pixels to window pixels for a scrolled, zoomed view"""
+
+    def __init__(self, view_width, view_height=None, gap=CELL_SIZE):
+        self.view_width = view_width
+        self.view_height = view_width if view_height is None else view_height
+        self.gap = gap          # World pixels per cell
+        self.rows = self.cols = 1
+        self.cell_px = 1        # Window pixels per cell (one of ZOOM_LEVELS)
+        self.scroll_x = 0       # Window pixels the view is scrolled right...
+        self.scroll_y = 0       # ...and down from the top-left of the grid
+        self.version = 0        # Bumped on every pan or zoom
+
+    @property
+    def scale(self):
+        """Window pixels per world pixel"""
+        return self.cell_px / self.gap
+
+    def set_grid(self, rows, cols, gap=None):
+        """Show a grid of a new size, zoomed to fit"""
+        self.rows, self.cols = rows, cols
+        if gap is not None:
+            self.gap = gap
+        self.fit()
+
+    def fit(self):
+        """Zoom to the largest level that shows the whole grid"""
+        fitting = [z for z in ZOOM_LEVELS
+                   if self.rows * z <= self.view_width and self.cols * z <= self.view_height]
+        self.cell_px = fitting[-1] if fitting else ZOOM_LEVELS[0]
+        self.scroll_x = self.scroll_y = 0
+        self.version += 1
+
+    def _clamp(self):
+        """Keep the view over the grid"""
+        max_x = max(0, math.ceil(self.rows * self.cell_px) - self.view_width)
+        max_y = max(0, math.ceil(self.cols * self.cell_px) - self.view_height)
+        self.scroll_x = min(max(self.scroll_x, 0), max_x)
+        self.scroll_y = min(max(self.scroll_y, 0), max_y)
+
+    def pan(self, dx, dy):
+        """Scroll the view by a number of window pixels"""
+        before = (self.scroll_x, self.scroll_y)
+        self.scroll_x += int(dx)
+        self.scroll_y += int(dy)
+        self._clamp()
+        if (self.scroll_x, self.scroll_y) != before:
+            self.version += 1
+
+    def zoom(self, steps, anchor=None):
+        """Move `steps` zoom levels in (negative: out), keeping the point under `anchor` fixed"""
+        level = ZOOM_LEVELS.index(self.cell_px)
+        level = min(max(level + steps, 0), len(ZOOM_LEVELS) - 1)
+        if ZOOM_LEVELS[level] == self.cell_px:
+            return
+        ax, ay = anchor or (self.view_width // 2, self.view_height // 2)
+        # Grid position (in cells) under the anchor, before and after
+        u = (ax + self.scroll_x) / self.cell_px
+        v = (ay + self.scroll_y) / self.cell_px
+        self.cell_px = ZOOM_LEVELS[level]
+        self.scroll_x = int(round(u * self.cell_px - ax))
+        self.scroll_y = int(round(v * self.cell_px - ay))
+        self._clamp()
+        self.version += 1
+
+    def to_screen(self, x, y):
+        """Window position of a point in world pixels"""
+        scale = self.scale
+        return x * scale - self.scroll_x, y * scale - self.scroll_y
+
+    def to_world(self, x, y):
+        """World position of a point in window pixels"""
+        scale = self.scale
+        return (x + self.scroll_x) / scale, (y + self.scroll_y) / scale
+
+    def cell_at(self, pos):
+        """(row, col) of the cell under a window position, or None off the grid"""
+        if not (0 <= pos[0] < self.view_width and 0 <= pos[1] < self.view_height):
+            return None
+        row, col = get_clicked_pos(self.to_world(*pos), self.gap)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def cell_rect(self, row, col):
+        """Window rect covered by a cell"""
+        size = self.cell_px
+        return pygame.Rect(int(row * size) - self.scroll_x, int(col * size) - self.scroll_y,
+                           max(1, int(size)), max(1, int(size)))
+
+    def visible_range(self):
+        """(first row, last row + 1, first col, last col + 1) of the cells in view"""
+        size = self.cell_px
+        return (int(self.scroll_x // size),
+                min(self.rows, math.ceil((self.scroll_x + self.view_width) / size)),
+                int(self.scroll_y // size),
+                min(self.cols, math.ceil((self.scroll_y + self.view_height) / size)))
+
+    def cells_under(self, rect):
+        """(row, col) of the visible cells a window rect overlaps"""
+        size = self.cell_px
+        row_lo, row_hi, col_lo, col_hi = self.visible_range()
+        first_row = max(row_lo, int((rect.left + self.scroll_x) // size))
+        last_row = min(row_hi - 1, int((rect.right - 1 + self.scroll_x) // size))
+        first_col = max(col_lo, int((rect.top + self.scroll_y) // size))
+        last_col = min(col_hi - 1, int((rect.bottom - 1 + self.scroll_y) // size))
+        return [(r, c) for r in range(first_row, last_row + 1)
+                for c in range(first_col, last_col + 1)]
@@ -72,14 +72,12 @@ def get_numeric_input(prompt, title="Input", min_val=None, max_val=None):
         except ValueError:
             show_message("Invalid Input", "Please enter a valid number", "warning")
 
-def handle_mouse_click(pos, grid, width, rows, start, targets, robot_params, modes):
+def handle_mouse_click(pos, grid, width, rows, start, targets, robot_params, modes, camera=None):
     """Handle mouse click events based on current mode"""
-    if pos[0] >= width:  # Click outside grid area
-        return start, targets
-    
-    row, col = get_clicked_pos(pos, rows, width)
-    if not (0 <= row < rows and 0 <= col < rows):
+    cell = clicked_cell(pos, grid, width, rows, camera)
+    if cell is None:
         return start, targets
+    row, col = cell
     
     spot = grid[row][col]
     
@@ -106,14 +104,12 @@ def handle_mouse_click(pos, grid, width, rows, start, targets, robot_params, mod
     
     return start, targets
 
-def handle_right_click(pos, grid, width, rows, start, targets):
+def handle_right_click(pos, grid, width, rows, start, targets, camera=None):
     """Handle right mouse click to remove objects"""
-    if pos[0] >= width:  # Click outside grid area
-        return start, targets
-    
-    row, col = get_clicked_pos(pos, rows, width)
-    if not (0 <= row < rows and 0 <= col < rows):
+    cell = clicked_cell(pos, grid, width, rows, camera)
+    if cell is None:
         return start, targets
+    row, col = cell
     
     spot = grid[row][col]
     
@@ -132,4 +128,15 @@ def get_clicked_pos(pos, rows, width):
     """Get the grid position from mouse click coordinates"""
     gap = width // rows
     y, x = pos
-    return y // gap, x // gap
\ No newline at end of file
+    return y // gap, x // gap
+
+def clicked_cell(pos, grid, width, rows, camera=None):
+    """(row, col) under a click, through the renderer's camera if given; None off the grid"""
+    if camera is not None:
+        return camera.cell_at(pos)
+    if pos[0] >= width:  # Click outside grid area
+        return None
+    row, col = get_clicked_pos(pos, rows, width)
+    if not grid.state.in_bounds(row, col):
+        return None
+    return row, col
\ No newline at end of file
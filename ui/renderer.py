@@ -1,8 +1,13 @@
 import pygame
 import math
+import weakref
+import numpy as np
 from config.constants import *
 from config.settings import *
 from core.grid import draw_grid
+from core.grid_state import BARRIER, DYNAMIC, TRAFFIC, START, END
+from ui.resources import render_text, trail_sprite
+from ui.camera import Camera
 
 def draw(win, grid, rows, width, trails, robot_center, robot=None, dynamic_obstacles=None, modes=None):
     """Main drawing function for the entire simulation"""
@@ -25,46 +30,264 @@ def draw(win, grid, rows, width, trails, robot_center, robot=None, dynamic_obsta
 
     # Draw robot with direction indicator
     if robot_center:
-        pos_x, pos_y = robot_center
-        radius = grid[0][0].width // 3
-        
-        # Draw robot body
-        pygame.draw.circle(win, ORANGE, (pos_x, pos_y), radius)
-        pygame.draw.circle(win, BLACK, (pos_x, pos_y), radius, 2)  # Border
-        
-        # Draw direction arrow if robot has moved
-        if len(trails) > 1:
-            prev_trail = trails[-2] if len(trails) > 1 else None
-            if prev_trail:
-                prev_pos = prev_trail.pos
-                angle = math.atan2(pos_y - prev_pos[1], pos_x - prev_pos[0])
-                arrow_length = radius * 0.8
-                end_x = pos_x + arrow_length * math.cos(angle)
-                end_y = pos_y + arrow_length * math.sin(angle)
-                pygame.draw.line(win, BLACK, (pos_x, pos_y), (end_x, end_y), 3)
+        draw_robot(win, robot_center, grid[0][0].width // 3, trails)
 
     # Draw grid lines
-    draw_grid(win, rows, width)
+    draw_grid(win, len(grid), len(grid[0]), grid[0][0].width)
     
     # Draw UI sidebar
     draw_ui(win, robot, modes, dynamic_obstacles)
     
     pygame.display.update()
 
+def draw_robot(win, robot_center, radius, trails, camera=None):
+    """Draw the robot body and its direction arrow (robot_center in world pixels)"""
+    pos_x, pos_y = robot_center
+    heading = None
+    if trails and len(trails) > 1:
+        prev_pos = trails[-2].pos
+        heading = math.atan2(pos_y - prev_pos[1], pos_x - prev_pos[0])
+    if camera is not None:
+        pos_x, pos_y = camera.to_screen(pos_x, pos_y)
+    
+    # Draw robot body
+    pygame.draw.circle(win, ORANGE, (pos_x, pos_y), radius)
+    pygame.draw.circle(win, BLACK, (pos_x, pos_y), radius, 2)  # Border
+    
+    # Draw direction arrow if robot has moved
+    if heading is not None:
+        arrow_length = radius * 0.8
+        end_x = pos_x + arrow_length * math.cos(heading)
+        end_y = pos_y + arrow_length * math.sin(heading)
+        pygame.draw.line(win, BLACK, (pos_x, pos_y), (end_x, end_y), 3)
+
+class DirtyRenderer:
+    """Frame renderer that redraws only the cells whose appearance changed
+
+    The grid is shown through a Camera, so grids of any rows x cols can be
+    panned and zoomed inside the grid area. Grid lines and barriers for the
+    cells in view live on a cached background surface, rebuilt when the
+    grid or the camera changes. Each frame the renderer collects dirty
+    cells (spot color/light changes recorded in the grid state, plus cells
+    under trail markers and the robot that moved or faded), repaints just
+    the visible ones and passes only their rects to pygame.display.update.
+    The sidebar is redrawn only when its content changes.
+    """
+
+    LINE_KEY = (255, 0, 255)  # Colorkey for the transparent grid line overlay
+
+    def __init__(self, win, width=WIDTH, height=None):
+        self.win = win
+        self.width = width
+        self.camera = Camera(width, height)
+        self.view = pygame.Rect(0, 0, self.camera.view_width, self.camera.view_height)
+        self.grid = None
+        self.background = None
+        self.lines = None
+        self._painted = set()  # Flat indices of spots that differ from the background
+        self._painted_by_state = weakref.WeakKeyDictionary()  # Kept per grid state
+        self._camera_version = None
+        self._overlays = {}
+        self._sidebar_key = None
+        self._full_redraw = True
+
+    def invalidate(self):
+        """Force a full redraw on the next frame"""
+        self._full_redraw = True
+
+    def _set_grid(self, grid):
+        """Start drawing a new grid, refitting the camera if its size changed"""
+        state = grid.state
+        camera = self.camera
+        if (state.rows, state.cols, grid[0][0].width) != (camera.rows, camera.cols, camera.gap):
+            camera.set_grid(state.rows, state.cols, grid[0][0].width)
+        self.grid = grid
+        # New spots start out white, so only cells recolored since are candidates
+        self._painted = self._painted_by_state.setdefault(state, set())
+
+    def _build_surfaces(self, grid):
+        """Cache the grid line overlay and the background for the cells in view"""
+        state = grid.state
+        camera = self.camera
+        size = camera.cell_px
+        row_lo, row_hi, col_lo, col_hi = camera.visible_range()
+        origin_x = int(row_lo * size) - camera.scroll_x
+        origin_y = int(col_lo * size) - camera.scroll_y
+        extent_x = int(row_hi * size) - camera.scroll_x
+        extent_y = int(col_hi * size) - camera.scroll_y
+
+        self.lines = pygame.Surface(self.view.size)
+        self.lines.fill(self.LINE_KEY)
+        self.lines.set_colorkey(self.LINE_KEY)
+        if size >= GRID_LINE_MIN_CELL:
+            for r in range(row_lo, row_hi + 1):
+                x = r * size - camera.scroll_x
+                pygame.draw.line(self.lines, GRAY, (x, origin_y), (x, extent_y))
+            for c in range(col_lo, col_hi + 1):
+                y = c * size - camera.scroll_y
+                pygame.draw.line(self.lines, GRAY, (origin_x, y), (extent_x, y))
+
+        # Barriers straight from the state layer: one pixel per cell, scaled up
+        self.background = pygame.Surface(self.view.size)
+        self.background.fill(SIDEBAR_BG)
+        barriers = (state.flags_view[row_lo:row_hi, col_lo:col_hi] & BARRIER) != 0
+        if barriers.size:
+            pixels = np.where(barriers[..., None], np.array(BLACK, dtype=np.uint8),
+                              np.array(WHITE, dtype=np.uint8))
+            cells = pygame.surfarray.make_surface(pixels)
+            self.background.blit(pygame.transform.scale(
+                cells, (max(1, extent_x - origin_x), max(1, extent_y - origin_y))),
+                (origin_x, origin_y))
+        self.background.blit(self.lines, (0, 0))
+
+    def _is_static(self, spot):
+        """Whether a spot looks exactly like its background cell (empty or barrier)"""
+        return (spot.color in (WHITE, BLACK) and not spot.is_traffic_stop and
+                not (spot.is_end() and getattr(spot, 'priority', None)))
+
+    def _overlay_state(self, trails, robot_center):
+        """Map each trail marker and the robot to the window rect it covers and its look"""
+        camera = self.camera
+        overlays = {}
+        for trail in trails:
+            x, y = camera.to_screen(*trail.pos)
+            size = max(1, int(trail.size * camera.scale))
+            rect = pygame.Rect(x - size, y - size, size * 2, size * 2)
+            overlays[id(trail)] = (rect, trail.alpha)
+        if robot_center:
+            x, y = camera.to_screen(*robot_center)
+            radius = self._robot_radius()
+            rect = pygame.Rect(x - radius, y - radius, radius * 2 + 1, radius * 2 + 1)
+            heading = trails[-2].pos if len(trails) > 1 else None
+            overlays['robot'] = (rect, heading)
+        return overlays
+
+    def _robot_radius(self):
+        return max(2, int(self.camera.cell_px) // 3)
+
+    def _sidebar_state(self, robot, modes, dynamic_obstacles):
+        """Everything the sidebar shows, to detect when it needs redrawing"""
+        status = robot.get_completion_status() if robot else None
+        obstacles = None
+        if dynamic_obstacles and hasattr(dynamic_obstacles, 'get_obstacles'):
+            obstacles = (tuple((o.name, o.speed) for o in dynamic_obstacles.get_obstacles()[:5]),
+                         dynamic_obstacles.get_obstacle_count())
+        return (repr(status), repr(modes), obstacles, sim_speed)
+
+    def draw(self, grid, trails, robot_center, robot=None, dynamic_obstacles=None, modes=None):
+        """Draw one frame, updating only the parts of the window that changed"""
+        win = self.win
+        state = grid.state
+        camera = self.camera
+        cols = state.cols
+
+        # Remove faded trails
+        if trails:
+            active_trails = [trail for trail in trails if not trail.is_faded()]
+            trails.clear()
+            trails.extend(active_trails)
+        trails = trails or []
+
+        if grid is not self.grid:
+            self._set_grid(grid)
+            self._full_redraw = True
+        if camera.version != self._camera_version:
+            self._camera_version = camera.version
+            self._full_redraw = True
+
+        # Track which spots differ from the background, wherever they are
+        dirty = state.dirty_cells
+        painted = self._painted
+        for index in dirty:
+            r, c = divmod(index, cols)
+            if self._is_static(grid[r][c]):
+                painted.discard(index)
+            else:
+                painted.add(index)
+
+        overlays = self._overlay_state(trails, robot_center)
+        sidebar_key = self._sidebar_state(robot, modes, dynamic_obstacles)
+        row_lo, row_hi, col_lo, col_hi = camera.visible_range()
+
+        if self._full_redraw:
+            self._full_redraw = False
+            self._build_surfaces(grid)
+            win.set_clip(self.view)
+            win.blit(self.background, (0, 0))
+            for index in painted:
+                r, c = divmod(index, cols)
+                if row_lo <= r < row_hi and col_lo <= c < col_hi:
+                    grid[r][c].draw(win, camera.cell_rect(r, c))
+            for trail in trails:
+                trail.draw(win, camera)
+            if robot_center:
+                draw_robot(win, robot_center, self._robot_radius(), trails, camera)
+            win.blit(self.lines, (0, 0))
+            win.set_clip(None)
+            draw_ui(win, robot, modes, dynamic_obstacles)
+            dirty.clear()
+            self._overlays = overlays
+            self._sidebar_key = sidebar_key
+            pygame.display.update()
+            return
+
+        # Cells whose spot changed, plus cells under overlays that moved, faded or vanished
+        cells = {divmod(index, cols) for index in dirty}
+        previous = self._overlays
+        for key in previous.keys() | overlays.keys():
+            old, new = previous.get(key), overlays.get(key)
+            if old != new:
+                for overlay in (old, new):
+                    if overlay is not None:
+                        cells.update(camera.cells_under(overlay[0]))
+        self._overlays = overlays
+
+        update_rects = []
+        for r, c in cells:
+            if not (row_lo <= r < row_hi and col_lo <= c < col_hi):
+                continue
+            spot = grid[r][c]
+            rect = camera.cell_rect(r, c).clip(self.view)
+
+            # Keep the cached background in sync with barrier edits
+            if self._is_static(spot):
+                pygame.draw.rect(self.background, spot.color, rect)
+                self.background.blit(self.lines, rect, rect)
+                win.blit(self.background, rect, rect)
+            else:
+                win.set_clip(rect)
+                spot.draw(win, camera.cell_rect(r, c))
+
+            # Re-draw whatever overlaps this cell, clipped so alpha is not blended twice
+            win.set_clip(rect)
+            for trail in trails:
+                if overlays[id(trail)][0].colliderect(rect):
+                    trail.draw(win, camera)
+            if robot_center and overlays['robot'][0].colliderect(rect):
+                draw_robot(win, robot_center, self._robot_radius(), trails, camera)
+            win.blit(self.lines, rect, rect)
+            win.set_clip(None)
+            update_rects.append(rect)
+        dirty.clear()
+
+        if sidebar_key != self._sidebar_key:
+            self._sidebar_key = sidebar_key
+            draw_ui(win, robot, modes, dynamic_obstacles)
+            update_rects.append(pygame.Rect(WIDTH, 0, SIDEBAR_WIDTH, WIDTH))
+
+        if update_rects:
+            pygame.display.update(update_rects)
+
 def draw_ui(win, robot=None, modes=None, dynamic_obstacles=None):
     """Draw the UI sidebar with controls and information"""
     # Clear sidebar area
     pygame.draw.rect(win, SIDEBAR_BG, (WIDTH, 0, SIDEBAR_WIDTH, WIDTH))
     
-    font_title = pygame.font.SysFont('Arial', 20, bold=True)
-    font_section = pygame.font.SysFont('Arial', 16, bold=True)
-    font = pygame.font.SysFont('Arial', 14)
-    font_small = pygame.font.SysFont('Arial', 12)
 
     y_offset = 20
     
     # Title
-    title = font_title.render("A* ROBOT SIMULATOR", True, BLACK)
+    title = render_text("A* ROBOT SIMULATOR", 'title', BLACK)
     win.blit(title, (WIDTH + 10, y_offset))
     y_offset += 35
 
@@ -80,14 +303,14 @@ def draw_ui(win, robot=None, modes=None, dynamic_obstacles=None):
         elif modes.get('dynamic_mode', False):
             current_mode = "Dynamic Obstacle"
         
-        mode_text = font_section.render("Mode:", True, BLACK)
+        mode_text = render_text("Mode:", 'section', BLACK)
         win.blit(mode_text, (WIDTH + 10, y_offset))
-        mode_value = font.render(current_mode, True, BLUE)
+        mode_value = render_text(current_mode, 'normal', BLUE)
         win.blit(mode_value, (WIDTH + 60, y_offset))
         y_offset += 25
 
     # Controls section
-    controls_title = font_section.render("Controls:", True, BLACK)
+    controls_title = render_text("Controls:", 'section', BLACK)
     win.blit(controls_title, (WIDTH + 10, y_offset))
     y_offset += 20
 
@@ -104,18 +327,19 @@ def draw_ui(win, robot=None, modes=None, dynamic_obstacles=None):
         "S: Save Map",
         "L: Load Map",
         "1-4: Speed Control",
+        "Arrows/Wheel: Pan/Zoom View",
         "Q: Quit"
     ]
 
     for control in controls:
-        text = font_small.render(control, True, BLACK)
+        text = render_text(control, 'small', BLACK)
         win.blit(text, (WIDTH + 10, y_offset))
         y_offset += 16
 
     # Robot status section
     if robot:
         y_offset += 10
-        status_title = font_section.render("Robot Status:", True, BLACK)
+        status_title = render_text("Robot Status:", 'section', BLACK)
         win.blit(status_title, (WIDTH + 10, y_offset))
         y_offset += 20
 
@@ -124,33 +348,38 @@ def draw_ui(win, robot=None, modes=None, dynamic_obstacles=None):
         
         # Show completion information
         completed_text = f"Completed: {completion_status['completed_count']}"
-        completed_render = font_small.render(completed_text, True, BLACK)
+        completed_render = render_text(completed_text, 'small', BLACK)
         win.blit(completed_render, (WIDTH + 10, y_offset))
         y_offset += 14
         
         if completion_status['current_target_priority']:
             current_text = f"Current Target: {completion_status['current_target_priority']}"
-            current_render = font_small.render(current_text, True, BLACK)
+            current_render = render_text(current_text, 'small', BLACK)
             win.blit(current_render, (WIDTH + 10, y_offset))
             y_offset += 14
 
     # Dynamic obstacles section
     if dynamic_obstacles and hasattr(dynamic_obstacles, 'get_obstacles'):
         obstacles = dynamic_obstacles.get_obstacles()
-        if obstacles:
+        walkers = dynamic_obstacles.get_obstacle_count() - len(obstacles)
+        if obstacles or walkers:
             y_offset += 15
-            obstacles_title = font_section.render("Dynamic Obstacles:", True, BLACK)
+            obstacles_title = render_text("Dynamic Obstacles:", 'section', BLACK)
             win.blit(obstacles_title, (WIDTH + 10, y_offset))
             y_offset += 20
 
             for obstacle in obstacles[:5]:  # Show max 5 obstacles to prevent overflow
-                obstacle_text = font_small.render(f"{obstacle.name} (Speed: {obstacle.speed})", True, BLUE)
+                obstacle_text = render_text(f"{obstacle.name} (Speed: {obstacle.speed})", 'small', BLUE)
                 win.blit(obstacle_text, (WIDTH + 10, y_offset))
                 y_offset += 14
+            if walkers:
+                walkers_text = render_text(f"{walkers} random walkers", 'small', BLUE)
+                win.blit(walkers_text, (WIDTH + 10, y_offset))
+                y_offset += 14
 
     # Speed indicator
     y_offset = WIDTH - 60
-    speed_text = font.render(f"Simulation Speed: {sim_speed}x", True, BLACK)
+    speed_text = render_text(f"Simulation Speed: {sim_speed}x", 'normal', BLACK)
     win.blit(speed_text, (WIDTH + 10, y_offset))
 
 def draw_path_preview(win, grid, path, color=PURPLE):
@@ -179,9 +408,7 @@ def draw_sensor_range(win, robot, grid):
     radius = getattr(robot, 'sensor_range', 3) * grid[0][0].width
     
     # Draw semi-transparent circle
-    s = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-    pygame.draw.circle(s, (*GREEN, 50), (radius, radius), radius)
-    win.blit(s, (center_x - radius, center_y - radius))
+    win.blit(trail_sprite(GREEN, radius, 50), (center_x - radius, center_y - radius))
     
     # Draw border
     pygame.draw.circle(win, GREEN, (center_x, center_y), radius, 2)
@@ -197,28 +424,27 @@ def draw_mini_map(win, grid, robot):
     pygame.draw.rect(win, BLACK, (mini_x, mini_y, mini_size, mini_size), 2)
     
     # Calculate scaling
-    scale = mini_size / len(grid)
+    scale = mini_size / max(len(grid), len(grid[0]))
     
-    # Draw grid elements
-    for i, row in enumerate(grid):
-        for j, spot in enumerate(row):
-            pixel_x = mini_x + j * scale
-            pixel_y = mini_y + i * scale
-            
-            color = WHITE
-            if spot.is_barrier():
-                color = BLACK
-            elif spot.is_end():
-                color = TURQUOISE
-            elif spot.is_start():
-                color = ORANGE
-            elif hasattr(spot, 'is_traffic_stop') and spot.is_traffic_stop:
-                color = spot.color
-            elif spot.is_dynamic():
-                color = BLUE
-            
-            if color != WHITE:
-                pygame.draw.rect(win, color, (pixel_x, pixel_y, scale, scale))
+    # Draw grid elements (only occupied cells, found from the state layers)
+    state = grid.state
+    for i, j in state.cells_with(BARRIER | END | START | TRAFFIC | DYNAMIC):
+        spot = grid[i][j]
+        pixel_x = mini_x + j * scale
+        pixel_y = mini_y + i * scale
+        
+        if spot.is_barrier():
+            color = BLACK
+        elif spot.is_end():
+            color = TURQUOISE
+        elif spot.is_start():
+            color = ORANGE
+        elif spot.is_traffic_stop:
+            color = spot.color
+        else:
+            color = BLUE
+        
+        pygame.draw.rect(win, color, (pixel_x, pixel_y, scale, scale))
     
     # Draw robot position
     if robot and robot.current:
@@ -0,0 +1,65 @@
+"""
+Cached fonts, text and sprites for the render path
+
+Loading a font or allocating a Surface every frame is one of the most
+expensive things the UI does, so everything here is created once and
+reused: fonts per (name, size, bold), rendered text per string and style,
+and translucent trail sprites per color, size and alpha bucket.
+"""
+
+from functools import lru_cache
+import pygame
+
+# Trail alpha is quantized to this step when picking a cached sprite
+ALPHA_BUCKET = 5
+
+# Named sidebar font styles: (system font name, size, bold)
+FONT_STYLES = {
+    'title': ('Arial', 20, True),
+    'section': ('Arial', 16, True),
+    'normal': ('Arial', 14, False),
+    'small': ('Arial', 12, False),
+}
+
+
+@lru_cache(maxsize=None)
+def get_font(name, size, bold=False):
+    """Load a font once; name None selects pygame's default font"""
+    if name is None:
+        return pygame.font.Font(None, size)
+    return pygame.font.SysFont(name, size, bold=bold)
+
+
+def get_style_font(style):
+    """Font for one of the named FONT_STYLES"""
+    return get_font(*FONT_STYLES[style])
+
+
+@lru_cache(maxsize=1024)
+def render_text(text, style, color):
+    """Render a string once per font style and color"""
+    if style in FONT_STYLES:
+        font = get_style_font(style)
+    else:
+        font = get_font(None, style)  # Numeric style: default font at that size
+    return font.render(text, True, color)
+
+
+@lru_cache(maxsize=2048)
+def trail_sprite(color, size, alpha):
+    """Pre-rendered translucent circle for a trail marker"""
+    sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, (*color, alpha), (size, size), size)
+    return sprite
+
+
+def alpha_bucket(alpha):
+    """Quantize an alpha value so fading markers share sprites"""
+    return min(255, max(0, int(round(alpha / ALPHA_BUCKET)) * ALPHA_BUCKET))
+
+
+def clear_caches():
+    """Drop every cached resource (call after pygame.font.quit())"""
+    get_font.cache_clear()
+    render_text.cache_clear()
+    trail_sprite.cache_clear()
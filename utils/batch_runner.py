@@ -0,0 +1,301 @@
+"""
+Headless batch runner for evaluating many map/seed scenarios
+
+Each scenario loads a map saved with save_map, runs a Robot through all of
+its targets while a DynamicObstacleManager moves the obstacles, and advances
+a fresh SimClock in fixed ticks instead of waiting on the wall clock. The
+robot, obstacles and lights run from a Scheduler, so the clock jumps
+straight to the tick of the next due event. No window is opened. Every
+plan is profiled, so the results show which maps make planning expensive.
+Scenarios are spread across a ProcessPoolExecutor.
+
+With --robots N the map's targets are dealt out to a FleetManager of N
+space-time robots, starting at the map's start and the free cells nearest
+to it, that plan around each other's reservations.
+
+Run from the repository root:
+
+    python -m utils.batch_runner city_1 city_2 --seeds 100 --workers 8
+    python -m utils.batch_runner city_1 --robots 4
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from collections import deque
+from itertools import product
+
+from config.constants import MOVE_DELAY, VIS_NONE, PLANNERS, PLANNER_ASTAR, PLANNER_SPACETIME, PLAN_NEW_GOAL
+from core.clock import SimClock, set_clock
+from core.fleet import FleetManager
+from core.robot import Robot
+from core.scheduler import Scheduler, INF
+from entities.dynamic_obstacle import DynamicObstacleManager
+from entities.traffic_light import TrafficLightController
+from utils.file_manager import load_map, ensure_directories
+
+# Simulated seconds per tick and the default tick budget per scenario
+BATCH_TICK = MOVE_DELAY / 4
+MAX_TICKS = 20000
+
+
+def run_scenario(map_name, seed, planner=PLANNER_ASTAR, tick=BATCH_TICK, max_ticks=MAX_TICKS, quiet=True,
+                 robots=1):
+    """Run one map with one random seed to completion (or the tick budget)
+
+    With more than one robot the targets are shared by a space-time fleet,
+    whatever `planner` says.
+    """
+    random.seed(seed)
+    clock = set_clock(SimClock(tick))
+    wall_start = time.perf_counter()
+    result = {
+        "map": map_name,
+        "seed": seed,
+        "planner": planner if robots == 1 else PLANNER_SPACETIME,
+        "robots": robots,
+        "loaded": False,
+        "completed": False,
+        "targets_completed": 0,
+        "targets_total": 0,
+        "steps": 0,
+        "replans": 0,
+        "ticks": 0,
+        "sim_time": 0.0,
+        "wall_time": 0.0,
+        "plans": 0,
+        "plan_wall_time": 0.0,
+        "max_plan_time": 0.0,
+        "plan_expanded": 0,
+        "plan_pushes": 0,
+        "max_open": 0,
+        "plan_reasons": {},
+    }
+
+    output = io.StringIO() if quiet else None
+    with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        loaded = load_map(None, map_name)
+        if loaded and loaded[1] and loaded[2]:
+            if robots > 1:
+                _simulate_fleet(loaded, robots, clock, max_ticks, result)
+            else:
+                _simulate(loaded, planner, clock, max_ticks, result)
+
+    result["wall_time"] = time.perf_counter() - wall_start
+    return result
+
+
+def _simulate(loaded, planner, clock, max_ticks, result):
+    """Drive robot, obstacles and lights on the scenario's clock"""
+    grid, start, targets, obstacles, _ = loaded
+    scheduler, manager, lights = _start_world(grid, targets, obstacles, clock, result)
+
+    pending = sorted(targets, key=lambda target: target.target_priority or 0)
+    robot = Robot(start, pending.pop(0), grid, None,
+                  visualize=VIS_NONE, replan_visualize=VIS_NONE, planner=planner,
+                  obstacles=manager)
+    robot.profile = True
+    robot.plan_path()
+
+    def advance_robot(now):
+        """Scheduler action: step the robot or send it to its next target"""
+        if not robot.reached_goal():
+            robot.step()
+            # Pick the next target on the following tick
+            return now if robot.reached_goal() else robot.next_step_time()
+        result["targets_completed"] += 1
+        if not pending:
+            result["completed"] = True
+            return None
+        robot.set_new_goal(pending.pop(0))
+        robot.plan_path(reason=PLAN_NEW_GOAL)
+        return robot.next_step_time()
+
+    robot_event = scheduler.schedule(clock.now(), advance_robot)
+
+    def on_lights(changes):
+        """Light listener: wake the robot when the light it waits at turns green"""
+        if robot.on_lights(changes):
+            scheduler.reschedule(robot_event, robot.next_step_time())
+
+    lights.add_listener(on_lights)
+    _run_until_done(scheduler, clock, max_ticks, result)
+    _record_robots(result, [robot], clock)
+
+
+def _start_world(grid, targets, obstacles, clock, result):
+    """Schedule the scenario's obstacles and lights; returns (scheduler, obstacle manager, lights)"""
+    result["loaded"] = True
+    result["targets_total"] = len(targets)
+
+    scheduler = Scheduler()
+    manager = DynamicObstacleManager()
+    manager.set_obstacles(obstacles)
+    manager.attach(scheduler)
+    lights = TrafficLightController(grid, clock)
+    scheduler.schedule(clock.now(), lights.on_due)
+    return scheduler, manager, lights
+
+
+def _simulate_fleet(loaded, count, clock, max_ticks, result):
+    """Share the scenario's targets between `count` fleet robots"""
+    grid, start, targets, obstacles, _ = loaded
+    scheduler, manager, _ = _start_world(grid, targets, obstacles, clock, result)
+
+    fleet = FleetManager(grid, clock, obstacles=manager)
+    ordered = sorted(targets, key=lambda target: target.target_priority or 0)
+    shares = [ordered[k::count] for k in range(count)]
+    for spot, share in zip(_fleet_starts(grid, start, count), shares):
+        if share:
+            robot = fleet.add_robot(spot, share)
+            robot.profile = True
+    fleet.plan_all()
+
+    def advance_fleet(now):
+        """Scheduler action: advance the due robots, then stop once every one is done"""
+        wake = fleet.on_due(now)
+        result["targets_completed"] = len(targets) - sum(
+            len(pending) + (not robot.reached_goal()) for robot, pending in zip(fleet.robots, fleet.pending))
+        if fleet.done():
+            result["completed"] = True
+            return None
+        return wake
+
+    scheduler.schedule(clock.now(), advance_fleet)
+    _run_until_done(scheduler, clock, max_ticks, result)
+    _record_robots(result, fleet.robots, clock)
+
+
+def _fleet_starts(grid, start, count):
+    """The start spot and the free cells nearest to it, `count` in all (fewer if boxed in)"""
+    state = grid.state
+    seen = {start.get_pos()}
+    queue = deque(seen)
+    found = []
+    while queue and len(found) < count:
+        cell = queue.popleft()
+        if cell == start.get_pos() or not state.flags[state.index(*cell)]:
+            found.append(grid[cell[0]][cell[1]])
+        for neighbor in state.passable_neighbors(*cell):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                queue.append(neighbor)
+    return found
+
+
+def _run_until_done(scheduler, clock, max_ticks, result):
+    """Jump the clock from event to event until the run completes or the tick budget ends"""
+    end_time = clock.start + max_ticks * clock.tick
+    while not result["completed"]:
+        next_time = scheduler.next_time()
+        if next_time == INF or next_time > end_time:
+            break
+        clock.advance_to(next_time)
+        scheduler.run_due(clock.now())
+
+
+def _record_robots(result, robots, clock):
+    """Fill in the movement and planning totals of the robots"""
+    result["steps"] = sum(robot.steps_taken for robot in robots)
+    result["replans"] = sum(robot.replan_count for robot in robots)
+    result["ticks"] = clock.ticks
+    result["sim_time"] = clock.now()
+    reasons = result["plan_reasons"]
+    for robot in robots:
+        counters = robot.plan_counters
+        result["plans"] += counters.plans
+        result["plan_wall_time"] += counters.wall_time
+        if counters.slowest:
+            result["max_plan_time"] = max(result["max_plan_time"], counters.slowest.wall_time)
+        result["plan_expanded"] += counters.expanded
+        result["plan_pushes"] += counters.pushes
+        result["max_open"] = max(result["max_open"], counters.max_open)
+        for reason, plans in counters.by_reason.items():
+            reasons[reason] = reasons.get(reason, 0) + plans
+
+
+def _run_packed(args):
+    """Unpack scenario arguments for executor.map"""
+    return run_scenario(*args)
+
+
+def summarize(results):
+    """Aggregate scenario results overall and per map"""
+    def stats(rows):
+        count = len(rows)
+        if not count:
+            return {"runs": 0}
+        return {
+            "runs": count,
+            "completion_rate": sum(r["completed"] for r in rows) / count,
+            "mean_steps": sum(r["steps"] for r in rows) / count,
+            "mean_replans": sum(r["replans"] for r in rows) / count,
+            "mean_sim_time": sum(r["sim_time"] for r in rows) / count,
+            "mean_wall_time": sum(r["wall_time"] for r in rows) / count,
+            "max_wall_time": max(r["wall_time"] for r in rows),
+            "mean_plans": sum(r["plans"] for r in rows) / count,
+            "mean_plan_time": sum(r["plan_wall_time"] for r in rows) / max(1, sum(r["plans"] for r in rows)),
+            "max_plan_time": max(r["max_plan_time"] for r in rows),
+            "mean_expanded": sum(r["plan_expanded"] for r in rows) / max(1, sum(r["plans"] for r in rows)),
+            "max_open": max(r["max_open"] for r in rows),
+        }
+
+    maps = sorted({r["map"] for r in results})
+    return {
+        "overall": stats(results),
+        "per_map": {name: stats([r for r in results if r["map"] == name]) for name in maps},
+    }
+
+
+def run_batch(map_names, seeds, planner=PLANNER_ASTAR, workers=None, tick=BATCH_TICK, max_ticks=MAX_TICKS,
+              robots=1):
+    """Run every map/seed combination across a process pool and aggregate the results"""
+    jobs = [(name, seed, planner, tick, max_ticks, True, robots) for name, seed in product(map_names, seeds)]
+    chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_run_packed, jobs, chunksize=chunksize))
+    return results, summarize(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run saved maps headlessly across many seeds")
+    parser.add_argument("maps", nargs="+", help="map names saved under maps/")
+    parser.add_argument("--seeds", type=int, default=10, help="number of seeds per map")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--planner", choices=PLANNERS, default=PLANNER_ASTAR)
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS)
+    parser.add_argument("--robots", type=int, default=1,
+                        help="robots sharing each map's targets as a fleet (space-time planner)")
+    parser.add_argument("--output", help="JSON file for per-run results (default: exports/batch_<time>.json)")
+    args = parser.parse_args()
+
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    results, summary = run_batch(args.maps, seeds, args.planner, args.workers, max_ticks=args.max_ticks,
+                                 robots=max(1, args.robots))
+
+    ensure_directories()
+    output = args.output or f"exports/batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, "w") as f:
+        json.dump({"summary": summary, "runs": results}, f, indent=2)
+
+    overall = summary["overall"]
+    print(f"Runs: {overall['runs']}  completion: {overall.get('completion_rate', 0):.1%}  "
+          f"mean steps: {overall.get('mean_steps', 0):.1f}  "
+          f"mean replans: {overall.get('mean_replans', 0):.2f}  "
+          f"mean wall: {overall.get('mean_wall_time', 0):.3f}s")
+    print(f"Planning: {overall.get('mean_plans', 0):.1f} plans/run  "
+          f"mean plan: {overall.get('mean_plan_time', 0) * 1000:.2f}ms  "
+          f"slowest plan: {overall.get('max_plan_time', 0) * 1000:.2f}ms  "
+          f"mean expanded: {overall.get('mean_expanded', 0):.0f}")
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Binary map files that load by memory-mapping
+
+A .rgmap file holds the grid state layers exactly as GridState keeps them
+in memory, so loading a map maps the file and hands its layers to the grid
+state without parsing or copying anything:
+
+    header   64 bytes: magic, format version, rows, cols and the byte
+             offset of each section (little-endian unsigned 64-bit ints)
+    flags    rows * cols bytes of cell flag bits (barriers, dynamic
+             obstacles, traffic lights, start/end markers)
+    light    rows * cols bytes of traffic light state codes
+    cost     rows * cols little-endian float32 movement costs
+    meta     UTF-8 JSON with everything else (targets, light phases,
+             obstacle paths, robot parameters), as in the JSON map format
+
+The map is mapped copy-on-write: editing the loaded grid never changes the
+file, and only the pages that are touched get copied into memory.
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from core.grid_state import GridState
+
+MAGIC = b"RGMAP\0\0\0"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sQQQQQQQ")  # magic, version, rows, cols, flags, light, cost, meta offsets
+HEADER_SIZE = 64
+EXTENSION = ".rgmap"
+
+
+def _align(offset, size=8):
+    return (offset + size - 1) // size * size
+
+
+def _layout(rows, cols):
+    """Byte offsets of the flags, light, cost and meta sections"""
+    size = rows * cols
+    flags = HEADER_SIZE
+    light = flags + size
+    cost = _align(light + size)
+    meta = cost + 4 * size
+    return flags, light, cost, meta
+
+
+def write_binary_map(path, state, meta, flags=None):
+    """Write a grid state and its JSON metadata to a binary map file
+
+    `flags` replaces the state's flag layer in the file when given (any
+    bytes-like object of rows * cols bytes).
+    """
+    rows, cols = state.rows, state.cols
+    flags_at, light_at, cost_at, meta_at = _layout(rows, cols)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, rows, cols, flags_at, light_at, cost_at, meta_at)
+    cost = state.cost_view.astype("<f4", copy=False)
+    with open(path, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        f.write(state.flags if flags is None else flags)
+        f.write(state.light)
+        f.write(b"\0" * (cost_at - light_at - rows * cols))
+        f.write(cost.tobytes())
+        f.write(json.dumps(meta).encode("utf-8"))
+
+
+def read_binary_map(path):
+    """Map a binary map file; returns (GridState over the mapped layers, meta dict)"""
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    if len(mapped) < HEADER_SIZE:
+        raise ValueError(f"'{path}' is too short to be a map file")
+    magic, version, rows, cols, flags_at, light_at, cost_at, meta_at = HEADER.unpack_from(mapped)
+    if magic != MAGIC:
+        raise ValueError(f"'{path}' is not a binary map file")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"'{path}' has unsupported map format version {version}")
+    if (flags_at, light_at, cost_at, meta_at) != _layout(rows, cols) or len(mapped) < meta_at:
+        raise ValueError(f"'{path}' is truncated or corrupt")
+
+    size = rows * cols
+    view = memoryview(mapped)
+    flags = view[flags_at:flags_at + size]
+    light = view[light_at:light_at + size]
+    if sys.byteorder == "little":
+        cost = view[cost_at:meta_at].cast("f")
+    else:
+        # Costs are stored little-endian; big-endian hosts get a swapped copy
+        cost = array("f", bytes(view[cost_at:meta_at]))
+        cost.byteswap()
+    meta = json.loads(bytes(view[meta_at:]).decode("utf-8")) if len(mapped) > meta_at else {}
+    return GridState(rows, cols, flags=flags, light=light, cost=cost), meta
@@ -1,9 +1,16 @@
 import json
 import os
+import shutil
 from datetime import datetime
+import numpy as np
 from core.grid import make_grid
-from config.settings import ROWS, WIDTH
+from core.grid_state import BARRIER, DYNAMIC, TRAFFIC
+from config.settings import ROWS, binary_maps
 from entities.dynamic_obstacle import DynamicObstacle
+from utils.binary_map import write_binary_map, read_binary_map, EXTENSION as BINARY_EXTENSION
+
+# Saved map formats, binary first
+MAP_EXTENSIONS = (BINARY_EXTENSION, ".json")
 
 def ensure_directories():
     """Ensure required directories exist"""
@@ -12,9 +19,25 @@ def ensure_directories():
         if not os.path.exists(directory):
             os.makedirs(directory)
 
-def save_map(grid, start, targets, map_name, dynamic_obstacles=None, robot_params=None):
-    """Save complete map state including all elements"""
+def map_path(map_name):
+    """Path of the saved map file to load for a name (the newer one if both formats exist)"""
+    paths = [path for path in (f"maps/{map_name}{extension}" for extension in MAP_EXTENSIONS)
+             if os.path.exists(path)]
+    if not paths:
+        return None
+    return max(paths, key=os.path.getmtime)
+
+def save_map(grid, start, targets, map_name, dynamic_obstacles=None, robot_params=None, binary=None,
+             walkers=None):
+    """Save complete map state including all elements
+
+    With `binary` (default: the binary_maps setting) the map is written as a
+    memory-mappable .rgmap file, otherwise as JSON. `walkers` are the
+    (row, col, speed) of random walkers (DynamicObstacleManager.walkers()).
+    """
     ensure_directories()
+    if binary is None:
+        binary = binary_maps
     
     # Collect target data with priorities
     target_data = []
@@ -22,13 +45,15 @@ def save_map(grid, start, targets, map_name, dynamic_obstacles=None, robot_param
         for target in targets:
             target_data.append({
                 'pos': target.get_pos(),
-                'priority': getattr(target, 'target_priority', 1)
+                'priority': getattr(target, 'target_priority', None) or getattr(target, 'priority', 1)
             })
     
     # Collect dynamic obstacles data
     obstacle_data = []
     if dynamic_obstacles:
         for obstacle in dynamic_obstacles:
+            if not obstacle.path:
+                continue  # Random walkers are saved from `walkers`
             path_positions = [spot.get_pos() for spot in obstacle.path]
             obstacle_data.append({
                 'name': obstacle.name,
@@ -39,23 +64,23 @@ def save_map(grid, start, targets, map_name, dynamic_obstacles=None, robot_param
     
     # Collect traffic lights data
     traffic_lights = []
-    for row in grid:
-        for spot in row:
-            if hasattr(spot, 'is_traffic_stop') and spot.is_traffic_stop:
-                traffic_lights.append({
-                    'pos': spot.get_pos(),
-                    'state': spot.light_state,
-                    'cycle_start': spot.light_cycle_start
-                })
+    for row, col in grid.state.cells_with(TRAFFIC):
+        spot = grid[row][col]
+        traffic_lights.append({
+            'pos': spot.get_pos(),
+            'state': spot.light_state,
+            'cycle_start': spot.light_cycle_start
+        })
     
     # Create comprehensive save data
     data = {
         "version": "1.1",
         "created": datetime.now().isoformat(),
-        "grid_size": len(grid),
-        "barriers": [spot.get_pos() for row in grid for spot in row if spot.is_barrier()],
+        "grid_size": [grid.state.rows, grid.state.cols],
+        "barriers": grid.state.cells_with(BARRIER),
         "traffic_lights": traffic_lights,
         "dynamic_obstacles": obstacle_data,
+        "walkers": [{'pos': [row, col], 'speed': speed} for row, col, speed in walkers or ()],
         "start": start.get_pos() if start else None,
         "targets": target_data,
         "robot_params": robot_params or {
@@ -67,10 +92,22 @@ def save_map(grid, start, targets, map_name, dynamic_obstacles=None, robot_param
     }
     
     # Save to file
-    filepath = f"maps/{map_name}.json"
+    filepath = f"maps/{map_name}{BINARY_EXTENSION if binary else '.json'}"
     try:
-        with open(filepath, "w") as f:
-            json.dump(data, f, indent=2)
+        if binary:
+            # Barriers travel in the flag layer. Obstacles are recreated from
+            # their paths and walker positions on load, so their cells are
+            # left out of it.
+            del data["barriers"]
+            flags = grid.state.flags_view & (~DYNAMIC & 0xFF)
+            write_binary_map(filepath, grid.state, data, flags)
+        else:
+            # The binary format keeps the whole cost layer; JSON lists the non-default cells
+            cost_rows, cost_cols = np.nonzero(grid.state.cost_view != 1)
+            data["costs"] = [[int(r), int(c), float(grid.state.cost_view[r, c])]
+                             for r, c in zip(cost_rows, cost_cols)]
+            with open(filepath, "w") as f:
+                json.dump(data, f, indent=2)
         print(f"Map '{map_name}' saved successfully to {filepath}")
         return True
     except Exception as e:
@@ -79,28 +116,41 @@ def save_map(grid, start, targets, map_name, dynamic_obstacles=None, robot_param
 
 def load_map(grid, map_name):
     """Load complete map state including all elements"""
-    filepath = f"maps/{map_name}.json"
+    filepath = map_path(map_name)
     
-    if not os.path.exists(filepath):
-        print(f"Map file '{filepath}' not found.")
+    if filepath is None:
+        print(f"Map file 'maps/{map_name}{BINARY_EXTENSION}' or 'maps/{map_name}.json' not found.")
         return None
     
     try:
-        with open(filepath, "r") as f:
-            data = json.load(f)
-        
-        # Create new grid
-        new_grid = make_grid(ROWS, WIDTH)
+        if filepath.endswith(BINARY_EXTENSION):
+            # The grid state uses the mapped file's layers directly
+            state, data = read_binary_map(filepath)
+            new_grid = make_grid(state.rows, state.cols, state=state)
+        else:
+            with open(filepath, "r") as f:
+                data = json.load(f)
+            
+            # Create new grid at the saved size (a single number for older square maps)
+            size = data.get("grid_size", ROWS)
+            rows, cols = (size, size) if isinstance(size, int) else size
+            new_grid = make_grid(rows, cols)
+            
+            # Load barriers
+            for row, col in data.get("barriers", []):
+                if 0 <= row < len(new_grid) and 0 <= col < len(new_grid[0]):
+                    new_grid[row][col].make_barrier()
+
+            # Load movement costs
+            for row, col, cost in data.get("costs", []):
+                if 0 <= row < rows and 0 <= col < cols:
+                    new_grid.state.set_cost(row, col, cost)
+        new_grid.map_name = map_name
         start = None
         targets = []
         dynamic_obstacles = []
         robot_params = data.get("robot_params", {})
         
-        # Load barriers
-        for row, col in data.get("barriers", []):
-            if 0 <= row < len(new_grid) and 0 <= col < len(new_grid[0]):
-                new_grid[row][col].make_barrier()
-        
         # Load traffic lights
         for traffic_light in data.get("traffic_lights", []):
             row, col = traffic_light["pos"]
@@ -126,6 +176,13 @@ def load_map(grid, map_name):
                 obstacle.index = obstacle_data.get("current_index", 0)
                 dynamic_obstacles.append(obstacle)
         
+        # Load random walkers (the manager moves them into its swarm)
+        for walker in data.get("walkers", []):
+            row, col = walker["pos"]
+            if 0 <= row < len(new_grid) and 0 <= col < len(new_grid[0]):
+                dynamic_obstacles.append(DynamicObstacle(row, col, new_grid, name="Walker",
+                                                         speed=walker.get("speed", 1)))
+        
         # Load start position
         if data.get("start"):
             r, c = data["start"]
@@ -153,11 +210,11 @@ def save_obstacles(grid, filename="obstacles.json"):
     """Save only obstacle positions to file"""
     ensure_directories()
     
+    state = grid.state
     obstacles = {
-        "barriers": [spot.get_pos() for row in grid for spot in row if spot.is_barrier()],
-        "traffic_lights": [spot.get_pos() for row in grid for spot in row 
-                          if hasattr(spot, 'is_traffic_stop') and spot.is_traffic_stop],
-        "dynamic": [spot.get_pos() for row in grid for spot in row if spot.is_dynamic()]
+        "barriers": state.cells_with(BARRIER),
+        "traffic_lights": state.cells_with(TRAFFIC),
+        "dynamic": state.cells_with(DYNAMIC)
     }
     
     try:
@@ -261,31 +318,41 @@ def list_available_maps():
         return []
     
     maps = []
+    names = set()
     for filename in os.listdir("maps"):
-        if filename.endswith(".json"):
-            map_name = filename[:-5]  # Remove .json extension
-            filepath = os.path.join("maps", filename)
-            
-            try:
-                # Get file modification time
-                mod_time = datetime.fromtimestamp(os.path.getmtime(filepath))
-                maps.append({
-                    "name": map_name,
-                    "filename": filename,
-                    "modified": mod_time.strftime("%Y-%m-%d %H:%M")
-                })
-            except Exception as e:
-                print(f"Error reading map {filename}: {e}")
+        for extension in MAP_EXTENSIONS:
+            if filename.endswith(extension):
+                names.add(filename[:-len(extension)])
+    for map_name in names:
+        # A name saved in both formats is listed once, as the file load_map would read
+        filepath = map_path(map_name)
+        filename = os.path.basename(filepath)
+        
+        try:
+            # Get file modification time
+            mod_time = datetime.fromtimestamp(os.path.getmtime(filepath))
+            maps.append({
+                "name": map_name,
+                "filename": filename,
+                "modified": mod_time.strftime("%Y-%m-%d %H:%M")
+            })
+        except Exception as e:
+            print(f"Error reading map {filename}: {e}")
     
     return sorted(maps, key=lambda x: x["modified"], reverse=True)
 
 def delete_map(map_name):
-    """Delete a map file"""
-    filepath = f"maps/{map_name}.json"
+    """Delete a map's files in every format"""
+    filepaths = [f"maps/{map_name}{extension}" for extension in MAP_EXTENSIONS
+                 if os.path.exists(f"maps/{map_name}{extension}")]
     
-    if os.path.exists(filepath):
+    if filepaths:
         try:
-            os.remove(filepath)
+            for filepath in filepaths:
+                os.remove(filepath)
+            # Landmark tables kept next to the map
+            if os.path.exists(f"maps/{map_name}.alt.npz"):
+                os.remove(f"maps/{map_name}.alt.npz")
             print(f"Map '{map_name}' deleted successfully.")
             return True
         except Exception as e:
@@ -296,23 +363,20 @@ def delete_map(map_name):
         return False
 
 def backup_map(map_name):
-    """Create a backup copy of a map"""
+    """Create a backup copy of a map (of the file load_map would read)"""
     ensure_directories()
     
-    source_path = f"maps/{map_name}.json"
-    if not os.path.exists(source_path):
+    source_path = map_path(map_name)
+    if source_path is None:
         print(f"Map '{map_name}' not found.")
         return False
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = f"saves/{map_name}_backup_{timestamp}.json"
+    extension = os.path.splitext(source_path)[1]
+    backup_path = f"saves/{map_name}_backup_{timestamp}{extension}"
     
     try:
-        with open(source_path, 'r') as source:
-            data = json.load(source)
-        
-        with open(backup_path, 'w') as backup:
-            json.dump(data, backup, indent=2)
+        shutil.copyfile(source_path, backup_path)
         
         print(f"Map '{map_name}' backed up to {backup_path}")
         return backup_path
@@ -0,0 +1,175 @@
+"""
+Turn a floor plan or occupancy image into grid layers
+
+Dark pixels are walls. Pixels close to one of the IMAGE_COST_ZONES colors
+are slow ground, and everything else is open floor. The image is resampled
+to the grid by pooling the pixels under each cell: a cell becomes a
+barrier when enough of its pixels are walls, and otherwise costs the mean
+of its other pixels.
+
+Image x runs along grid rows and image y along columns, the way the grid
+is drawn, so the imported map looks like the picture.
+
+The conversion runs over horizontal strips of at most IMAGE_TILE_PIXELS
+pixels, so its temporary arrays stay small however big the image is.
+Uncompressed rasters (BMP, PPM/PGM, uncompressed TIFF and TGA) are read
+from the file one strip at a time and never decoded whole. JPEGs are
+decoded straight at (close to) the grid resolution using draft mode.
+Compressed formats such as PNG have no random access to their rows, so
+Pillow decodes them whole before the strips are cut.
+"""
+
+import numpy as np
+from PIL import Image
+from config.constants import *
+from core.grid_state import GridState, BARRIER
+
+# Modes without color, which cannot match a cost zone
+GRAY_MODES = ("1", "L", "LA", "I", "I;16", "F")
+
+
+def grid_size_for(width, height, rows=None, cols=None, max_cells=IMAGE_MAX_CELLS):
+    """Grid (rows, cols) for an image; sides not given keep the image's aspect ratio"""
+    if rows is None and cols is None:
+        scale = min(1.0, max_cells / max(width, height))
+        return max(1, round(width * scale)), max(1, round(height * scale))
+    if rows is None:
+        rows = max(1, round(cols * width / height))
+    elif cols is None:
+        cols = max(1, round(rows * height / width))
+    return rows, cols
+
+
+def _pixel_ranges(pixels, cells):
+    """First and one-past-last pixel under each cell (at least one pixel per cell)"""
+    start = np.arange(cells, dtype=np.int64) * pixels // cells
+    stop = np.maximum(start + 1, np.arange(1, cells + 1, dtype=np.int64) * pixels // cells)
+    return start, stop
+
+
+def _block_sums(values, y0, x0, dtype):
+    """Sum of `values` over the pixel blocks starting at rows y0 and columns x0
+
+    Each block runs to the next start (or the edge); a repeated start (a
+    grid finer than the image) picks out the single pixel it points at.
+    """
+    return np.add.reduceat(np.add.reduceat(values, x0, axis=1, dtype=dtype), y0, axis=0)
+
+
+def _strip_reader(image):
+    """read(top, bottom) returning those pixel rows of an uncompressed image, or None
+
+    The rows are read straight from the file, so the image itself is never
+    loaded. Images that are compressed, tiled or opened from a stream get
+    None and have to be cropped after a full decode.
+    """
+    width, height = image.size
+    if len(image.tile) != 1 or not getattr(image, "filename", None):
+        return None
+    codec, extents, offset, args = image.tile[0]
+    if codec != "raw" or tuple(extents) != (0, 0, width, height):
+        return None
+    if isinstance(args, str):
+        args = (args,)
+    # Raw decoder arguments with Pillow's defaults filled in
+    rawmode, stride, orientation = tuple(args)[:3] + (0, 1)[len(args) - 1:]
+    try:
+        if not stride:
+            stride = len(Image.new(image.mode, (width, 1)).tobytes("raw", rawmode))
+    except (ValueError, OSError):
+        return None  # No packer for this raw mode
+
+    def read(top, bottom):
+        # Bottom-up files (orientation -1) store the last row first
+        first = top if orientation > 0 else height - bottom
+        with open(image.filename, "rb") as f:
+            f.seek(offset + first * stride)
+            data = f.read((bottom - top) * stride)
+        strip = Image.frombytes(image.mode, (width, bottom - top), data, "raw", rawmode, stride, orientation)
+        if image.mode == "P":
+            strip.putpalette(image.palette)
+        strip.info = dict(image.info)
+        return strip
+
+    return read
+
+
+def _classify(image, threshold, zones, tolerance):
+    """Per-pixel wall mask and movement cost (None if all default) of an image strip"""
+    transparent = None
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        image = image.convert("RGBA")
+        transparent = np.asarray(image.getchannel("A")) < 128
+    walls = np.asarray(image.convert("L")) < threshold
+    cost = None
+
+    if zones and image.mode not in GRAY_MODES:
+        rgb = np.asarray(image.convert("RGB"))
+        r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+        saturation = np.maximum(np.maximum(r, g), b) - np.minimum(np.minimum(r, g), b)
+        # A pixel within `tolerance` of a color is at most 2 * tolerance less
+        # saturated, so grays skip the distance test against vivid zones
+        least = min(max(color) - min(color) for color in zones) - 2 * tolerance
+        candidates = np.flatnonzero(saturation >= least) if least > 0 else np.arange(walls.size)
+        if candidates.size:
+            pixels = rgb.reshape(-1, 3)[candidates].astype(np.int32)
+            cost = np.ones(walls.shape, dtype=np.float32)
+            for color, zone_cost in zones.items():
+                distance = ((pixels - np.array(color, dtype=np.int32)) ** 2).sum(axis=1)
+                match = candidates[distance <= tolerance * tolerance]
+                cost.flat[match] = zone_cost
+                # Zone colors can be dark (pure red is), so they never count as walls
+                walls.flat[match] = False
+
+    if transparent is not None:
+        walls[transparent] = False
+        if cost is not None:
+            cost[transparent] = 1.0
+    return walls, cost
+
+
+def import_image(path, rows=None, cols=None, threshold=IMAGE_DARK_THRESHOLD,
+                 barrier_share=IMAGE_BARRIER_SHARE, zones=None,
+                 tolerance=IMAGE_COLOR_TOLERANCE, tile_pixels=IMAGE_TILE_PIXELS):
+    """Build a GridState from an image file
+
+    Without `rows`/`cols` the grid follows the image size, scaled down so its
+    longer side is at most IMAGE_MAX_CELLS cells. `zones` maps RGB colors to
+    movement costs (default IMAGE_COST_ZONES).
+    """
+    zones = IMAGE_COST_ZONES if zones is None else zones
+    with Image.open(path) as image:
+        rows, cols = grid_size_for(*image.size, rows, cols)
+        # Lets JPEG decode at a reduced scale that still covers the grid
+        image.draft("RGB", (rows, cols))
+        width, height = image.size
+
+        state = GridState(rows, cols)
+        x0, x1 = _pixel_ranges(width, rows)
+        y0, y1 = _pixel_ranges(height, cols)
+        cell_height = int((y1 - y0).max())
+        band = max(1, tile_pixels // (width * cell_height))  # Grid columns per strip
+        read = _strip_reader(image) or (lambda top, bottom: image.crop((0, top, width, bottom)))
+
+        for c0 in range(0, cols, band):
+            c1 = min(cols, c0 + band)
+            top, bottom = int(y0[c0]), int(y1[c1 - 1])
+            walls, cost = _classify(read(top, bottom), threshold, zones, tolerance)
+            ys0, ys1 = y0[c0:c1] - top, y1[c0:c1] - top
+
+            area = (ys1 - ys0)[:, None] * (x1 - x0)[None, :]
+            wall_count = _block_sums(walls, ys0, x0, np.int64)
+            floor_count = area - wall_count
+            if cost is None:
+                floor_cost = floor_count
+            else:
+                floor_cost = _block_sums(np.where(walls, 0, cost), ys0, x0, np.float64)
+
+            barrier = wall_count >= barrier_share * area
+            mean_cost = np.where(floor_count > 0, floor_cost / np.maximum(floor_count, 1), 1.0)
+            state.flags_view[:, c0:c1] = np.where(barrier, BARRIER, 0).T
+            state.cost_view[:, c0:c1] = np.where(barrier, 1.0, mean_cost).T
+
+    state.recount_costs()
+    state.touch_all()
+    return state